@@ -6,7 +6,11 @@
 import os
 from flask import Flask
 
-from db import init_db
+from db import init_db, init_app as init_db_pool
+from metrics import init_app as init_metrics
+from profiler import init_app as init_profiler
+from passwords import init_app as init_passwords
+from services.reference_data import preload as preload_reference_data
 # Hier importeer ik de blueprints (bp) uit verschillende route-bestanden.
 # Een blueprint is een manier om routes te groeperen per onderdeel van de app,
 # bijvoorbeeld dashboard, workouts of authenticatie.
@@ -20,18 +24,38 @@ from routes.weight import bp as weight_bp
 from routes.workouts import bp as workouts_bp
 from routes.recipes import bp as recipes_bp
 from routes.auth_routes import bp as auth_bp
+from routes.admin import bp as admin_bp
+from routes.export import bp as export_bp
 
 # Aanmaken van de Flask-app
 app = Flask(__name__)
 app.secret_key = os.environ.get("SECRET_KEY", "bert-jan-key-2026")
 
-app.config["SESSION_COOKIE_SECURE"] = True
+# Alleen via HTTPS cookies sturen; lokaal (bijv. load tests over http)
+# uit te zetten met SESSION_COOKIE_SECURE=0
+app.config["SESSION_COOKIE_SECURE"] = os.environ.get("SESSION_COOKIE_SECURE", "1") != "0"
 app.config["SESSION_COOKIE_SAMESITE"] = "Lax"
 
 
 # 1x uitvoeren bij opstarten
 init_db()
 
+# Connectie-pool koppelen: elke request krijgt 1 connectie die
+# na afloop automatisch wordt teruggegeven (teardown)
+init_db_pool(app)
+
+# Lookup-tabellen (activiteitsniveaus, doelen) 1x in het geheugen laden
+preload_reference_data()
+
+# Metrics: timing per route, SQL-statement en externe API (zie /metrics)
+init_metrics(app)
+
+# Profiler voor trage requests (alleen actief als hij via env aan staat)
+init_profiler(app)
+
+# Wachtwoorden hashen in een aparte process-pool (503 als die vol zit)
+init_passwords(app)
+
 # Blueprints registreren
 app.register_blueprint(dashboard_bp)
 app.register_blueprint(nutrition_bp)
@@ -40,6 +64,8 @@ app.register_blueprint(weight_bp)
 app.register_blueprint(workouts_bp)
 app.register_blueprint(recipes_bp)
 app.register_blueprint(auth_bp)
+app.register_blueprint(admin_bp)
+app.register_blueprint(export_bp)
 
 # Dit zorgt ervoor dat de Flask-server alleen start
 # wanneer dit bestand direct wordt uitgevoerd.
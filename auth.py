@@ -3,12 +3,21 @@
 # Zonder wraps kan dit problemen geven bij routing.
 # Bron: https://stackoverflow.com/questions/308999/what-does-functools-wraps-do
 
+import os
 from functools import wraps
 
 # session: onthoudt of een gebruiker is ingelogd
 # redirect: stuurt een gebruiker door naar een andere pagina
 # url_for: maakt een link naar een andere route in de app
-from flask import session, redirect, url_for
+# abort: stopt het request met een foutcode (bijv. 403)
+from flask import session, redirect, url_for, abort
+
+# Beheerders: komma-gescheiden lijst e-mailadressen (bijv. ADMIN_EMAILS=jij@voorbeeld.nl)
+ADMIN_EMAILS = {
+    email.strip().lower()
+    for email in os.environ.get("ADMIN_EMAILS", "").split(",")
+    if email.strip()
+}
 
 
 def login_required(view):
@@ -24,3 +33,15 @@ def login_required(view):
 
     return wrapped_view
 
+
+def admin_required(view):
+    """Alleen voor ingelogde beheerders (ADMIN_EMAILS); anderen krijgen 403."""
+    @wraps(view)
+    def wrapped_view(*args, **kwargs):
+        if session.get("user_id") is None:
+            return redirect(url_for("auth.login"))
+        if session.get("user_email", "").lower() not in ADMIN_EMAILS:
+            abort(403)
+        return view(*args, **kwargs)
+
+    return wrapped_view
@@ -0,0 +1,42 @@
+-- exercises_fts.sql
+-- Zoekindex (FTS5) over de oefeningen-catalogus.
+-- De trigram-tokenizer laat "bench" ook matchen binnen "Incline Bench Press",
+-- net als LIKE '%bench%', maar dan via een index i.p.v. een full table scan.
+-- Bron: https://www.sqlite.org/fts5.html#the_trigram_tokenizer
+--
+-- Los van schema.sql: niet elke SQLite-build heeft FTS5/trigram (>= 3.34).
+-- Ontbreekt het, dan valt /api/exercises terug op LIKE.
+
+-- content='exercises': de index bewaart zelf geen kopie van de tekst
+CREATE VIRTUAL TABLE IF NOT EXISTS exercises_fts USING fts5(
+  name,
+  muscle_group,
+  equipment,
+  content='exercises',
+  content_rowid='id',
+  tokenize='trigram'
+);
+
+-- Triggers houden de index gelijk met de tabel exercises
+CREATE TRIGGER IF NOT EXISTS trg_exercises_fts_insert
+AFTER INSERT ON exercises
+BEGIN
+  INSERT INTO exercises_fts (rowid, name, muscle_group, equipment)
+  VALUES (NEW.id, NEW.name, NEW.muscle_group, NEW.equipment);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_exercises_fts_delete
+AFTER DELETE ON exercises
+BEGIN
+  INSERT INTO exercises_fts (exercises_fts, rowid, name, muscle_group, equipment)
+  VALUES ('delete', OLD.id, OLD.name, OLD.muscle_group, OLD.equipment);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_exercises_fts_update
+AFTER UPDATE ON exercises
+BEGIN
+  INSERT INTO exercises_fts (exercises_fts, rowid, name, muscle_group, equipment)
+  VALUES ('delete', OLD.id, OLD.name, OLD.muscle_group, OLD.equipment);
+  INSERT INTO exercises_fts (rowid, name, muscle_group, equipment)
+  VALUES (NEW.id, NEW.name, NEW.muscle_group, NEW.equipment);
+END;
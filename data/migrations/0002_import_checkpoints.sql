@@ -0,0 +1,11 @@
+-- 0002_import_checkpoints.sql
+-- Voortgang van bulk-imports (bijv. ExerciseDB), zodat een afgebroken
+-- import verdergaat waar hij gebleven was i.p.v. opnieuw te beginnen.
+
+CREATE TABLE IF NOT EXISTS import_checkpoints (
+  name TEXT PRIMARY KEY,              -- bijv. "exercisedb"
+  next_offset INTEGER NOT NULL,       -- volgende offset die nog opgehaald moet worden
+  rows_imported INTEGER NOT NULL DEFAULT 0,
+  finished INTEGER NOT NULL DEFAULT 0, -- 1 = laatste pagina bereikt
+  updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,8 @@
+-- 0003_food_logs_food_id_index.sql
+-- Index op de foreign key food_logs.food_id.
+-- Zonder deze index moet SQLite bij wijzigen/verwijderen van een product
+-- in foods de hele food_logs-tabel doorlopen (ON DELETE SET NULL).
+-- Bron: https://www.sqlite.org/foreignkeys.html#fk_indexes
+
+CREATE INDEX IF NOT EXISTS idx_food_logs_food_id
+ON food_logs(food_id);
@@ -0,0 +1,7 @@
+-- 0004_foods_name_index.sql
+-- Index op foods.name (hoofdletterongevoelig) voor de dagboek-import:
+-- producten zonder barcode worden op naam opgezocht (name COLLATE NOCASE IN (...)).
+-- Bron: https://www.sqlite.org/datatype3.html#collation
+
+CREATE INDEX IF NOT EXISTS idx_foods_name_nocase
+ON foods(name COLLATE NOCASE);
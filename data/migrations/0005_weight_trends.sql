@@ -0,0 +1,58 @@
+-- 0005_weight_trends.sql
+-- Trendanalyse gewicht (services/weight_trends.py):
+-- - weight_goals: doelgewicht per gebruiker (voor de projectie naar de doeldatum)
+-- - weight_trend_cache: berekende trend per gebruiker (JSON), zodat de
+--   gewichtpagina niet elke keer de hele geschiedenis doorrekent
+-- De triggers gooien de cache weg zodra de metingen of het doel veranderen;
+-- de volgende keer wordt hij opnieuw berekend.
+-- Bron: https://www.sqlite.org/lang_createtrigger.html
+
+CREATE TABLE IF NOT EXISTS weight_goals (
+  user_id INTEGER PRIMARY KEY,
+  goal_weight REAL NOT NULL,
+  updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+  FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS weight_trend_cache (
+  user_id INTEGER PRIMARY KEY,
+  payload TEXT NOT NULL,              -- JSON (zie weight_trends.compute_trends)
+  computed_at TEXT DEFAULT CURRENT_TIMESTAMP,
+  FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_weight_logs_trend_ai
+AFTER INSERT ON weight_logs
+BEGIN
+  DELETE FROM weight_trend_cache WHERE user_id = NEW.user_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_weight_logs_trend_ad
+AFTER DELETE ON weight_logs
+BEGIN
+  DELETE FROM weight_trend_cache WHERE user_id = OLD.user_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_weight_logs_trend_au
+AFTER UPDATE ON weight_logs
+BEGIN
+  DELETE FROM weight_trend_cache WHERE user_id IN (OLD.user_id, NEW.user_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_weight_goals_trend_ai
+AFTER INSERT ON weight_goals
+BEGIN
+  DELETE FROM weight_trend_cache WHERE user_id = NEW.user_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_weight_goals_trend_au
+AFTER UPDATE ON weight_goals
+BEGIN
+  DELETE FROM weight_trend_cache WHERE user_id = NEW.user_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_weight_goals_trend_ad
+AFTER DELETE ON weight_goals
+BEGIN
+  DELETE FROM weight_trend_cache WHERE user_id = OLD.user_id;
+END;
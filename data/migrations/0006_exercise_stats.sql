@@ -0,0 +1,40 @@
+-- 0006_exercise_stats.sql
+-- Statistieken per gebruiker per oefening (records en trainingsvolume).
+-- Wordt bijgewerkt bij elke toegevoegde oefening (workout_add_exercise), zodat
+-- een voortgangsoverzicht of "vorige keer"-hint 1 lookup op de primary key is
+-- i.p.v. alle workouts van de gebruiker doorlopen.
+-- Bestaande workouts worden na deze SQL, in dezelfde transactie, verwerkt door
+-- services/exercise_stats.rebuild_exercise_stats (zie db._MIGRATION_BACKFILLS).
+
+CREATE TABLE IF NOT EXISTS exercise_stats (
+  user_id INTEGER NOT NULL,
+  exercise_id INTEGER NOT NULL,
+
+  best_e1rm REAL,                     -- beste geschatte 1RM (Epley), NULL zonder gewicht
+  best_e1rm_date TEXT,
+  heaviest_weight REAL,               -- zwaarste set (bij gelijk gewicht: meeste reps)
+  heaviest_reps INTEGER,
+  total_volume REAL NOT NULL DEFAULT 0,    -- som van sets * reps * gewicht
+  total_sets INTEGER NOT NULL DEFAULT 0,
+  times_performed INTEGER NOT NULL DEFAULT 0,
+
+  -- Laatste en voorlaatste keer (op workoutdatum), voor "vorige keer"-hints
+  last_workout_id INTEGER,
+  last_date TEXT,
+  last_sets INTEGER,
+  last_reps INTEGER,
+  last_weight REAL,
+  prev_workout_id INTEGER,
+  prev_date TEXT,
+  prev_sets INTEGER,
+  prev_reps INTEGER,
+  prev_weight REAL,
+
+  PRIMARY KEY (user_id, exercise_id),
+  FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+  FOREIGN KEY (exercise_id) REFERENCES exercises(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+-- Foreign key-index (zie 0003): verwijderen van een oefening zonder hele tabel-scan
+CREATE INDEX IF NOT EXISTS idx_exercise_stats_exercise
+ON exercise_stats(exercise_id);
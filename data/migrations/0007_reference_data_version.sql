@@ -0,0 +1,44 @@
+-- 0007_reference_data_version.sql
+-- Versienummer voor de lookup-tabellen activity_levels en goals.
+-- De app houdt deze tabellen in het geheugen (services/reference_data.py) en
+-- leest ze alleen opnieuw in als dit nummer veranderd is.
+-- Zelfde aanpak als de catalogusversie van exercises (schema.sql).
+
+INSERT OR IGNORE INTO catalog_versions (name, version) VALUES
+('reference_data', 1);
+
+CREATE TRIGGER IF NOT EXISTS trg_activity_levels_version_insert
+AFTER INSERT ON activity_levels
+BEGIN
+  UPDATE catalog_versions SET version = version + 1 WHERE name = 'reference_data';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_activity_levels_version_update
+AFTER UPDATE ON activity_levels
+BEGIN
+  UPDATE catalog_versions SET version = version + 1 WHERE name = 'reference_data';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_activity_levels_version_delete
+AFTER DELETE ON activity_levels
+BEGIN
+  UPDATE catalog_versions SET version = version + 1 WHERE name = 'reference_data';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_goals_version_insert
+AFTER INSERT ON goals
+BEGIN
+  UPDATE catalog_versions SET version = version + 1 WHERE name = 'reference_data';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_goals_version_update
+AFTER UPDATE ON goals
+BEGIN
+  UPDATE catalog_versions SET version = version + 1 WHERE name = 'reference_data';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_goals_version_delete
+AFTER DELETE ON goals
+BEGIN
+  UPDATE catalog_versions SET version = version + 1 WHERE name = 'reference_data';
+END;
@@ -17,6 +17,14 @@ CREATE TABLE IF NOT EXISTS exercises ( -- https://www.sqlite.org/lang_createtabl
   equipment TEXT NOT NULL             -- bijv. "Barbell", "Dumbbell"
 );
 
+-- Versienummer per catalogus (bijv. 'exercises').
+-- Wordt verhoogd door triggers bij elke wijziging, zodat clients de
+-- catalogus kunnen cachen (ETag) tot er echt iets verandert.
+CREATE TABLE IF NOT EXISTS catalog_versions (
+  name TEXT PRIMARY KEY,
+  version INTEGER NOT NULL DEFAULT 0
+);
+
 -- Activiteitsniveaus voor de caloriecalculator (TDEE multiplier)
 CREATE TABLE IF NOT EXISTS activity_levels (
   id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -101,6 +109,13 @@ CREATE TABLE IF NOT EXISTS foods (
   UNIQUE(api_source, api_id)
 );
 
+-- Barcodes die Open Food Facts niet kent (negatieve cache)
+-- Zo wordt een onbekende barcode niet bij elke scan opnieuw opgevraagd.
+CREATE TABLE IF NOT EXISTS food_lookup_misses (
+  barcode TEXT PRIMARY KEY,
+  checked_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Wat de gebruiker daadwerkelijk eet (snapshot + berekende waarden)
 -- Dit is expres "los" van foods: zo blijft je log correct, ook als product later verandert.
 CREATE TABLE IF NOT EXISTS food_logs (
@@ -124,6 +139,22 @@ CREATE TABLE IF NOT EXISTS food_logs (
   -- ON DELETE SET NULL: als een food uit cache wordt verwijderd, blijft de log bestaan
 );
 
+-- Dagtotalen per gebruiker (rollup van food_logs)
+-- Wordt bijgehouden door de triggers hieronder, zodat een dagoverzicht
+-- 1 lookup op de primary key is i.p.v. een SUM over alle logregels.
+-- Bestaande database? Vullen met: python scripts/rebuild_daily_totals.py
+CREATE TABLE IF NOT EXISTS daily_nutrition_totals (
+  user_id INTEGER NOT NULL,
+  log_date TEXT NOT NULL,             -- "YYYY-MM-DD"
+  kcal REAL NOT NULL DEFAULT 0,
+  protein REAL NOT NULL DEFAULT 0,
+  carbs REAL NOT NULL DEFAULT 0,
+  fat REAL NOT NULL DEFAULT 0,
+  item_count INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (user_id, log_date),
+  FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
 -- Dagdoel per gebruiker (minimaal kcal, macro's optioneel)
 -- user_id is PRIMARY KEY: 1 record per gebruiker
 CREATE TABLE IF NOT EXISTS daily_targets (
@@ -182,3 +213,82 @@ ON food_logs(user_id, log_date);
 CREATE INDEX IF NOT EXISTS idx_foods_source_id
 ON foods(api_source, api_id);
 
+-- =========================================================
+-- TRIGGERS (catalogusversie oefeningen)
+-- =========================================================
+
+CREATE TRIGGER IF NOT EXISTS trg_exercises_version_insert
+AFTER INSERT ON exercises
+BEGIN
+  UPDATE catalog_versions SET version = version + 1 WHERE name = 'exercises';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_exercises_version_update
+AFTER UPDATE ON exercises
+BEGIN
+  UPDATE catalog_versions SET version = version + 1 WHERE name = 'exercises';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_exercises_version_delete
+AFTER DELETE ON exercises
+BEGIN
+  UPDATE catalog_versions SET version = version + 1 WHERE name = 'exercises';
+END;
+
+-- =========================================================
+-- TRIGGERS (dagtotalen bijhouden)
+-- =========================================================
+-- Bron: https://www.sqlite.org/lang_createtrigger.html
+
+CREATE TRIGGER IF NOT EXISTS trg_food_logs_totals_insert
+AFTER INSERT ON food_logs
+BEGIN
+  INSERT INTO daily_nutrition_totals (user_id, log_date, kcal, protein, carbs, fat, item_count)
+  VALUES (NEW.user_id, NEW.log_date, NEW.kcal, NEW.protein, NEW.carbs, NEW.fat, 1)
+  ON CONFLICT(user_id, log_date) DO UPDATE SET
+    kcal = kcal + excluded.kcal,
+    protein = protein + excluded.protein,
+    carbs = carbs + excluded.carbs,
+    fat = fat + excluded.fat,
+    item_count = item_count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_food_logs_totals_delete
+AFTER DELETE ON food_logs
+BEGIN
+  UPDATE daily_nutrition_totals SET
+    kcal = kcal - OLD.kcal,
+    protein = protein - OLD.protein,
+    carbs = carbs - OLD.carbs,
+    fat = fat - OLD.fat,
+    item_count = item_count - 1
+  WHERE user_id = OLD.user_id AND log_date = OLD.log_date;
+
+  -- Lege dag: regel weg (voorkomt ook afrondingsrestjes zoals 0.0000001)
+  DELETE FROM daily_nutrition_totals
+  WHERE user_id = OLD.user_id AND log_date = OLD.log_date AND item_count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_food_logs_totals_update
+AFTER UPDATE OF user_id, log_date, kcal, protein, carbs, fat ON food_logs
+BEGIN
+  UPDATE daily_nutrition_totals SET
+    kcal = kcal - OLD.kcal,
+    protein = protein - OLD.protein,
+    carbs = carbs - OLD.carbs,
+    fat = fat - OLD.fat,
+    item_count = item_count - 1
+  WHERE user_id = OLD.user_id AND log_date = OLD.log_date;
+
+  DELETE FROM daily_nutrition_totals
+  WHERE user_id = OLD.user_id AND log_date = OLD.log_date AND item_count <= 0;
+
+  INSERT INTO daily_nutrition_totals (user_id, log_date, kcal, protein, carbs, fat, item_count)
+  VALUES (NEW.user_id, NEW.log_date, NEW.kcal, NEW.protein, NEW.carbs, NEW.fat, 1)
+  ON CONFLICT(user_id, log_date) DO UPDATE SET
+    kcal = kcal + excluded.kcal,
+    protein = protein + excluded.protein,
+    carbs = carbs + excluded.carbs,
+    fat = fat + excluded.fat,
+    item_count = item_count + 1;
+END;
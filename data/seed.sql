@@ -29,3 +29,10 @@ INSERT OR IGNORE INTO goals (name, kcal_adjustment) VALUES
 ('Maintain', 0),           -- gewicht behouden
 ('Bulk', 300);             -- aankomen: calorie-overschot
 
+-- =========================================================
+-- 3) Catalogusversies
+-- =========================================================
+-- Startwaarde; de triggers in schema.sql verhogen deze bij elke wijziging.
+
+INSERT OR IGNORE INTO catalog_versions (name, version) VALUES
+('exercises', 1);
@@ -1,11 +1,30 @@
+import logging
 import os
+import queue
+import re
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g
+
+import metrics
+
+logger = logging.getLogger(__name__)
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_PATH = os.path.join(BASE_DIR, "database.db")
+DB_PATH = os.environ.get("DATABASE_PATH", os.path.join(BASE_DIR, "database.db"))
+
+# Maximaal aantal open connecties per (gunicorn) worker-proces
+POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "5"))
 
 SCHEMA_PATH = os.path.join(BASE_DIR, "data", "schema.sql")
 SEED_PATH = os.path.join(BASE_DIR, "data", "seed.sql")
+EXERCISES_FTS_PATH = os.path.join(BASE_DIR, "data", "exercises_fts.sql")
+
+# Migraties na de baseline: data/migrations/0002_naam.sql, 0003_naam.sql, ...
+MIGRATIONS_DIR = os.path.join(BASE_DIR, "data", "migrations")
 
 
 def _connect():
@@ -14,19 +33,205 @@ def _connect():
     - timeout/busy_timeout: wacht bij lock i.p.v. direct crashen
     - WAL: betere read/write concurrency
     """
-    conn = sqlite3.connect(DB_PATH, timeout=30)
+    # check_same_thread=False: een connectie uit de pool kan door een andere
+    # thread worden hergebruikt, maar nooit door twee requests tegelijk.
+    # TimedConnection: elk statement wordt gemeten (zie metrics.py)
+    conn = sqlite3.connect(
+        DB_PATH, timeout=30, check_same_thread=False, factory=metrics.TimedConnection
+    )
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON;")
-    conn.execute("PRAGMA journal_mode = WAL;")
     conn.execute("PRAGMA busy_timeout = 30000;")
+    conn.execute("PRAGMA foreign_keys = ON;")
+    # WAL blijft in het databasebestand staan: alleen zetten als het nog niet zo is.
+    # Starten meerdere workers tegelijk op een nieuwe database, dan zet er één
+    # het om; de anderen krijgen "locked" en hoeven niets te doen.
+    if conn.execute("PRAGMA journal_mode;").fetchone()[0] != "wal":
+        try:
+            conn.execute("PRAGMA journal_mode = WAL;")
+        except sqlite3.OperationalError:
+            pass
     return conn
 
 
+class ConnectionPool:
+    """
+    Begrensde pool van kant-en-klare connecties (PRAGMA's al gezet).
+    - Per proces: na een fork (gunicorn) begint de worker met een lege pool,
+      connecties van het parent-proces worden nooit hergebruikt.
+    - Is de pool vol, dan wordt een teruggegeven connectie gewoon gesloten.
+    """
+
+    def __init__(self, max_size: int = POOL_SIZE):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue(maxsize=self.max_size)
+        self._in_use = 0
+        self._created = 0
+        self._reused = 0
+        self._discarded = 0
+
+    def _check_fork(self):
+        # Na een fork zijn de connecties van de parent niet bruikbaar:
+        # we laten ze los (niet sluiten, dat doet de parent zelf).
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._reset()
+
+    def acquire(self) -> sqlite3.Connection:
+        self._check_fork()
+        try:
+            conn = self._idle.get_nowait()
+            reused = True
+        except queue.Empty:
+            conn = _connect()
+            reused = False
+
+        with self._lock:
+            self._in_use += 1
+            if reused:
+                self._reused += 1
+            else:
+                self._created += 1
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        self._check_fork()
+        with self._lock:
+            self._in_use = max(0, self._in_use - 1)
+
+        try:
+            # Niet-afgeronde transacties nooit doorgeven aan het volgende request
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put_nowait(conn)
+        except (sqlite3.Error, queue.Full):
+            with self._lock:
+                self._discarded += 1
+            conn.close()
+
+    def stats(self) -> dict:
+        self._check_fork()
+        with self._lock:
+            return {
+                "pid": self._pid,
+                "max_size": self.max_size,
+                "idle": self._idle.qsize(),
+                "in_use": self._in_use,
+                "created": self._created,
+                "reused": self._reused,
+                "discarded": self._discarded,
+            }
+
+
+_pool = ConnectionPool()
+
+
+# Optionele QueryTracer (alleen voor checks, zie query_tracer.py)
+_tracer = None
+
+
+def set_query_tracer(tracer) -> None:
+    """Koppelt een tracer aan de request-connecties (None = uit)."""
+    global _tracer
+    _tracer = tracer
+
+
+def get_db() -> sqlite3.Connection:
+    """
+    Gebruik deze in routes: 1 connectie per request (app context),
+    uit de pool van deze worker. Sluiten gebeurt automatisch in close_db.
+    """
+    if "db" not in g:
+        g.db = _pool.acquire()
+        if _tracer is not None:
+            _tracer.attach(g.db)
+    return g.db
+
+
+def close_db(exc=None) -> None:
+    """Teardown: geeft de connectie van dit request terug aan de pool."""
+    conn = g.pop("db", None)
+    if conn is not None:
+        if _tracer is not None:
+            _tracer.detach(conn)
+        _pool.release(conn)
+
+
+def pool_stats() -> dict:
+    """Statistieken van de connectie-pool van dit worker-proces."""
+    return _pool.stats()
+
+
+def _pool_gauges() -> dict:
+    stats = _pool.stats()
+    return {
+        ("db_pool_connections", (("state", "idle"),)): stats["idle"],
+        ("db_pool_connections", (("state", "in_use"),)): stats["in_use"],
+    }
+
+
+def init_app(app) -> None:
+    """Koppelt de connectie-pool aan de Flask-app."""
+    app.teardown_appcontext(close_db)
+    metrics.register_gauges(_pool_gauges)
+
+
 def get_db_connection():
-    """Gebruik deze in routes."""
+    """Losse connectie buiten een request (scripts, CLI). Zelf sluiten."""
     return _connect()
 
 
+def _table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (name,),
+    ).fetchone()
+    return row is not None
+
+
+def rebuild_daily_nutrition_totals(conn: sqlite3.Connection) -> int:
+    """
+    Vult daily_nutrition_totals opnieuw vanuit food_logs
+    (voor bestaande databases, of als de totalen ooit uit de pas lopen).
+    """
+    conn.execute("DELETE FROM daily_nutrition_totals")
+    cur = conn.execute(
+        """
+        INSERT INTO daily_nutrition_totals (user_id, log_date, kcal, protein, carbs, fat, item_count)
+        SELECT user_id, log_date, SUM(kcal), SUM(protein), SUM(carbs), SUM(fat), COUNT(*)
+        FROM food_logs
+        GROUP BY user_id, log_date
+        """
+    )
+    conn.commit()
+    return cur.rowcount
+
+
+def init_exercises_fts(conn: sqlite3.Connection) -> bool:
+    """
+    Maakt de zoekindex voor oefeningen aan (als SQLite FTS5 + trigram kent).
+    Geeft False terug als dat niet kan; zoeken valt dan terug op LIKE.
+    """
+    had_fts = _table_exists(conn, "exercises_fts")
+    try:
+        with open(EXERCISES_FTS_PATH, "r", encoding="utf-8") as f:
+            conn.executescript(f.read())
+    except sqlite3.OperationalError as e:
+        print("Zoekindex exercises_fts niet beschikbaar:", e)
+        return False
+
+    if not had_fts:
+        # Nieuwe index: bestaande oefeningen erin zetten
+        conn.execute("INSERT INTO exercises_fts (exercises_fts) VALUES ('rebuild')")
+        conn.commit()
+    return True
+
+
 def _exercises_count(conn: sqlite3.Connection) -> int:
     row = conn.execute("SELECT COUNT(*) AS c FROM exercises").fetchone()
     return int(row["c"]) if row else 0
@@ -36,60 +241,170 @@ def seed_exercises_from_api(conn: sqlite3.Connection, max_total: int = 150, page
     if _exercises_count(conn) > 0:
         return 0
 
-    from services.exercisedb_client import ExerciseDBClient
+    from services.exercise_importer import import_exercises
 
-    client = ExerciseDBClient()
-    inserted = 0
-    offset = 0
+    # Zelfde importer als scripts/import_exercises.py, maar zonder checkpoint
+    result = import_exercises(conn, page_size=page_size, max_total=max_total, checkpoint=None)
+    return result.inserted
 
-    while inserted < max_total:
-        batch = client.fetch_exercises_page(offset=offset, limit=page_size)
-        if not batch:
-            break
 
-        for ex in batch:
-            name = (ex.get("name") or "").strip()
-            if not name:
-                continue
+# =========================================================
+# MIGRATIES
+# =========================================================
+# De schemaversie staat in de database zelf (PRAGMA user_version).
+# Bij het opstarten wordt alleen die versie gelezen; is de database actueel,
+# dan wordt er geen DDL of seed meer uitgevoerd.
+# Bron: https://www.sqlite.org/pragma.html#pragma_user_version
 
-            muscle_group = (ex.get("target") or ex.get("bodyPart") or "Unknown").strip()
-            equipment = (ex.get("equipment") or "Unknown").strip()
 
-            conn.execute(
-                "INSERT OR IGNORE INTO exercises (name, muscle_group, equipment) VALUES (?, ?, ?)",
-                (name.title(), muscle_group.title(), equipment.title()),
-            )
-            inserted += 1
-            if inserted >= max_total:
-                break
+def _migrate_baseline(conn: sqlite3.Connection) -> None:
+    """Versie 1: schema.sql + seed.sql + zoekindex (veilig op bestaande databases)."""
+    # Nieuwe rollup-tabel in een bestaande database? Dan na het schema vullen.
+    had_totals = _table_exists(conn, "daily_nutrition_totals")
+
+    with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
+        conn.executescript(f.read())
+
+    if not had_totals:
+        rebuild_daily_nutrition_totals(conn)
+
+    init_exercises_fts(conn)
+
+    if os.path.exists(SEED_PATH):
+        with open(SEED_PATH, "r", encoding="utf-8") as f:
+            conn.executescript(f.read())
+
+
+def _backfill_exercise_stats(conn: sqlite3.Connection) -> None:
+    from services.exercise_stats import rebuild_exercise_stats
+
+    rebuild_exercise_stats(conn, commit=False)
+
+
+# Vullen met bestaande data na een .sql-migratie (versie -> functie), in
+# dezelfde transactie. Zo staat de berekening maar op 1 plek (in Python).
+_MIGRATION_BACKFILLS = {
+    6: _backfill_exercise_stats,
+}
+
+
+def _sql_migration(path: str, version: int):
+    """Een .sql-migratie: in 1 transactie, samen met het ophogen van user_version."""
+    backfill = _MIGRATION_BACKFILLS.get(version)
+
+    def run(conn: sqlite3.Connection) -> None:
+        with open(path, "r", encoding="utf-8") as f:
+            sql = f.read()
+        try:
+            # executescript commit niet zelf: de transactie loopt door tot conn.commit()
+            conn.executescript(f"BEGIN;\n{sql}")
+            if backfill is not None:
+                backfill(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+    return run
+
+
+def migrations() -> list[tuple[int, str, object]]:
+    """Alle migraties als (versie, naam, functie), oplopend gesorteerd."""
+    result = [(1, "baseline", _migrate_baseline)]
+    if os.path.isdir(MIGRATIONS_DIR):
+        for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+            match = re.match(r"^(\d+)_(\w+)\.sql$", filename)
+            if match:
+                version = int(match.group(1))
+                path = os.path.join(MIGRATIONS_DIR, filename)
+                result.append((version, match.group(2), _sql_migration(path, version)))
+    return sorted(result, key=lambda m: m[0])
 
-        offset += page_size
 
-    return inserted
+def latest_version() -> int:
+    return migrations()[-1][0]
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return int(conn.execute("PRAGMA user_version").fetchone()[0])
+
+
+@contextmanager
+def _migration_lock():
+    """
+    Voorkomt dat meerdere gunicorn workers tegelijk migreren:
+    de eerste voert de migraties uit, de rest wacht en ziet daarna
+    dat de database al actueel is.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        # Geen fcntl (Windows): lokaal draait er maar 1 proces
+        yield
+        return
+
+    with open(DB_PATH + ".migrate.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def migrate(conn: sqlite3.Connection) -> list[int]:
+    """Voert alle openstaande migraties uit. Geeft de uitgevoerde versies terug."""
+    applied = []
+    with _migration_lock():
+        # Opnieuw lezen ná het lock: een andere worker kan al klaar zijn
+        current = schema_version(conn)
+        for version, name, run in migrations():
+            if version <= current:
+                continue
+            print(f"Migratie {version:04d}_{name} uitvoeren...")
+            run(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+            applied.append(version)
+    return applied
 
 
 def init_db():
+    """
+    Snel opstartpad: alleen als de database achterloopt worden migraties
+    (en de eenmalige ExerciseDB seed) uitgevoerd.
+    """
     if not os.path.exists(SCHEMA_PATH):
         return
 
+    started = time.perf_counter()
     conn = _connect()
+    try:
+        if schema_version(conn) >= latest_version():
+            logger.debug(
+                "Database actueel (v%d), init_db %.1f ms",
+                schema_version(conn), (time.perf_counter() - started) * 1000,
+            )
+            return
 
-    with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
-        conn.executescript(f.read())
-
-    if os.path.exists(SEED_PATH):
-        with open(SEED_PATH, "r", encoding="utf-8") as f:
-            conn.executescript(f.read())
+        applied = migrate(conn)
+        if not applied:
+            return
 
-    # Seed oefeningen via API (alleen als leeg)
-    try:
-        inserted = seed_exercises_from_api(conn, max_total=150, page_size=50)
-        if inserted > 0:
-            print(f"ExerciseDB seed: {inserted} oefeningen toegevoegd aan exercises.")
-        else:
-            print("ExerciseDB seed: exercises was al gevuld (of niets toegevoegd).")
-    except Exception as e:
-        print("ExerciseDB seed mislukt:", e)
+        # Seed oefeningen via API (alleen als leeg)
+        try:
+            inserted = seed_exercises_from_api(conn, max_total=150, page_size=50)
+            if inserted > 0:
+                print(f"ExerciseDB seed: {inserted} oefeningen toegevoegd aan exercises.")
+            else:
+                print("ExerciseDB seed: exercises was al gevuld (of niets toegevoegd).")
+        except Exception as e:
+            print("ExerciseDB seed mislukt:", e)
 
-    conn.commit()
-    conn.close()
+        conn.commit()
+        logger.info(
+            "Database gemigreerd naar v%d, init_db %.1f ms",
+            schema_version(conn), (time.perf_counter() - started) * 1000,
+        )
+    finally:
+        conn.close()
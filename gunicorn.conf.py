@@ -0,0 +1,36 @@
+# gunicorn.conf.py
+# Wordt automatisch ingelezen door gunicorn (vanuit de projectmap).
+# Bron: https://docs.gunicorn.org/en/stable/settings.html#server-hooks
+import os
+import shutil
+
+import metrics
+
+# Zelf aangemaakte metrics-map (alleen die ruimen we bij het stoppen op)
+_own_metrics_dir = None
+
+
+def on_starting(server):
+    # Gedeelde map voor de metrics van alle workers (leeg bij elke start)
+    global _own_metrics_dir
+    configured = os.environ.get("METRICS_DIR")
+    path = metrics.prepare_dir()
+    if not configured:
+        _own_metrics_dir = path
+    server.log.info("Metrics van alle workers in %s", path)
+
+
+def worker_exit(server, worker):
+    # In de worker zelf, vlak voor hij stopt: het laatste interval wegschrijven,
+    # zodat child_exit (in de master) ook die tellers meeneemt
+    metrics.flush_final()
+
+
+def child_exit(server, worker):
+    # Tellers van een gestopte worker bewaren, zijn gauges niet
+    metrics.mark_process_dead(worker.pid)
+
+
+def on_exit(server):
+    if _own_metrics_dir:
+        shutil.rmtree(_own_metrics_dir, ignore_errors=True)
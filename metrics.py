@@ -0,0 +1,410 @@
+# metrics.py
+# Eenvoudige metrics in Prometheus-formaat (zonder extra dependency):
+# - per route: aantal requests, statuscodes en latency-histogram
+# - per SQL-statement (soort + tabel): latency, fouten en lock/busy-fouten
+# - per externe host (TheMealDB, ExerciseDB, OFF): latency, fouten, timeouts
+# - gauges, bijv. de connectie-pool
+#
+# Gunicorn draait meerdere worker-processen met elk hun eigen geheugen.
+# Daarom schrijft elk proces zijn metrics regelmatig weg naar
+# METRICS_DIR/<pid>.json; /metrics telt alle bestanden bij elkaar op.
+# Gestopte workers worden samengevoegd in METRICS_DIR/dead.json.
+# (gunicorn.conf.py maakt die map bij het opstarten leeg.)
+# /metrics is alleen te zien met METRICS_TOKEN (Bearer) of als beheerder.
+# Bron: https://prometheus.io/docs/instrumenting/exposition_formats/
+import atexit
+import glob
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+METRICS_DIR = os.environ.get("METRICS_DIR")
+# Zo vaak (seconden) schrijft een worker zijn metrics naar METRICS_DIR
+FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", "2"))
+
+# Bucketgrenzen in seconden
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+# name -> (type, help, buckets)
+_DEFINITIONS = {
+    "http_requests_total": ("counter", "Aantal afgehandelde requests.", None),
+    "http_request_duration_seconds": ("histogram", "Verwerkingstijd per request.", HTTP_BUCKETS),
+    "sqlite_query_duration_seconds": ("histogram", "Duur van SQL-statements (tot de eerste rij).", SQL_BUCKETS),
+    "sqlite_errors_total": ("counter", "Mislukte SQL-statements.", None),
+    "sqlite_lock_errors_total": ("counter", "Statements die faalden op 'database is locked/busy'.", None),
+    "upstream_request_duration_seconds": ("histogram", "Duur van requests naar externe API's.", HTTP_BUCKETS),
+    "upstream_requests_total": ("counter", "Requests naar externe API's.", None),
+    "upstream_errors_total": ("counter", "Mislukte requests naar externe API's (5xx of netwerkfout).", None),
+    "upstream_timeouts_total": ("counter", "Requests naar externe API's die een timeout kregen.", None),
+    "db_pool_connections": ("gauge", "Connecties in de pool (per state, opgeteld over workers).", None),
+    "password_hash_in_flight": ("gauge", "Wachtwoord-hashes die wachten of lopen (opgeteld over workers).", None),
+    "password_hash_rejected_total": ("counter", "Logins/registraties geweigerd (503) omdat het hashen vol zat.", None),
+}
+
+_lock = threading.Lock()
+_pid = os.getpid()
+# (name, labels) -> float (counter/gauge) of [bucket_counts..., sum, count] (histogram)
+_values: dict[tuple, object] = {}
+# Functies die bij elke flush gauges leveren: fn() -> {(name, labels): value}
+_gauge_callbacks = []
+_flusher_started = False
+# Periodieke flush en de laatste flush bij het stoppen schrijven hetzelfde .tmp-bestand
+_flush_lock = threading.Lock()
+
+
+def _check_fork():
+    """Na een fork begint een worker met lege metrics (de parent telt zijn eigen)."""
+    global _pid, _flusher_started
+    if _pid != os.getpid():
+        _pid = os.getpid()
+        _values.clear()
+        _flusher_started = False
+
+
+def _labels(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def inc(name: str, amount: float = 1.0, **labels):
+    key = (name, _labels(labels))
+    with _lock:
+        _check_fork()
+        _values[key] = _values.get(key, 0.0) + amount
+
+
+def observe(name: str, seconds: float, **labels):
+    buckets = _DEFINITIONS[name][2]
+    key = (name, _labels(labels))
+    with _lock:
+        _check_fork()
+        h = _values.get(key)
+        if h is None:
+            h = _values[key] = [0] * len(buckets) + [0.0, 0]
+        for i, bound in enumerate(buckets):
+            if seconds <= bound:
+                h[i] += 1
+                break
+        h[-2] += seconds
+        h[-1] += 1
+
+
+def register_gauges(callback):
+    """callback() -> {(name, labels-dict als tuple): waarde}, wordt bij elke flush aangeroepen."""
+    _gauge_callbacks.append(callback)
+
+
+def _collect_gauges() -> dict:
+    gauges = {}
+    for callback in _gauge_callbacks:
+        try:
+            for (name, labels), value in callback().items():
+                gauges[(name, _labels(dict(labels)))] = float(value)
+        except Exception as e:
+            print("Metrics gauge error:", e)
+    return gauges
+
+
+def _snapshot() -> dict:
+    with _lock:
+        _check_fork()
+        values = {k: (list(v) if isinstance(v, list) else v) for k, v in _values.items()}
+    values.update(_collect_gauges())
+    return values
+
+
+# ----------------
+# Wegschrijven / samenvoegen (meerdere workers)
+# ----------------
+
+def _file_for(pid: int) -> str:
+    return os.path.join(METRICS_DIR, f"{pid}.json")
+
+
+def flush():
+    """Schrijft de metrics van dit proces naar METRICS_DIR (atomair via rename)."""
+    if not METRICS_DIR:
+        return
+    data = [[name, dict(labels), value] for (name, labels), value in _snapshot().items()]
+    path = _file_for(os.getpid())
+    tmp = path + ".tmp"
+    with _flush_lock:
+        try:
+            with open(tmp, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            print("Metrics flush error:", e)
+
+
+def _flush_loop():
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+        flush()
+
+
+def _ensure_flusher():
+    """Start per worker-proces 1 achtergrondthread die periodiek flusht."""
+    global _flusher_started
+    if not METRICS_DIR or (_flusher_started and _pid == os.getpid()):
+        return
+    with _lock:
+        _check_fork()
+        if _flusher_started:
+            return
+        _flusher_started = True
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    threading.Thread(target=_flush_loop, name="metrics-flush", daemon=True).start()
+
+
+def flush_final():
+    """
+    Laatste flush van een worker die stopt (gunicorn worker_exit, en atexit).
+    Zonder deze flush gaat alles sinds de vorige periodieke flush verloren:
+    de master voegt bij child_exit alleen samen wat al in <pid>.json staat.
+    Alleen in processen die zelf metrics bijhielden (de flusher liep), dus
+    niet in de gunicorn master, die METRICS_DIR bij on_exit al weggooit.
+    Een worker die met SIGKILL stopt (timeout) verliest zijn laatste interval nog wel.
+    """
+    if _flusher_started and _pid == os.getpid():
+        flush()
+
+
+def prepare_dir(path: str | None = None) -> str:
+    """
+    Voor de gunicorn master (on_starting): maakt METRICS_DIR aan en gooit
+    bestanden van een vorige run weg, zodat tellers bij 0 beginnen.
+    """
+    global METRICS_DIR
+    if path is None:
+        import tempfile
+        path = METRICS_DIR or tempfile.mkdtemp(prefix="mft-metrics-")
+    os.makedirs(path, exist_ok=True)
+    for old in glob.glob(os.path.join(path, "*.json")):
+        os.remove(old)
+    METRICS_DIR = path
+    os.environ["METRICS_DIR"] = path
+    return path
+
+
+def _dead_file() -> str:
+    return os.path.join(METRICS_DIR, "dead.json")
+
+
+def _add_into(merged: dict, data: list) -> None:
+    """Telt [name, labels, value]-regels (uit een bestand) op bij merged."""
+    for name, labels, value in data:
+        key = (name, _labels(labels))
+        current = merged.get(key)
+        if isinstance(value, list):
+            if current is None:
+                merged[key] = list(value)
+            else:
+                merged[key] = [a + b for a, b in zip(current, value)]
+        else:
+            merged[key] = (current or 0.0) + value
+
+
+def _read(path: str) -> list:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def mark_process_dead(pid: int):
+    """
+    Voor de gunicorn master (child_exit): tellers en histogrammen van een
+    gestopte worker blijven meetellen, zijn gauges niet meer.
+    Alle gestopte workers samen staan in 1 bestand (dead.json), zodat
+    METRICS_DIR niet groeit met elke herstarte worker.
+    """
+    if not METRICS_DIR:
+        return
+    path = _file_for(pid)
+    data = _read(path)
+    with _lock:
+        totals = {}
+        _add_into(totals, _read(_dead_file()))
+        _add_into(totals, [e for e in data if _DEFINITIONS.get(e[0], ("gauge",))[0] != "gauge"])
+        tmp = _dead_file() + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump([[name, dict(labels), value] for (name, labels), value in totals.items()], f)
+            os.replace(tmp, _dead_file())
+            os.remove(path)
+        except OSError as e:
+            print("Metrics dead-worker merge error:", e)
+
+
+def _merged() -> dict:
+    """Alle metrics: eigen proces (actueel) + de bestanden van de andere workers."""
+    merged = _snapshot()
+    if not METRICS_DIR:
+        return merged
+
+    own = os.path.basename(_file_for(os.getpid()))
+    for path in glob.glob(os.path.join(METRICS_DIR, "*.json")):
+        if os.path.basename(path) == own:
+            continue
+        _add_into(merged, _read(path))
+    return merged
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: tuple, extra: tuple = ()) -> str:
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def render() -> str:
+    """Alle metrics (over alle workers) in het Prometheus text-formaat."""
+    by_name = {}
+    for (name, labels), value in _merged().items():
+        by_name.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for name, (kind, help_text, buckets) in _DEFINITIONS.items():
+        series = sorted(by_name.get(name, []))
+        if not series:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in series:
+            if kind != "histogram":
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets, value):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labels, (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(labels, (('le', '+Inf'),))} {value[-1]}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {value[-2]}")
+            lines.append(f"{name}_count{_format_labels(labels)} {value[-1]}")
+    return "\n".join(lines) + "\n"
+
+
+# ----------------
+# SQLite: connectie die elk statement timet
+# ----------------
+
+_SQL_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE|JOIN)\s+([A-Za-z_][A-Za-z0-9_]*)", re.IGNORECASE)
+
+
+def query_label(sql: str) -> str:
+    """
+    Kort label voor een statement: soort + eerste tabel, bijv. 'select:weight_logs'.
+    Niet de hele SQL: dat zou te veel verschillende series opleveren.
+    """
+    words = sql.split(None, 1)
+    if not words:
+        return "empty"
+    op = words[0].lower()
+    if op in ("pragma", "begin", "commit", "rollback"):
+        return op
+    match = _SQL_TABLE.search(sql)
+    return f"{op}:{match.group(1).lower()}" if match else op
+
+
+def _timed(label: str, run):
+    started = time.perf_counter()
+    try:
+        return run()
+    except sqlite3.OperationalError as e:
+        inc("sqlite_errors_total", query=label)
+        message = str(e).lower()
+        if "locked" in message or "busy" in message:
+            inc("sqlite_lock_errors_total", query=label)
+        raise
+    except sqlite3.Error:
+        inc("sqlite_errors_total", query=label)
+        raise
+    finally:
+        # Wachten op een lock (busy_timeout) gebeurt binnen SQLite en telt hier dus mee
+        observe("sqlite_query_duration_seconds", time.perf_counter() - started, query=label)
+
+
+class TimedCursor(sqlite3.Cursor):
+    def execute(self, sql, parameters=()):
+        return _timed(query_label(sql), lambda: super(TimedCursor, self).execute(sql, parameters))
+
+    def executemany(self, sql, seq_of_parameters):
+        return _timed(query_label(sql), lambda: super(TimedCursor, self).executemany(sql, seq_of_parameters))
+
+
+class TimedConnection(sqlite3.Connection):
+    """sqlite3-connectie die elk statement (en elke commit) meet. Gebruik: factory=TimedConnection."""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return _timed(query_label(sql), lambda: super(TimedConnection, self).execute(sql, parameters))
+
+    def executemany(self, sql, seq_of_parameters):
+        return _timed(query_label(sql), lambda: super(TimedConnection, self).executemany(sql, seq_of_parameters))
+
+    def executescript(self, sql_script):
+        return _timed("script", lambda: super(TimedConnection, self).executescript(sql_script))
+
+    def commit(self):
+        return _timed("commit", super().commit)
+
+
+# ----------------
+# Flask
+# ----------------
+
+def init_app(app) -> None:
+    """Meet elk request (route + status) en registreert /metrics."""
+    from flask import Response, g, request
+
+    @app.before_request
+    def _start_timer():
+        _ensure_flusher()
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        started = g.pop("metrics_start", None)
+        if started is not None:
+            # Endpoint i.p.v. URL: /workouts/1 en /workouts/2 zijn dezelfde route
+            route = request.endpoint or "unmatched"
+            observe(
+                "http_request_duration_seconds",
+                time.perf_counter() - started,
+                route=route,
+                method=request.method,
+            )
+            inc("http_requests_total", route=route, method=request.method, status=response.status_code)
+        return response
+
+    from flask import session
+
+    from auth import ADMIN_EMAILS
+
+    token = os.environ.get("METRICS_TOKEN")
+
+    def metrics_endpoint():
+        # Standaard afgeschermd: Prometheus met Authorization: Bearer <METRICS_TOKEN>,
+        # of een ingelogde beheerder (ADMIN_EMAILS) in de browser
+        authorized = (token and request.headers.get("Authorization") == f"Bearer {token}") or (
+            session.get("user_id") is not None and session.get("user_email", "").lower() in ADMIN_EMAILS
+        )
+        if not authorized:
+            return Response("Unauthorized\n", status=401, mimetype="text/plain")
+        return Response(render(), mimetype="text/plain; version=0.0.4")
+
+    app.add_url_rule("/metrics", "metrics", metrics_endpoint)
+
+
+atexit.register(flush_final)
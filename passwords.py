@@ -0,0 +1,164 @@
+# passwords.py
+# Wachtwoorden hashen en controleren buiten de request-thread.
+# scrypt kost bewust veel CPU; inline in een gunicorn-worker blokkeert een
+# golf logins alle threads (door de GIL) en wacht ook het dashboard mee.
+# Daarom:
+# - het hashen gebeurt in een kleine ProcessPoolExecutor per worker
+#   (PASSWORD_HASH_WORKERS processen, 0 = inline in de request-thread),
+#   gestart via een forkserver (geen fork van de worker met zijn threads)
+# - er mogen hooguit PASSWORD_HASH_QUEUE hashes tegelijk wachten of lopen;
+#   daarboven meteen HashingBusy (de route geeft een 503 met Retry-After)
+#   in plaats van een steeds langere wachtrij
+# - methode en kosten zijn in te stellen (PASSWORD_HASH_METHOD, zelfde notatie
+#   als werkzeug: "scrypt:32768:8:1" of "pbkdf2:sha256:1000000"); hashes met
+#   andere instellingen worden bij de volgende login vervangen (needs_rehash)
+# Bron: https://docs.python.org/3/library/concurrent.futures.html#processpoolexecutor
+# Bron: https://werkzeug.palletsprojects.com/en/stable/utils/#werkzeug.security.generate_password_hash
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+import metrics
+
+POOL_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", "2"))
+# Wachtend + lopend, per gunicorn-worker
+QUEUE_LIMIT = int(os.environ.get("PASSWORD_HASH_QUEUE", str(max(POOL_WORKERS, 1) * 4)))
+# Zo lang wacht een request hooguit op zijn hash
+TIMEOUT_S = float(os.environ.get("PASSWORD_HASH_TIMEOUT_S", "10"))
+
+
+class HashingBusy(Exception):
+    """Te veel hashes tegelijk (of de pool reageert niet): probeer het later opnieuw."""
+
+
+def _full_method(method: str) -> str:
+    """
+    Methode met alle parameters ingevuld, zoals werkzeug hem in de hash zet
+    ("scrypt" -> "scrypt:32768:8:1"), zodat needs_rehash kan vergelijken.
+    """
+    name, *args = method.split(":")
+    if name == "scrypt":
+        n, r, p = map(int, args or (2**15, 8, 1))
+        return f"scrypt:{n}:{r}:{p}"
+    if name == "pbkdf2":
+        hash_name = args[0] if args else "sha256"
+        iterations = int(args[1]) if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f"pbkdf2:{hash_name}:{iterations}"
+    raise ValueError(f"PASSWORD_HASH_METHOD niet ondersteund: {method}")
+
+
+METHOD = _full_method(os.environ.get("PASSWORD_HASH_METHOD", "scrypt"))
+
+_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(QUEUE_LIMIT)
+_executor: ProcessPoolExecutor | None = None
+_executor_pid = None
+_in_flight = 0
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """
+    1 pool per proces, pas bij de eerste hash gestart (dus na de fork van
+    gunicorn). Niet met 'fork': de worker draait dan al threads (requests,
+    metrics, prefetcher, profiler) en een geforkt kind erft hun locks in de
+    toestand van dat moment; het kan dan bij zijn eerste hash vastlopen.
+    Met 'forkserver' komen de hashprocessen uit een aparte server zonder
+    threads, die alleen dit (import-veilige) module vooraf laadt.
+    (Onder gunicorn is __main__ het gunicorn-script; alleen bij `python app.py`
+    importeert multiprocessing app.py nog 1x per hashproces, zoals bij 'spawn'.)
+    Bron: https://docs.python.org/3/library/multiprocessing.html#contexts-and-start-methods
+    """
+    global _executor, _executor_pid
+    with _lock:
+        if _executor is None or _executor_pid != os.getpid():
+            context = multiprocessing.get_context("forkserver")
+            # Standaard laadt de forkserver __main__ (app.py) vooraf
+            context.set_forkserver_preload([__name__])
+            _executor = ProcessPoolExecutor(max_workers=POOL_WORKERS, mp_context=context)
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _reset_executor(broken: ProcessPoolExecutor) -> None:
+    """Na een gecrasht hashproces: volgende keer een nieuwe pool."""
+    global _executor
+    with _lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _release(_future=None) -> None:
+    global _in_flight
+    with _lock:
+        _in_flight -= 1
+    _slots.release()
+
+
+def _run(fn, *args):
+    """fn(*args) in de pool (of inline), binnen de wachtrijgrens."""
+    global _in_flight
+    if not _slots.acquire(blocking=False):
+        metrics.inc("password_hash_rejected_total", reason="queue_full")
+        raise HashingBusy
+    with _lock:
+        _in_flight += 1
+
+    if POOL_WORKERS <= 0:
+        try:
+            return fn(*args)
+        finally:
+            _release()
+
+    executor = _get_executor()
+    try:
+        future = executor.submit(fn, *args)
+    except (BrokenProcessPool, RuntimeError):
+        _release()
+        _reset_executor(executor)
+        metrics.inc("password_hash_rejected_total", reason="pool_broken")
+        raise HashingBusy from None
+    # De plek komt pas vrij als de hash echt klaar is (ook na een timeout hieronder)
+    future.add_done_callback(_release)
+    try:
+        return future.result(timeout=TIMEOUT_S)
+    except FutureTimeoutError:
+        metrics.inc("password_hash_rejected_total", reason="timeout")
+        raise HashingBusy from None
+    except BrokenProcessPool:
+        _reset_executor(executor)
+        metrics.inc("password_hash_rejected_total", reason="pool_broken")
+        raise HashingBusy from None
+
+
+def hash_password(password: str) -> str:
+    return _run(generate_password_hash, password, METHOD)
+
+
+def check_password(pwhash: str, password: str) -> bool:
+    return _run(check_password_hash, pwhash, password)
+
+
+def needs_rehash(pwhash: str) -> bool:
+    """Hash gemaakt met een andere methode of andere kosten dan METHOD?"""
+    return pwhash.split("$", 1)[0] != METHOD
+
+
+def _gauges() -> dict:
+    return {("password_hash_in_flight", ()): _in_flight}
+
+
+def _busy(_e):
+    # Snel weigeren: de browser/load balancer kan het na 1 seconde opnieuw proberen
+    return "Het is even erg druk. Probeer het over een paar seconden opnieuw.", 503, {"Retry-After": "1"}
+
+
+def init_app(app) -> None:
+    """HashingBusy -> 503 voor alle routes, en de wachtrij als metric."""
+    app.register_error_handler(HashingBusy, _busy)
+    metrics.register_gauges(_gauges)
@@ -0,0 +1,235 @@
+# profiler.py
+# Sampling profiler voor trage requests (standaard uit).
+# Een achtergrondthread kijkt elke paar milliseconden welke functie de
+# request-thread aan het uitvoeren is (sys._current_frames). Zo zie je of de
+# tijd in Jinja, SQLite of een API-call (bijv. MealDB) zit, zonder de code
+# zelf te vertragen zoals een tracing-profiler (cProfile) dat doet.
+#
+# Aanzetten via environment variables:
+# - PROFILE_SAMPLE_RATE=0.01  -> 1% van de requests profileren
+# - PROFILE_SLOW_MS=500       -> elk request dat langer duurt dan 500 ms bewaren
+# - PROFILE_TOKEN=geheim      -> header "X-Profile: geheim" profileert dat request
+# Alles uit (standaard) = geen hooks geregistreerd, dus geen overhead.
+#
+# Profielen worden bewaard als "collapsed stacks" (1 regel per stack + aantal),
+# te openen in https://www.speedscope.app of met flamegraph.pl.
+# Bron: https://github.com/brendangregg/FlameGraph#2-fold-stacks
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+SLOW_MS = float(os.environ.get("PROFILE_SLOW_MS", "0"))
+TOKEN = os.environ.get("PROFILE_TOKEN", "")
+INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = os.environ.get(
+    "PROFILE_DIR", os.path.join(tempfile.gettempdir(), "myfitnesstracker-profiles")
+)
+# Ringbuffer: alleen de laatste MAX_PROFILES profielen blijven bewaard
+MAX_PROFILES = int(os.environ.get("PROFILE_MAX_FILES", "100"))
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+_PROFILE_ID = re.compile(r"^[0-9]{8}-[0-9]{6}-[0-9]{6}-[0-9]+$")
+
+
+def enabled() -> bool:
+    return SAMPLE_RATE > 0 or SLOW_MS > 0 or bool(TOKEN)
+
+
+# ----------------
+# Sampler (1 thread per worker-proces, alleen actief tijdens geprofileerde requests)
+# ----------------
+
+def _frame_label(code) -> str:
+    path = code.co_filename
+    if path.startswith(BASE_DIR):
+        path = os.path.relpath(path, BASE_DIR)
+    else:
+        # Bibliotheken: alleen vanaf de package-naam (site-packages/flask/... -> flask/...)
+        path = path.split("site-packages" + os.sep)[-1]
+    # ';' scheidt frames in het collapsed-formaat
+    return f"{code.co_name} ({path}:{code.co_firstlineno})".replace(";", ":")
+
+
+class _Sampler:
+    def __init__(self, interval_s: float):
+        self.interval_s = interval_s
+        self._lock = threading.Lock()
+        self._active: dict[int, Counter] = {}
+        self._wake = threading.Event()
+        self._pid = None
+
+    def _ensure_thread(self):
+        # Na een fork (gunicorn) bestaat de thread van de parent niet meer
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._active = {}
+            threading.Thread(target=self._run, name="profiler-sampler", daemon=True).start()
+
+    def start(self, thread_id: int):
+        self._ensure_thread()
+        with self._lock:
+            self._active[thread_id] = Counter()
+        self._wake.set()
+
+    def stop(self, thread_id: int) -> Counter:
+        with self._lock:
+            return self._active.pop(thread_id, Counter())
+
+    def _run(self):
+        while True:
+            with self._lock:
+                idle = not self._active
+            if idle:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, counts in self._active.items():
+                    frame = frames.get(thread_id)
+                    stack = []
+                    while frame is not None:
+                        stack.append(_frame_label(frame.f_code))
+                        frame = frame.f_back
+                    if stack:
+                        counts[";".join(reversed(stack))] += 1
+            del frames
+            time.sleep(self.interval_s)
+
+
+_sampler = _Sampler(INTERVAL_MS / 1000)
+
+
+# ----------------
+# Opslag (ringbuffer op schijf, gedeeld door alle workers)
+# ----------------
+
+def _save(samples: Counter, meta: dict) -> str:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    # Id = tijdstip (tot op de microseconde) + pid: sorteren op naam = op tijd
+    now = time.time()
+    profile_id = (
+        f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}"
+        f"-{int(now * 1_000_000) % 1_000_000:06d}-{os.getpid()}"
+    )
+    meta = dict(meta, id=profile_id, samples=sum(samples.values()), interval_ms=INTERVAL_MS)
+
+    with open(os.path.join(PROFILE_DIR, profile_id + ".collapsed"), "w") as f:
+        for stack, count in samples.most_common():
+            f.write(f"{stack} {count}\n")
+    # Metadata als laatste: een profiel staat pas in de lijst als het compleet is
+    with open(os.path.join(PROFILE_DIR, profile_id + ".json"), "w") as f:
+        json.dump(meta, f)
+
+    _trim()
+    return profile_id
+
+
+def _trim():
+    """Oudste profielen weggooien tot er MAX_PROFILES over zijn."""
+    ids = sorted(name[:-5] for name in os.listdir(PROFILE_DIR) if name.endswith(".json"))
+    for profile_id in ids[:-MAX_PROFILES] if MAX_PROFILES > 0 else ids:
+        for ext in (".json", ".collapsed"):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, profile_id + ext))
+            except FileNotFoundError:
+                pass  # al opgeruimd door een andere worker
+
+
+def list_profiles() -> list[dict]:
+    """Metadata van alle bewaarde profielen, nieuwste eerst."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(PROFILE_DIR), reverse=True):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(PROFILE_DIR, name)) as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+
+def profile_path(profile_id: str) -> str | None:
+    """Pad naar het collapsed-bestand, of None bij een ongeldige/onbekende id."""
+    if not _PROFILE_ID.match(profile_id):
+        return None
+    path = os.path.join(PROFILE_DIR, profile_id + ".collapsed")
+    return path if os.path.exists(path) else None
+
+
+# ----------------
+# Flask
+# ----------------
+
+def init_app(app) -> None:
+    """Registreert de profiler-hooks, maar alleen als hij via de config aan staat."""
+    if not enabled():
+        return
+
+    from flask import g, request
+
+    @app.before_request
+    def _start_profile():
+        forced = bool(TOKEN) and request.headers.get("X-Profile") == TOKEN
+        sampled = SAMPLE_RATE > 0 and random.random() < SAMPLE_RATE
+        # Bij een drempel moet elk request gesampled worden: vooraf weet je niet welke traag wordt
+        if not (forced or sampled or SLOW_MS > 0):
+            return
+        g.profile = {
+            "thread_id": threading.get_ident(),
+            "started": time.perf_counter(),
+            "reason": "header" if forced else "sample" if sampled else None,
+        }
+        _sampler.start(g.profile["thread_id"])
+
+    @app.after_request
+    def _finish_profile(response):
+        profile = g.pop("profile", None)
+        if profile is None:
+            return response
+
+        samples = _sampler.stop(profile["thread_id"])
+        duration_ms = (time.perf_counter() - profile["started"]) * 1000
+        reason = profile["reason"] or ("slow" if duration_ms >= SLOW_MS else None)
+        if reason is None or not samples:
+            return response
+
+        try:
+            profile_id = _save(samples, {
+                "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "method": request.method,
+                "path": request.path,
+                "endpoint": request.endpoint,
+                "status": response.status_code,
+                "duration_ms": round(duration_ms, 1),
+                "reason": reason,
+            })
+        except OSError as e:
+            print("Profiler error:", e)
+            return response
+
+        if reason == "header":
+            response.headers["X-Profile-Id"] = profile_id
+        return response
+
+    @app.teardown_request
+    def _abort_profile(exc=None):
+        # Onafgevangen fout (geen after_request): de sampler niet laten doorlopen
+        profile = g.pop("profile", None)
+        if profile is not None:
+            _sampler.stop(profile["thread_id"])
@@ -0,0 +1,101 @@
+# query_tracer.py
+# Houdt bij welke SQL een request uitvoert, om 'query budgets' te controleren
+# (zie scripts/check_query_budgets.py):
+# - statements: via sqlite3 set_trace_callback (met ingevulde parameters)
+# - werk: aantal VM-stappen via set_progress_handler (maat voor gelezen rijen)
+# - dubbele statements (N+1 of dezelfde lookup 2x)
+# - volledige table scans via EXPLAIN QUERY PLAN
+# Bron: https://docs.python.org/3/library/sqlite3.html#sqlite3.Connection.set_trace_callback
+import re
+import sqlite3
+from collections import Counter
+
+# Transactiebeheer en PRAGMA's tellen niet mee in het budget
+_IGNORED = ("BEGIN", "COMMIT", "ROLLBACK", "PRAGMA", "SAVEPOINT", "RELEASE")
+
+
+def normalize_sql(sql: str) -> str:
+    """Zelfde query met andere waarden -> zelfde tekst (voor N+1-detectie)."""
+    sql = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    sql = re.sub(r"\b\d+(?:\.\d+)?\b", "?", sql)
+    return " ".join(sql.split())
+
+
+class QueryTracer:
+    """
+    Koppel aan een connectie met attach(conn); alles wat daarna wordt
+    uitgevoerd komt in self.statements (tot detach of reset).
+    """
+
+    def __init__(self, progress_every: int = 100):
+        self.progress_every = progress_every
+        self.statements: list[str] = []
+        self.vm_steps = 0
+
+    def _on_statement(self, sql: str):
+        self.statements.append(sql)
+
+    def _on_progress(self) -> int:
+        self.vm_steps += self.progress_every
+        return 0  # 0 = doorgaan (niet afbreken)
+
+    def attach(self, conn: sqlite3.Connection):
+        conn.set_trace_callback(self._on_statement)
+        conn.set_progress_handler(self._on_progress, self.progress_every)
+
+    def detach(self, conn: sqlite3.Connection):
+        conn.set_trace_callback(None)
+        conn.set_progress_handler(None, 0)
+
+    def reset(self):
+        self.statements = []
+        self.vm_steps = 0
+
+    @property
+    def queries(self) -> list[str]:
+        """Uitgevoerde statements, zonder transactiebeheer, triggers en interne SQL."""
+        result = []
+        previous = None
+        for sql in self.statements:
+            stripped = sql.lstrip()
+            # Een trigger wordt gemeld met de tekst van het statement dat hem
+            # afvuurde (direct erna): die herhaling telt niet als extra query
+            if stripped == previous:
+                continue
+            previous = stripped
+            if stripped.startswith("--") or stripped.upper().startswith(_IGNORED):
+                continue
+            # Interne statements van SQLite zelf (bijv. FTS5: 'main'.'x_config')
+            if "'main'." in stripped:
+                continue
+            result.append(stripped)
+        return result
+
+    def duplicates(self) -> dict[str, int]:
+        """Statements (genormaliseerd) die meer dan 1x zijn uitgevoerd."""
+        counts = Counter(normalize_sql(sql) for sql in self.queries)
+        return {sql: n for sql, n in counts.items() if n > 1}
+
+    def full_scans(self, conn: sqlite3.Connection, allow: tuple[str, ...] = ()) -> list[tuple[str, str]]:
+        """
+        (statement, plan-regel) voor elke volledige scan van een echte tabel.
+        'SEARCH ... USING INDEX' is prima; 'SCAN <tabel>' leest de hele tabel.
+        Bron: https://www.sqlite.org/eqp.html
+        """
+        tables = {
+            r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        }
+        scans = []
+        for sql in self.queries:
+            if not sql.upper().startswith(("SELECT", "WITH", "UPDATE", "DELETE", "INSERT")):
+                continue
+            try:
+                plan = conn.execute("EXPLAIN QUERY PLAN " + sql).fetchall()
+            except sqlite3.Error:
+                continue
+            for row in plan:
+                detail = row[3]
+                match = re.match(r"SCAN (\w+)", detail)
+                if match and match.group(1) in tables and match.group(1) not in allow:
+                    scans.append((sql, detail))
+        return scans
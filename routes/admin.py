@@ -0,0 +1,44 @@
+from flask import Blueprint, abort, render_template, send_file
+
+# admin_required: alleen gebruikers uit ADMIN_EMAILS
+from auth import admin_required
+
+import profiler
+from routes.export import export_response
+
+bp = Blueprint("admin", __name__)
+
+
+@bp.route("/admin/profiles")
+@admin_required
+def profiles():
+    """Overzicht van de bewaarde request-profielen (nieuwste eerst)."""
+    return render_template(
+        "admin_profiles.html",
+        profiles=profiler.list_profiles(),
+        enabled=profiler.enabled(),
+        sample_rate=profiler.SAMPLE_RATE,
+        slow_ms=profiler.SLOW_MS,
+    )
+
+
+@bp.route("/admin/profiles/<profile_id>.collapsed")
+@admin_required
+def profile_download(profile_id):
+    """Download van 1 profiel (collapsed stacks, te openen in speedscope)."""
+    path = profiler.profile_path(profile_id)
+    if path is None:
+        abort(404)
+    return send_file(
+        path,
+        mimetype="text/plain",
+        as_attachment=True,
+        download_name=f"{profile_id}.collapsed",
+    )
+
+
+@bp.route("/admin/export/<any(food, weight, workouts):dataset>.<any(csv, ndjson):fmt>")
+@admin_required
+def export_all(dataset, fmt):
+    """Export van alle gebruikers (voor analyse), met een kolom user_id."""
+    return export_response(dataset, fmt, None, filename_suffix="-all")
@@ -4,13 +4,13 @@ import sqlite3
 # Bron: https://www.geeksforgeeks.org/python/flask-blueprints/
 from flask import Blueprint, render_template, request, session, redirect, url_for, flash
 
-# Werkzeug wordt gebruikt voor veilig opslaan en controleren van wachtwoorden.
-# Wachtwoorden worden gehasht en nooit als platte tekst opgeslagen.
+# Wachtwoorden worden gehasht (werkzeug, scrypt) en nooit als platte tekst opgeslagen.
+# Het hashen zelf gebeurt in een aparte process-pool (zie passwords.py).
 # Bron: https://werkzeug.palletsprojects.com/en/stable/tutorial/
-from werkzeug.security import generate_password_hash, check_password_hash
+from passwords import HashingBusy, check_password, hash_password, needs_rehash
 
 # Database helper voor het maken van een database-verbinding
-from db import get_db_connection
+from db import get_db
 
 # Aanmaken van een blueprint voor authenticatie
 bp = Blueprint("auth", __name__)
@@ -38,29 +38,21 @@ def register():
             return redirect(url_for("auth.register"))
 
 # Wachtwoord wordt veilig gehasht voordat het wordt opgeslagen
-        password_hash = generate_password_hash(password)
+        password_hash = hash_password(password)
 
-        conn = get_db_connection()
+        conn = get_db()
         try:
-			# Nieuwe gebruiker opslaan in de database
-            conn.execute(
-                "INSERT INTO users (email, password_hash) VALUES (?, ?)",
+			# Nieuwe gebruiker opslaan; RETURNING geeft meteen de gegevens voor de sessie
+            user = conn.execute(
+                "INSERT INTO users (email, password_hash) VALUES (?, ?) RETURNING id, email",
                 (email, password_hash),
-            )
+            ).fetchone()
             conn.commit()
         except sqlite3.IntegrityError:
             # UNIQUE email -> bestaat al
-            conn.close()
             flash("Dit e-mailadres bestaat al. Probeer in te loggen.")
             return redirect(url_for("auth.login"))
 
-        # Nieuwe user ophalen voor sessie
-        user = conn.execute(
-            "SELECT id, email FROM users WHERE email = ?",
-            (email,),
-        ).fetchone()
-        conn.close()
-
 # Nieuwe sessie starten
         session.clear()
         session["user_id"] = user["id"]
@@ -82,20 +74,32 @@ def login():
         email = request.form.get("email", "").strip().lower()
         password = request.form.get("password", "")
 
-        conn = get_db_connection()
+        conn = get_db()
         
         # Gebruiker zoeken op e-mailadres
         user = conn.execute(
             "SELECT id, email, password_hash FROM users WHERE email = ?",
             (email,),
         ).fetchone()
-        conn.close()
 
 # Controle of gebruiker bestaat en wachtwoord klopt
-        if user is None or not check_password_hash(user["password_hash"], password):
+        if user is None or not check_password(user["password_hash"], password):
             flash("Onjuiste inloggegevens.")
             return redirect(url_for("auth.login"))
 
+        # Hash met oude methode/kosten? Nu het wachtwoord bekend is, opnieuw hashen.
+        # Alleen als de hash intussen niet al door een andere login is vervangen.
+        if needs_rehash(user["password_hash"]):
+            try:
+                conn.execute(
+                    "UPDATE users SET password_hash = ? WHERE id = ? AND password_hash = ?",
+                    (hash_password(password), user["id"], user["password_hash"]),
+                )
+                conn.commit()
+            except HashingBusy:
+                # Inloggen is gelukt; het vervangen kan bij een volgende login
+                pass
+
 # Login succesvol: sessie starten
         session.clear()
         session["user_id"] = user["id"]
@@ -1,3 +1,4 @@
+import math
 from datetime import date
 
 # SimpleNamespace wordt gebruikt om meerdere waarden
@@ -7,58 +8,63 @@ from datetime import date
 from types import SimpleNamespace
 
 # Blueprint om deze routes te groeperen binnen de calculator-functionaliteit
-from flask import Blueprint, render_template, request, session, redirect, url_for, flash
+from flask import Blueprint, render_template, request, session, redirect, url_for, flash, jsonify
 
 # login_required zorgt ervoor dat alleen ingelogde gebruikers
 # deze pagina kunnen openen
 from auth import login_required
 
 # Database helper voor het ophalen en opslaan van gegevens
-from db import get_db_connection
+from db import get_db
+
+# Activiteitsniveaus en doelen staan in het geheugen (geen query per request)
+from services.reference_data import reference_data
+
+# Scenario-rooster (gewichten x activiteitsniveaus x doelen) voor /api/calculator/scenarios
+from services.tdee_scenarios import scenario_grid
 
 # Hulpfuncties voor veilige invoer en BMR-berekening
-from utils import safe_float, mifflin_st_jeor
+from utils import MIN_TARGET_KCAL, safe_float, mifflin_st_jeor
 
 bp = Blueprint("calculator", __name__)
 
+# Grenzen voor /api/calculator/scenarios (1 request mag de worker niet lang bezighouden)
+MAX_WEIGHTS = 200
+MAX_CLIENTS = 200
+MAX_SCENARIOS = 50_000
+
 
 @bp.route("/calculator", methods=["GET", "POST"])
 @login_required
 def calculator():
 	# Ingelogde gebruiker ophalen uit de sessie
     user_id = session["user_id"]
-    conn = get_db_connection()
-
-# Activiteitsniveaus ophalen voor de keuzelijst
-    activity_levels = conn.execute(
-        "SELECT id, name, multiplier FROM activity_levels ORDER BY id"
-    ).fetchall()
-
-# Doelen ophalen voor de keuzelijst
-    goals = conn.execute(
-        "SELECT id, name, kcal_adjustment FROM goals ORDER BY id"
-    ).fetchall()
+    conn = get_db()
 
- # Bestaand profiel ophalen (als dat er is)
-    profile = conn.execute(
-        """
-        SELECT user_id, sex, birth_year, height_cm, activity_level_id, goal_id
-        FROM user_profiles
-        WHERE user_id = ?
-        """,
-        (user_id,),
-    ).fetchone()
+# Activiteitsniveaus en doelen voor de keuzelijsten (uit het geheugen)
+    ref = reference_data(conn)
 
-# Laatst bekende gewicht ophalen (voor gebruik als standaardwaarde)
-    latest_weight_row = conn.execute(
-        "SELECT weight FROM weight_logs WHERE user_id = ? ORDER BY log_date DESC LIMIT 1",
-        (user_id,),
-    ).fetchone()
+    profile = None
+    weight_kg_for_form = None
+    result = None
 
-    weight_kg_default = float(latest_weight_row["weight"]) if latest_weight_row else None
-    weight_kg_for_form = weight_kg_default
+    if request.method == "GET":
+        # Bestaand profiel ophalen (als dat er is)
+        profile = conn.execute(
+            """
+            SELECT user_id, sex, birth_year, height_cm, activity_level_id, goal_id
+            FROM user_profiles
+            WHERE user_id = ?
+            """,
+            (user_id,),
+        ).fetchone()
 
-    result = None
+        # Laatst bekende gewicht ophalen (voor gebruik als standaardwaarde)
+        latest_weight_row = conn.execute(
+            "SELECT weight FROM weight_logs WHERE user_id = ? ORDER BY log_date DESC LIMIT 1",
+            (user_id,),
+        ).fetchone()
+        weight_kg_for_form = float(latest_weight_row["weight"]) if latest_weight_row else None
 
     if request.method == "POST":
 		# Ingevoerde waarden ophalen
@@ -82,50 +88,41 @@ def calculator():
         # ---- Validatie (simpel + duidelijk) ----
         if sex not in ("male", "female"):
             flash("Kies een geldig geslacht.")
-            conn.close()
             return redirect(url_for("calculator.calculator"))
 
         if age_years < 10 or age_years > 100:
             flash("Geboortejaar lijkt niet te kloppen.")
-            conn.close()
             return redirect(url_for("calculator.calculator"))
 
         if height_cm < 120 or height_cm > 230:
             flash("Lengte lijkt niet te kloppen.")
-            conn.close()
             return redirect(url_for("calculator.calculator"))
 
         if weight_kg < 30 or weight_kg > 250:
             flash("Gewicht lijkt niet te kloppen.")
-            conn.close()
             return redirect(url_for("calculator.calculator"))
 
- # Gekozen activiteit en doel ophalen uit de database
-        activity = conn.execute(
-            "SELECT multiplier FROM activity_levels WHERE id = ?",
-            (activity_level_id,),
-        ).fetchone()
-
-        goal = conn.execute(
-            "SELECT kcal_adjustment FROM goals WHERE id = ?",
-            (goal_id,),
-        ).fetchone()
+ # Gekozen activiteit en doel opzoeken (dict-lookup op id)
+        activity = ref.activity_by_id.get(activity_level_id)
+        goal = ref.goals_by_id.get(goal_id)
 
         if activity is None or goal is None:
             flash("Kies een geldig activiteitsniveau en doel.")
-            conn.close()
             return redirect(url_for("calculator.calculator"))
 
-        multiplier = float(activity["multiplier"])
-        kcal_adjustment = float(goal["kcal_adjustment"])
+        multiplier = activity.multiplier
+        kcal_adjustment = float(goal.kcal_adjustment)
 
         # ---- Berekeningen ----
         bmr = mifflin_st_jeor(sex, weight_kg, height_cm, age_years)
         tdee = bmr * multiplier
-        target_kcal = max(1200.0, tdee + kcal_adjustment)
+        target_kcal = max(MIN_TARGET_KCAL, tdee + kcal_adjustment)
 
         # ---- Profiel opslaan ----
-        conn.execute(
+        # RETURNING geeft de opgeslagen rij direct terug (zodat de select-boxes
+        # meteen "selected" staan), zonder het profiel opnieuw op te halen.
+        # Bron: https://www.sqlite.org/lang_returning.html
+        profile = conn.execute(
             """
             INSERT INTO user_profiles (user_id, sex, birth_year, height_cm, activity_level_id, goal_id)
             VALUES (?, ?, ?, ?, ?, ?)
@@ -135,31 +132,21 @@ def calculator():
               height_cm=excluded.height_cm,
               activity_level_id=excluded.activity_level_id,
               goal_id=excluded.goal_id
+            RETURNING user_id, sex, birth_year, height_cm, activity_level_id, goal_id
             """,
             (user_id, sex, birth_year, height_cm, activity_level_id, goal_id),
-        )
+        ).fetchone()
         conn.commit()
 
         # Resultaat voor template (werkt als result.bmr, result.tdee, result.target)
         result = SimpleNamespace(bmr=bmr, tdee=tdee, target=target_kcal)
 
-        # Profiel opnieuw ophalen zodat select-boxes meteen “selected” staan
-        profile = conn.execute(
-            """
-            SELECT user_id, sex, birth_year, height_cm, activity_level_id, goal_id
-            FROM user_profiles
-            WHERE user_id = ?
-            """,
-            (user_id,),
-        ).fetchone()
-
-    conn.close()
 
 # Template renderen met alle benodigde data
     return render_template(
         "calculator.html",
-        activity_levels=activity_levels,
-        goals=goals,
+        activity_levels=ref.activity_levels,
+        goals=ref.goals,
         profile=profile,
         weight_kg=weight_kg_for_form,
         result=result,
@@ -177,7 +164,7 @@ def calculator_save():
         flash("Kon kcal-doel niet opslaan.")
         return redirect(url_for("calculator.calculator"))
 
-    conn = get_db_connection()
+    conn = get_db()
     
      # Kcal-doel opslaan of bijwerken
     conn.execute(
@@ -190,7 +177,149 @@ def calculator_save():
         (user_id, kcal_target),
     )
     conn.commit()
-    conn.close()
 
     flash("Kcal-doel opgeslagen! Je dashboard en voeding-overzicht zijn nu bijgewerkt.")
     return redirect(url_for("dashboard.home"))
+
+
+def _finite(value, field: str, default=None) -> float | None:
+    """
+    Als safe_float, maar "inf"/"nan" zijn een fout (400): int(inf) geeft een
+    OverflowError en NaN glipt door elke vergelijking heen.
+    """
+    number = safe_float(value, default=default)
+    if number is not None and not math.isfinite(number):
+        raise ValueError(f"{field}: geen geldig getal.")
+    return number
+
+
+def _weights(value) -> list[float]:
+    """Lijst gewichten, of een reeks {"min": 70, "max": 80, "step": 0.5}."""
+    if isinstance(value, dict):
+        lo = _finite(value.get("min"), "weights_kg.min", default=0.0)
+        hi = _finite(value.get("max"), "weights_kg.max", default=0.0)
+        step = _finite(value.get("step"), "weights_kg.step", default=1.0)
+        if step <= 0 or hi < lo:
+            raise ValueError("weights_kg: min moet <= max zijn en step > 0.")
+        count = int((hi - lo) / step + 1e-9) + 1
+        if count > MAX_WEIGHTS:
+            raise ValueError(f"weights_kg: maximaal {MAX_WEIGHTS} gewichten.")
+        weights = [round(lo + i * step, 2) for i in range(count)]
+    elif isinstance(value, list):
+        weights = [_finite(v, "weights_kg") for v in value]
+    else:
+        weights = [_finite(value, "weights_kg")]
+
+    if not weights or len(weights) > MAX_WEIGHTS:
+        raise ValueError(f"weights_kg: 1 tot {MAX_WEIGHTS} gewichten.")
+    if any(w is None or w < 30 or w > 250 for w in weights):
+        raise ValueError("weights_kg: gewichten moeten tussen 30 en 250 kg liggen.")
+    return weights
+
+
+def _pick(ids, by_id, field: str) -> list:
+    """Gekozen activiteitsniveaus/doelen (standaard: allemaal)."""
+    if ids is None:
+        return list(by_id.values())
+    if not isinstance(ids, list) or not ids:
+        raise ValueError(f"{field}: geef een lijst met id's.")
+    picked = [by_id.get(int(_finite(i, field, default=0))) for i in ids]
+    if None in picked:
+        raise ValueError(f"{field}: onbekend id.")
+    return picked
+
+
+def _scenario(data: dict, ref, defaults: dict | None = None, limit: int = MAX_SCENARIOS) -> dict:
+    """
+    1 profiel uit de JSON-body doorrekenen; ontbrekende velden uit defaults.
+    limit: maximaal aantal scenario's (vooraf gecontroleerd, voor het rekenen).
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Elke client moet een object zijn.")
+    defaults = defaults or {}
+    sex = data.get("sex", defaults.get("sex"))
+    birth_year = int(_finite(data.get("birth_year", defaults.get("birth_year")), "birth_year", default=0))
+    height_cm = _finite(data.get("height_cm", defaults.get("height_cm")), "height_cm", default=0.0)
+    age_years = date.today().year - birth_year
+    goal_weight = _finite(data.get("goal_weight_kg", defaults.get("goal_weight")), "goal_weight_kg")
+
+    # Zelfde grenzen als het calculator-formulier
+    if sex not in ("male", "female"):
+        raise ValueError("sex moet male of female zijn.")
+    if age_years < 10 or age_years > 100:
+        raise ValueError("birth_year lijkt niet te kloppen.")
+    if height_cm < 120 or height_cm > 230:
+        raise ValueError("height_cm lijkt niet te kloppen.")
+    if goal_weight is not None and (goal_weight < 30 or goal_weight > 250):
+        raise ValueError("goal_weight_kg moet tussen 30 en 250 kg liggen.")
+
+    weights = data.get("weights_kg", defaults.get("weight"))
+    if weights is None:
+        raise ValueError("weights_kg ontbreekt.")
+
+    weights = _weights(weights)
+    activity_levels = _pick(data.get("activity_level_ids"), ref.activity_by_id, "activity_level_ids")
+    goals = _pick(data.get("goal_ids"), ref.goals_by_id, "goal_ids")
+    if len(weights) * len(activity_levels) * len(goals) > limit:
+        raise ValueError(f"Maximaal {MAX_SCENARIOS} scenario's per request.")
+
+    result = scenario_grid(sex, age_years, height_cm, weights, activity_levels, goals, goal_weight)
+    if "id" in data:
+        # Eigen kenmerk van de coach, ongewijzigd terug
+        result = {"id": data["id"], **result}
+    return result
+
+
+@bp.route("/api/calculator/scenarios", methods=["POST"])
+@login_required
+def api_calculator_scenarios():
+    """
+    "Wat als": BMR/TDEE/kcal-doel voor alle combinaties van gewichten,
+    activiteitsniveaus en doelen, met het aantal weken tot het doelgewicht.
+    JSON-body (alles optioneel; standaard het eigen profiel, laatste gewicht,
+    doelgewicht en alle activiteitsniveaus/doelen):
+      {"weights_kg": [80, 85] of {"min": 70, "max": 90, "step": 1},
+       "activity_level_ids": [2, 3], "goal_ids": [1],
+       "sex": "male", "birth_year": 1990, "height_cm": 180, "goal_weight_kg": 75}
+    Meerdere profielen tegelijk (bijv. een coach met klanten), zonder eigen
+    standaardwaarden: {"clients": [{"id": "...", ...}, ...]}
+    """
+    data = request.get_json(silent=True)
+    if data is None:
+        data = {}
+    if not isinstance(data, dict):
+        return {"error": "Verwacht een JSON-object."}, 400
+
+    conn = get_db()
+    ref = reference_data(conn)
+    clients = data.get("clients")
+    try:
+        if clients is not None:
+            if not isinstance(clients, list) or not 1 <= len(clients) <= MAX_CLIENTS:
+                raise ValueError(f"clients: 1 tot {MAX_CLIENTS} profielen.")
+            results = []
+            remaining = MAX_SCENARIOS
+            for i, client in enumerate(clients):
+                try:
+                    results.append(_scenario(client, ref, limit=remaining))
+                except ValueError as e:
+                    raise ValueError(f"clients[{i}]: {e}") from None
+                remaining -= len(results[-1]["scenarios"])
+            return jsonify({"clients": results})
+
+        # Eigen profiel, laatste gewicht en doelgewicht in 1 query
+        defaults = conn.execute(
+            """
+            SELECT p.sex, p.birth_year, p.height_cm,
+                   (SELECT weight FROM weight_logs WHERE user_id = u.id
+                    ORDER BY log_date DESC LIMIT 1) AS weight,
+                   (SELECT goal_weight FROM weight_goals WHERE user_id = u.id) AS goal_weight
+            FROM (SELECT ? AS id) u
+            LEFT JOIN user_profiles p ON p.user_id = u.id
+            """,
+            (session["user_id"],),
+        ).fetchone()
+        result = _scenario(data, ref, {k: v for k, v in dict(defaults).items() if v is not None})
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    return jsonify(result)
@@ -1,5 +1,8 @@
 # routes/dashboard.py
 
+import sqlite3
+from dataclasses import dataclass
+
 # Datumberekeningen met datetime en timedelta
 # Bron: https://docs.python.org/3/library/datetime.html
 from datetime import date, timedelta
@@ -10,15 +13,133 @@ from flask import Blueprint, render_template, session
 
 # login_required zorgt ervoor dat alleen ingelogde gebruikers toegang hebben
 from auth import login_required
-from db import get_db_connection
+from db import get_db
 
-# Client voor het ophalen van recepten via een externe API (TheMealDB via RapidAPI)
+# Recepten van de dag via een externe API (TheMealDB via RapidAPI)
 # API: https://rapidapi.com/thecocktaildb/api/themealdb/
-from services.mealdb_client import MealDBClient
+from services.recipe_prefetcher import recipes_of_the_day
 
 bp = Blueprint("dashboard", __name__)
 
 
+# ----------------------------
+# Data voor het dashboard
+# ----------------------------
+# Getypte objecten i.p.v. losse variabelen: zo is in 1 oogopslag
+# te zien wat het dashboard nodig heeft.
+# Bron: https://docs.python.org/3/library/dataclasses.html
+
+@dataclass(frozen=True)
+class WeightPoint:
+    log_date: str
+    weight: float
+
+
+@dataclass(frozen=True)
+class RecentWorkout:
+    id: int
+    workout_date: str
+    workout_type: str
+    notes: str | None
+
+
+@dataclass(frozen=True)
+class DashboardSummary:
+    latest_weight: WeightPoint | None
+    weight_logs: list[WeightPoint]          # nieuwste eerst (max 30)
+    workouts_this_week: int
+    recent_workouts: list[RecentWorkout]    # nieuwste eerst (max 5)
+    kcal_today: float
+    kcal_target: float
+
+    @property
+    def kcal_remaining(self) -> float:
+        return round(self.kcal_target - self.kcal_today, 2)
+
+
+# Alles in 1 statement: de KPI's als 1 rij (scalar subqueries), daarna
+# de gewichtmetingen en recente workouts. "kind" geeft aan wat een rij is.
+# Bron (WITH / CTE): https://www.sqlite.org/lang_with.html
+DASHBOARD_SQL = """
+WITH
+  recent_weights AS (
+    SELECT log_date, weight
+    FROM weight_logs
+    WHERE user_id = :user_id
+    ORDER BY log_date DESC
+    LIMIT 30
+  ),
+  recent_workouts AS (
+    SELECT id, workout_date, workout_type, notes
+    FROM workouts
+    WHERE user_id = :user_id
+    ORDER BY workout_date DESC
+    LIMIT 5
+  )
+SELECT
+  'kpi' AS kind,
+  NULL AS id,
+  NULL AS day,
+  NULL AS label,
+  NULL AS notes,
+  (SELECT COUNT(*) FROM workouts
+    WHERE user_id = :user_id AND workout_date >= :monday) AS num,
+  (SELECT kcal FROM daily_nutrition_totals
+    WHERE user_id = :user_id AND log_date = :today) AS kcal_today,
+  (SELECT kcal_target FROM daily_targets
+    WHERE user_id = :user_id) AS kcal_target
+UNION ALL
+SELECT 'weight', NULL, log_date, NULL, NULL, weight, NULL, NULL
+FROM recent_weights
+UNION ALL
+SELECT 'workout', id, workout_date, workout_type, notes, NULL, NULL, NULL
+FROM recent_workouts
+"""
+
+
+def load_dashboard_summary(conn: sqlite3.Connection, user_id: int, today: date) -> DashboardSummary:
+    """Haalt alle dashboard-data op in 1 database round-trip."""
+    # Maandag van de huidige week (voor weekoverzichten)
+    monday = today - timedelta(days=today.weekday())
+
+    rows = conn.execute(
+        DASHBOARD_SQL,
+        {"user_id": user_id, "today": today.isoformat(), "monday": monday.isoformat()},
+    ).fetchall()
+
+    kpi = None
+    weights = []
+    workouts = []
+    for r in rows:
+        if r["kind"] == "kpi":
+            kpi = r
+        elif r["kind"] == "weight":
+            weights.append(WeightPoint(log_date=r["day"], weight=float(r["num"])))
+        else:
+            workouts.append(
+                RecentWorkout(
+                    id=r["id"],
+                    workout_date=r["day"],
+                    workout_type=r["label"],
+                    notes=r["notes"],
+                )
+            )
+
+    # Volgorde van een UNION is niet gegarandeerd: hier expliciet sorteren
+    weights.sort(key=lambda w: w.log_date, reverse=True)
+    workouts.sort(key=lambda w: w.workout_date, reverse=True)
+
+    return DashboardSummary(
+        # Laatste meting = eerste van de 30 (geen aparte query nodig)
+        latest_weight=weights[0] if weights else None,
+        weight_logs=weights,
+        workouts_this_week=int(kpi["num"] or 0),
+        recent_workouts=workouts,
+        kcal_today=float(kpi["kcal_today"] or 0.0),
+        kcal_target=float(kpi["kcal_target"] or 0.0),
+    )
+
+
 @bp.route("/")
 @login_required
 def home():
@@ -29,123 +150,27 @@ def home():
     today = date.today()
     today_str = today.isoformat()
 
-    # Maandag van de huidige week (voor weekoverzichten)
-    monday = today - timedelta(days=today.weekday())
-    monday_str = monday.isoformat()
-
-    conn = get_db_connection()
-
-    # Laatst geregistreerde gewicht (voor KPI)
-    latest_weight = conn.execute(
-        """
-        SELECT weight, log_date
-        FROM weight_logs
-        WHERE user_id = ?
-        ORDER BY log_date DESC
-        LIMIT 1
-        """,
-        (user_id,),
-    ).fetchone()
-
-    # Laatste 30 gewichtmetingen (voor grafiek)
-    weight_logs = conn.execute(
-        """
-        SELECT log_date, weight
-        FROM weight_logs
-        WHERE user_id = ?
-        ORDER BY log_date DESC
-        LIMIT 30
-        """,
-        (user_id,),
-    ).fetchall()
-
-    # Aantal workouts deze week
-    workouts_this_week_row = conn.execute(
-        """
-        SELECT COUNT(*) AS cnt
-        FROM workouts
-        WHERE user_id = ? AND workout_date >= ?
-        """,
-        (user_id, monday_str),
-    ).fetchone()
-    workouts_this_week = int(workouts_this_week_row["cnt"]) if workouts_this_week_row else 0
-
-    # Meest recente workouts voor overzicht
-    recent_workouts = conn.execute(
-        """
-        SELECT id, workout_date, workout_type, notes
-        FROM workouts
-        WHERE user_id = ?
-        ORDER BY workout_date DESC
-        LIMIT 5
-        """,
-        (user_id,),
-    ).fetchall()
-
-    # Voeding kcal vandaag + doel (voor KPI)
-    totals_today = conn.execute(
-        # Bron: https://www.sqlite.org/lang_aggfunc.html
-        """
-        SELECT COALESCE(SUM(kcal), 0) AS kcal
-        FROM food_logs
-        WHERE user_id = ? AND log_date = ?
-        """,
-        (user_id, today_str),
-    ).fetchone()
-
-    # Dagelijks calorie-doel ophalen
-    target = conn.execute(
-        "SELECT kcal_target FROM daily_targets WHERE user_id = ?",
-        (user_id,),
-    ).fetchone()
-
-    # KPI-berekeningen
-    kcal_today = float(totals_today["kcal"]) if totals_today else 0.0
-    kcal_target = float(target["kcal_target"]) if target else 0.0
-    kcal_remaining = round(kcal_target - kcal_today, 2)
-
-    conn.close()
+    # Alle KPI's, gewicht en recente workouts in 1 query
+    summary = load_dashboard_summary(get_db(), user_id, today)
 
     # ----------------------------
     # 3x recepten van de dag (API)
     # ----------------------------
-    # Er worden 3 willekeurige recepten opgehaald via TheMealDB.
-    # We proberen dubbele recepten te vermijden.
-    recipes_of_day = []
-    try:
-        client = MealDBClient()
-        seen_ids = set()
-        attempts = 0
-
-        # Max 12 pogingen om 3 unieke recepten te krijgen
-        while len(recipes_of_day) < 3 and attempts < 12:
-            attempts += 1
-            meal = client.random_meal()
-            if not meal:
-                continue
-
-            meal_id = meal.get("idMeal")
-            if not meal_id or meal_id in seen_ids:
-                continue
-
-            seen_ids.add(meal_id)
-            recipes_of_day.append(meal)
-
-    except Exception as e:
-        # Als de API faalt, blijft het dashboard gewoon werken
-        print("MealDB error (dashboard recipes):", e)
-        recipes_of_day = []
+    # De recepten komen uit een voorraad die op de achtergrond wordt gevuld
+    # (zie services/recipe_prefetcher.py). Hier wordt dus nooit op de API gewacht;
+    # is de voorraad (nog) leeg, dan toont het dashboard geen suggesties.
+    recipes_of_day = recipes_of_the_day(3)
 
     # Alles doorgeven aan dashboard template
     return render_template(
         "dashboard.html",
-        latest_weight=latest_weight,
-        weight_logs=weight_logs,
-        workouts_this_week=workouts_this_week,
-        recent_workouts=recent_workouts,
-        kcal_today=kcal_today,
-        kcal_target=kcal_target,
-        kcal_remaining=kcal_remaining,
+        latest_weight=summary.latest_weight,
+        weight_logs=summary.weight_logs,
+        workouts_this_week=summary.workouts_this_week,
+        recent_workouts=summary.recent_workouts,
+        kcal_today=summary.kcal_today,
+        kcal_target=summary.kcal_target,
+        kcal_remaining=summary.kcal_remaining,
         today=today_str,
         recipes_of_day=recipes_of_day,
     )
@@ -0,0 +1,37 @@
+# routes/export.py
+# Download van de eigen geschiedenis (voeding, gewicht, workouts).
+# Voorbeelden:
+#   /export/food.csv            -> voedingsdagboek als CSV
+#   /export/weight.ndjson       -> gewicht als NDJSON (1 JSON-object per regel)
+#   /export/workouts.csv?gzip=1 -> workouts als .csv.gz
+# De response wordt gestreamd (generator), zie services/exporter.py.
+# Bron: https://flask.palletsprojects.com/en/stable/patterns/streaming/
+from flask import Blueprint, Response, request, session
+
+from auth import login_required
+from services.exporter import FORMATS, export_filename, iter_export
+
+bp = Blueprint("export", __name__)
+
+
+def export_response(dataset: str, fmt: str, user_id: int | None, filename_suffix: str = "") -> Response:
+    """Streaming download; ?gzip=1 geeft een gecomprimeerd bestand."""
+    compress = request.args.get("gzip") == "1"
+    resp = Response(
+        iter_export(dataset, user_id, fmt, compress=compress),
+        mimetype="application/gzip" if compress else FORMATS[fmt],
+    )
+    resp.headers["Content-Disposition"] = (
+        f'attachment; filename="{export_filename(dataset, fmt, compress, filename_suffix)}"'
+    )
+    # Persoonlijke gegevens: nergens bewaren
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
+
+
+@bp.route("/export/<any(food, weight, workouts):dataset>.<any(csv, ndjson):fmt>")
+@login_required
+def export(dataset, fmt):
+    """Volledige geschiedenis van de ingelogde gebruiker."""
+    # user_id nu al uitlezen: de generator draait pas na het request
+    return export_response(dataset, fmt, session["user_id"])
@@ -1,17 +1,25 @@
-from datetime import date
+from datetime import date, timedelta
 
-from flask import Blueprint, render_template, request, session, redirect, url_for, flash
+from flask import Blueprint, jsonify, render_template, request, session, redirect, url_for, flash
 
 from auth import login_required
-from db import get_db_connection
-from utils import safe_float, calc_from_100g
+from db import get_db
+from utils import DATE_BUCKETS, safe_float, calc_from_100g
 
 # Productinfo ophalen via barcode uit Open Food Facts (externe API).
 # API docs: https://openfoodfacts.github.io/openfoodfacts-server/api/
 from services.openfoodfacts_client import get_product_by_barcode
+from services.diary_importer import detect_format, import_diary
 
 bp = Blueprint("nutrition", __name__)
 
+# Periode-overzicht (/api/nutrition/summary)
+DEFAULT_RANGE_DAYS = 30
+MAX_RANGE_DAYS = 366
+# Een dag is 'op doel' als de kcal binnen 10% van het kcal-doel ligt
+ADHERENCE_TOLERANCE = 0.10
+MACROS = ("kcal", "protein", "carbs", "fat")
+
 
 @bp.route("/nutrition/target", methods=["POST"])
 @login_required
@@ -40,7 +48,7 @@ def set_kcal_target():
         flash("Kies een realistisch kcal-doel (tussen 500 en 10.000).")
         return redirect(next_url) if next_url else redirect(url_for("dashboard.home"))
 
-    conn = get_db_connection()
+    conn = get_db()
     conn.execute(
         """
         INSERT INTO daily_targets (user_id, kcal_target)
@@ -54,7 +62,6 @@ def set_kcal_target():
     # Dit is een 'upsert': als het record al bestaat, wordt het bijgewerkt.
     # Bron (SQLite upsert): https://sqlite.org/lang_upsert.html
     conn.commit()
-    conn.close()
 
 # flash = korte melding voor de gebruiker (feedback in de UI)
     # Bron: https://flask.palletsprojects.com/en/stable/patterns/flashing/
@@ -75,9 +82,9 @@ def food_search():
 # Barcode check: Open Food Facts werkt met numerieke barcodes
         if not barcode.isdigit():
             error = "Barcode moet alleen cijfers bevatten."
-            # API call: product ophalen op barcode
         else:
-            product = get_product_by_barcode(barcode)
+            # Eerst uit de eigen foods-tabel, anders via de API
+            product = get_product_by_barcode(barcode, get_db())
             if product is None:
                 error = "Product niet gevonden (of API tijdelijk niet bereikbaar)."
 
@@ -112,6 +119,13 @@ def food_log():
         flash("Vul een geldige hoeveelheid in (gram).")
         return redirect(url_for("nutrition.food_search"))
 
+    # Alleen geldige datums opslaan (dagoverzicht en periode-overzicht rekenen ermee)
+    try:
+        log_date = date.fromisoformat(log_date).isoformat()
+    except ValueError:
+        flash("Datum moet een geldige datum zijn (JJJJ-MM-DD).")
+        return redirect(url_for("nutrition.food_search"))
+
     # per 100g waarden (van API) -> omrekenen naar jouw grams
     kcal_100 = safe_float(request.form.get("kcal_per_100"), default=0.0)
     p_100 = safe_float(request.form.get("protein_per_100"), default=0.0)
@@ -124,12 +138,13 @@ def food_log():
     carbs = calc_from_100g(c_100, grams)
     fat = calc_from_100g(f_100, grams)
 
-    conn = get_db_connection()
+    conn = get_db()
 
     # Optioneel: product cachen in foods (per 100g), zodat je het later kunt hergebruiken
+    # RETURNING id: het id komt direct terug (ook bij een update), geen extra SELECT
     food_id = None
     if api_id:
-        conn.execute(
+        row = conn.execute(
             """
             INSERT INTO foods (api_source, api_id, name, kcal_per_100, protein_per_100, carbs_per_100, fat_per_100)
             VALUES (?, ?, ?, ?, ?, ?, ?)
@@ -139,13 +154,9 @@ def food_log():
               protein_per_100=excluded.protein_per_100,
               carbs_per_100=excluded.carbs_per_100,
               fat_per_100=excluded.fat_per_100
+            RETURNING id
             """,
             (api_source, api_id, name, kcal_100, p_100, c_100, f_100),
-        )
-
-        row = conn.execute(
-            "SELECT id FROM foods WHERE api_source = ? AND api_id = ?",
-            (api_source, api_id),
         ).fetchone()
         if row:
             food_id = row["id"]
@@ -159,7 +170,6 @@ def food_log():
         (user_id, log_date, food_id, name, grams, kcal, protein, carbs, fat),
     )
     conn.commit()
-    conn.close()
 
     flash("Voeding toegevoegd!")
     return redirect(url_for("nutrition.nutrition_day", day=log_date))
@@ -177,7 +187,7 @@ def nutrition_today():
 def nutrition_day(day):
     """Dagoverzicht: alle logs + totalen + resterend t.o.v. kcal-doel."""
     user_id = session["user_id"]
-    conn = get_db_connection()
+    conn = get_db()
 
 # Alle logs van deze dag ophalen
     logs = conn.execute(
@@ -190,16 +200,18 @@ def nutrition_day(day):
         (user_id, day),
     ).fetchall()
 
-# Totalen berekenen (COALESCE zorgt dat je 0 krijgt i.p.v. NULL)
+# Totalen uit de dagtotalen-tabel (1 lookup, bijgehouden door triggers).
+# De LEFT JOIN geeft altijd 1 rij; COALESCE zorgt dat je 0 krijgt i.p.v. NULL
     totals = conn.execute(
         """
         SELECT
-          COALESCE(SUM(kcal), 0) AS kcal,
-          COALESCE(SUM(protein), 0) AS protein,
-          COALESCE(SUM(carbs), 0) AS carbs,
-          COALESCE(SUM(fat), 0) AS fat
-        FROM food_logs
-        WHERE user_id = ? AND log_date = ?
+          COALESCE(ROUND(t.kcal, 2), 0) AS kcal,
+          COALESCE(ROUND(t.protein, 2), 0) AS protein,
+          COALESCE(ROUND(t.carbs, 2), 0) AS carbs,
+          COALESCE(ROUND(t.fat, 2), 0) AS fat
+        FROM (SELECT 1)
+        LEFT JOIN daily_nutrition_totals t
+          ON t.user_id = ? AND t.log_date = ?
         """,
         (user_id, day),
     ).fetchone()
@@ -218,8 +230,6 @@ def nutrition_day(day):
     kcal_target = float(target["kcal_target"]) if target else 0.0
     remaining = round(kcal_target - float(totals["kcal"]), 2) if totals else kcal_target
 
-    conn.close()
-
     return render_template(
         "nutrition_day.html",
         day=day,
@@ -235,27 +245,196 @@ def nutrition_day(day):
 def food_log_delete(log_id):
     """Verwijdert 1 voedsel-log en gaat terug naar dezelfde dag."""
     user_id = session["user_id"]
-    conn = get_db_connection()
+    conn = get_db()
 
-# Eerst checken of deze log bij deze user hoort
+# Alleen verwijderen als deze log bij deze user hoort;
+# RETURNING geeft de dag terug (geen aparte SELECT vooraf nodig)
     row = conn.execute(
-        "SELECT log_date FROM food_logs WHERE id = ? AND user_id = ?",
+        "DELETE FROM food_logs WHERE id = ? AND user_id = ? RETURNING log_date",
         (log_id, user_id),
     ).fetchone()
+    conn.commit()
 
     if row is None:
-        conn.close()
         flash("Log niet gevonden.")
         return redirect(url_for("nutrition.nutrition_today"))
 
     log_date = row["log_date"]
 
-    conn.execute(
-        "DELETE FROM food_logs WHERE id = ? AND user_id = ?",
-        (log_id, user_id),
-    )
-    conn.commit()
-    conn.close()
-
     flash("Log verwijderd.")
     return redirect(url_for("nutrition.nutrition_day", day=log_date))
+
+
+@bp.route("/food/import", methods=["POST"])
+@login_required
+def food_import():
+    """
+    Importeert een voedingsdagboek (CSV, NDJSON of JSON-array).
+    - Formulier met bestand (veld 'file') -> melding + terug naar voeding
+    - Ruwe body (bijv. curl --data-binary @dagboek.csv) -> JSON-resultaat
+    Het bestand wordt in stukjes verwerkt, dus ook grote exports passen.
+    """
+    user_id = session["user_id"]
+    upload = request.files.get("file")
+
+    if upload is not None:
+        fmt = request.form.get("format") or detect_format(upload.filename, upload.mimetype)
+        stream = upload.stream
+    else:
+        fmt = request.args.get("format") or detect_format(content_type=request.content_type)
+        stream = request.stream
+
+    try:
+        result = import_diary(get_db(), user_id, stream, fmt)
+    except (ValueError, UnicodeDecodeError) as e:
+        if upload is None:
+            return {"error": f"Import mislukt: {e}"}, 400
+        flash(f"Import mislukt: {e}")
+        return redirect(url_for("nutrition.food_search"))
+
+    if result.aborted is not None:
+        # Bestand halverwege onleesbaar: wat ervoor stond is al opgeslagen.
+        # Niet het hele bestand opnieuw importeren, alleen het deel na rows_read.
+        if result.inserted:
+            message = (
+                f"Import afgebroken na {result.rows_read} regels: {result.aborted}. "
+                f"{result.inserted} regels zijn wel geïmporteerd; importeer alleen het deel daarna opnieuw."
+            )
+        else:
+            message = f"Import mislukt: {result.aborted}"
+        if upload is None:
+            return {"error": message, **result.as_dict()}, 400
+        flash(message)
+        return redirect(url_for("nutrition.food_search"))
+
+    if upload is None:
+        return result.as_dict()
+
+    flash(f"{result.inserted} regels geïmporteerd, {result.skipped} overgeslagen.")
+    for line, error in result.errors[:5]:
+        flash(f"Regel {line}: {error}")
+    return redirect(url_for("nutrition.food_search"))
+
+
+def _period_end(start: date, group: str) -> date:
+    """Laatste dag van de dag/week/maand die op `start` begint."""
+    if group == "day":
+        return start
+    if group == "week":
+        return start + timedelta(days=6)
+    next_month = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return next_month - timedelta(days=1)
+
+
+def _summary(sums: dict, days: int, days_logged: int, days_on_target: int, target: dict | None) -> dict:
+    """Totalen, gemiddelde per gelogde dag en therapietrouw t.o.v. het doel."""
+    averages = {k: round(sums[k] / days_logged, 1) if days_logged else 0.0 for k in MACROS}
+    adherence = None
+    if target:
+        adherence = {
+            "days_on_target": days_on_target,
+            "pct_days_on_target": round(100 * days_on_target / days_logged, 1) if days_logged else 0.0,
+        }
+        # Gemiddelde als % van het doel (100 = precies op doel)
+        for k in MACROS:
+            if target[k]:
+                adherence[f"{k}_pct"] = round(100 * averages[k] / target[k], 1)
+    return {
+        "days": days,
+        "days_logged": days_logged,
+        "totals": {k: round(sums[k], 1) for k in MACROS},
+        "averages": averages,
+        "adherence": adherence,
+    }
+
+
+@bp.route("/api/nutrition/summary")
+@login_required
+def api_nutrition_summary():
+    """
+    Kcal/macro's per dag, week of maand voor een periode, in 1 gegroepeerde query
+    op daily_nutrition_totals (1 rij per dag, bijgehouden door triggers).
+    - group=day|week|month (week start op maandag)
+    - start/end (YYYY-MM-DD), standaard de laatste 30 dagen; maximaal 366 dagen
+    Alleen periodes met logs staan in 'periods'; 'overall' is de hele range.
+    Met ETag: een ongewijzigd overzicht kost de browser alleen een 304.
+    """
+    user_id = session["user_id"]
+    group = request.args.get("group", "day")
+    if group not in DATE_BUCKETS:
+        return {"error": "group moet day, week of month zijn."}, 400
+
+    try:
+        end = date.fromisoformat(request.args["end"]) if request.args.get("end") else date.today()
+        start = (
+            date.fromisoformat(request.args["start"]) if request.args.get("start")
+            else end - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+        )
+    except ValueError:
+        return {"error": "start en end moeten datums zijn (YYYY-MM-DD)."}, 400
+    if start > end:
+        return {"error": "start moet voor end liggen."}, 400
+    if (end - start).days + 1 > MAX_RANGE_DAYS:
+        return {"error": f"Maximaal {MAX_RANGE_DAYS} dagen per keer."}, 400
+
+    conn = get_db()
+    row = conn.execute(
+        "SELECT kcal_target, protein_target, carbs_target, fat_target FROM daily_targets WHERE user_id = ?",
+        (user_id,),
+    ).fetchone()
+    target = dict(zip(MACROS, row)) if row else None
+
+    # ABS(...) <= ... is 1 of 0 in SQLite, dus SUM telt de dagen op doel
+    rows = conn.execute(
+        f"""
+        SELECT {DATE_BUCKETS[group]} AS period,
+               COUNT(*) AS days_logged,
+               SUM(kcal) AS kcal, SUM(protein) AS protein, SUM(carbs) AS carbs, SUM(fat) AS fat,
+               SUM(ABS(kcal - :kcal_target) <= :kcal_target * :tolerance) AS days_on_target
+        FROM daily_nutrition_totals
+        WHERE user_id = :user_id AND log_date BETWEEN :start AND :end
+        GROUP BY 1
+        ORDER BY 1
+        """,
+        {
+            "user_id": user_id,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "kcal_target": target["kcal"] if target else None,
+            "tolerance": ADHERENCE_TOLERANCE,
+        },
+    ).fetchall()
+
+    periods = []
+    overall = dict.fromkeys(MACROS, 0.0)
+    logged_total = on_target_total = 0
+    for r in rows:
+        # Oude rijen met een ongeldige datum: date() geeft NULL, of (per dag) de ruwe tekst
+        try:
+            period_start = date.fromisoformat(r["period"])
+        except (TypeError, ValueError):
+            continue
+        # Eerste/laatste week of maand kan buiten de range vallen: alleen dagen binnen de range tellen
+        days = (min(_period_end(period_start, group), end) - max(period_start, start)).days + 1
+        sums = {k: r[k] for k in MACROS}
+        on_target = r["days_on_target"] or 0
+        periods.append({"period": r["period"], **_summary(sums, days, r["days_logged"], on_target, target)})
+
+        for k in MACROS:
+            overall[k] += sums[k]
+        logged_total += r["days_logged"]
+        on_target_total += on_target
+
+    resp = jsonify({
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "group": group,
+        "target": target,
+        "periods": periods,
+        "overall": _summary(overall, (end - start).days + 1, logged_total, on_target_total, target),
+    })
+    # Kort bewaren in de browser; daarna opnieuw vragen met If-None-Match
+    # Bron: https://developer.mozilla.org/en-US/docs/Web/HTTP/Headers/ETag
+    resp.headers["Cache-Control"] = "private, max-age=60"
+    resp.add_etag()
+    return resp.make_conditional(request)
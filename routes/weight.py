@@ -1,12 +1,70 @@
+from datetime import date
+
 from flask import Blueprint, render_template, request, session, redirect, url_for, flash
 
 # login_required zorgt ervoor dat alleen ingelogde gebruikers
 # hun gewicht kunnen bekijken en opslaan
 from auth import login_required
-from db import get_db_connection
+from db import get_db
+from utils import DATE_BUCKETS, lttb
+from services.weight_trends import get_trends
 
 bp = Blueprint("weight", __name__)
 
+# Aantal regels per pagina in de geschiedenis-tabel
+PAGE_SIZE = 50
+# Maximaal aantal punten in een grafiek-reeks (payload blijft begrensd)
+MAX_POINTS = 200
+MAX_POINTS_LIMIT = 1000
+
+# Buckets voor de grafiek (per week start op maandag)
+BUCKETS = {key: DATE_BUCKETS[key] for key in ("week", "month")}
+
+
+def _parse_date(value: str | None) -> str | None:
+    """Geeft een ISO-datum terug, of None als de waarde leeg of ongeldig is."""
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        return None
+
+
+def _history_page(conn, user_id: int, before: str | None, before_id: int | None, limit: int):
+    """
+    Keyset-paginatie: 'geef de metingen ouder dan (before, before_id)'.
+    In tegenstelling tot OFFSET blijft dit even snel op pagina 1 als op pagina 100,
+    omdat de index (user_id, log_date) direct op de juiste plek begint.
+    Bron: https://use-the-index-luke.com/no-offset
+    """
+    if before is None:
+        rows = conn.execute(
+            "SELECT id, log_date, weight "
+            "FROM weight_logs "
+            "WHERE user_id = ? "
+            "ORDER BY log_date DESC, id DESC "
+            "LIMIT ?",
+            (user_id, limit + 1),
+        ).fetchall()
+    else:
+        rows = conn.execute(
+            "SELECT id, log_date, weight "
+            "FROM weight_logs "
+            "WHERE user_id = ? AND (log_date, id) < (?, ?) "
+            "ORDER BY log_date DESC, id DESC "
+            "LIMIT ?",
+            (user_id, before, before_id if before_id is not None else 2**62, limit + 1),
+        ).fetchall()
+
+    # 1 extra rij opgehaald om te weten of er nog een volgende pagina is
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more:
+        next_cursor = {"before": rows[-1]["log_date"], "before_id": rows[-1]["id"]}
+    return rows, next_cursor
+
 
 @bp.route("/weight", methods=["GET", "POST"])
 @login_required
@@ -23,6 +81,12 @@ def weight():
         if not log_date or not weight_val:
             flash("Vul datum en gewicht in.")
             return redirect(url_for("weight.weight"))
+
+        # Alleen geldige datums opslaan (trend en grafiek rekenen ermee)
+        log_date = _parse_date(log_date)
+        if log_date is None:
+            flash("Datum moet een geldige datum zijn (JJJJ-MM-DD).")
+            return redirect(url_for("weight.weight"))
 # Gewicht omzetten naar float zodat we ermee kunnen rekenen
         try:
             weight_float = float(weight_val)
@@ -31,28 +95,168 @@ def weight():
             return redirect(url_for("weight.weight"))
 
 # Gewicht opslaan in de database
-        conn = get_db_connection()
+        conn = get_db()
         conn.execute(
             "INSERT INTO weight_logs (user_id, log_date, weight) VALUES (?, ?, ?)",
             (user_id, log_date, weight_float),
         )
         conn.commit()
-        conn.close()
 
  # Feedback aan de gebruiker
  # Bron: https://flask.palletsprojects.com/en/stable/patterns/flashing/
         flash("Gewicht opgeslagen!")
         return redirect(url_for("weight.weight"))
 
-    conn = get_db_connection()
-    logs = conn.execute(
-        "SELECT log_date, weight "
-        "FROM weight_logs "
-        "WHERE user_id = ? "
-        "ORDER BY log_date DESC",
-        (user_id,),
-    ).fetchall()
-    conn.close()
-    
+# Alleen 1 pagina van de geschiedenis; de grafiek haalt zelf een
+# (verkleinde) reeks op via /api/weight/series
+    before = _parse_date(request.args.get("before"))
+    before_id = request.args.get("before_id", type=int)
+    conn = get_db()
+    logs, next_cursor = _history_page(conn, user_id, before, before_id, PAGE_SIZE)
+
+# Trend (EMA, tempo, projectie): uit de cache, alleen na een nieuwe meting opnieuw berekend
+    trends = get_trends(conn, user_id)
+
 # Logs tonen in het template
-    return render_template("weight.html", logs=logs)
+    return render_template(
+        "weight.html",
+        logs=logs,
+        next_cursor=next_cursor,
+        is_first_page=before is None,
+        trends=trends,
+    )
+
+
+@bp.route("/weight/goal", methods=["POST"])
+@login_required
+def weight_goal():
+    """Slaat het doelgewicht op (leeg = doel verwijderen)."""
+    user_id = session["user_id"]
+    value = request.form.get("goal_weight", "").strip().replace(",", ".")
+    conn = get_db()
+
+    if not value:
+        conn.execute("DELETE FROM weight_goals WHERE user_id = ?", (user_id,))
+        conn.commit()
+        flash("Doelgewicht verwijderd.")
+        return redirect(url_for("weight.weight"))
+
+    try:
+        goal = float(value)
+    except ValueError:
+        flash("Doelgewicht moet een getal zijn (bijv. 75.0).")
+        return redirect(url_for("weight.weight"))
+    if goal < 30 or goal > 300:
+        flash("Kies een realistisch doelgewicht (tussen 30 en 300 kg).")
+        return redirect(url_for("weight.weight"))
+
+# Upsert: 1 doel per gebruiker; de trigger gooit de trend-cache weg
+    conn.execute(
+        "INSERT INTO weight_goals (user_id, goal_weight) VALUES (?, ?) "
+        "ON CONFLICT(user_id) DO UPDATE SET goal_weight = excluded.goal_weight, "
+        "updated_at = CURRENT_TIMESTAMP",
+        (user_id, goal),
+    )
+    conn.commit()
+    flash("Doelgewicht opgeslagen!")
+    return redirect(url_for("weight.weight"))
+
+
+@bp.route("/api/weight/trends")
+@login_required
+def api_weight_trends():
+    """Trendgewicht, tempo per week, projectie naar het doel en plateau (zie services/weight_trends.py)."""
+    return get_trends(get_db(), session["user_id"])
+
+
+@bp.route("/api/weight/logs")
+@login_required
+def api_weight_logs():
+    """Geschiedenis als JSON, per pagina (keyset via before + before_id)."""
+    user_id = session["user_id"]
+    limit = min(max(request.args.get("limit", PAGE_SIZE, type=int), 1), 500)
+    before = _parse_date(request.args.get("before"))
+    before_id = request.args.get("before_id", type=int)
+
+    rows, next_cursor = _history_page(get_db(), user_id, before, before_id, limit)
+    return {
+        "results": [
+            {"id": r["id"], "log_date": r["log_date"], "weight": r["weight"]} for r in rows
+        ],
+        "next": next_cursor,
+    }
+
+
+@bp.route("/api/weight/series")
+@login_required
+def api_weight_series():
+    """
+    Reeks voor de grafiek, met maximaal max_points punten.
+    - resolution=raw: alle metingen, verkleind met LTTB als het er te veel zijn
+    - resolution=week/month: gemiddelde per week of maand (in SQL)
+    Optioneel: from/to (YYYY-MM-DD, ook als start/end) om een periode te kiezen.
+    De periode zit in de WHERE, zodat SQLite via de index (user_id, log_date)
+    alleen die metingen leest; LTTB verkleint daarna alleen wat overblijft.
+    """
+    user_id = session["user_id"]
+    resolution = request.args.get("resolution", "raw")
+    max_points = min(max(request.args.get("max_points", MAX_POINTS, type=int), 3), MAX_POINTS_LIMIT)
+
+    if resolution != "raw" and resolution not in BUCKETS:
+        return {"error": "resolution moet raw, week of month zijn."}, 400
+
+    # Een ongeldige datum niet negeren: dat zou stilletjes de hele geschiedenis ophalen
+    window = {}
+    for key, alias in (("from", "start"), ("to", "end")):
+        value = request.args.get(key) or request.args.get(alias)
+        if value:
+            window[key] = _parse_date(value)
+            if window[key] is None:
+                return {"error": f"{key} moet een datum zijn (JJJJ-MM-DD)."}, 400
+    if "from" in window and "to" in window and window["from"] > window["to"]:
+        return {"error": "from moet voor to liggen."}, 400
+
+    where = "WHERE user_id = ?"
+    params = [user_id]
+    if "from" in window:
+        where += " AND log_date >= ?"
+        params.append(window["from"])
+    if "to" in window:
+        where += " AND log_date <= ?"
+        params.append(window["to"])
+
+    conn = get_db()
+    if resolution == "raw":
+        rows = conn.execute(
+            "SELECT log_date, weight "
+            f"FROM weight_logs {where} "
+            "ORDER BY log_date ASC",
+            params,
+        ).fetchall()
+    else:
+        bucket = BUCKETS[resolution]
+        rows = conn.execute(
+            f"SELECT {bucket} AS log_date, ROUND(AVG(weight), 2) AS weight "
+            f"FROM weight_logs {where} "
+            "GROUP BY 1 "
+            "ORDER BY 1 ASC",
+            params,
+        ).fetchall()
+
+    # x = dagnummer, zodat LTTB rekening houdt met gaten tussen metingen
+    points = []
+    for r in rows:
+        try:
+            points.append((date.fromisoformat(r["log_date"]).toordinal(), float(r["weight"])))
+        except (TypeError, ValueError):
+            continue
+
+    sampled = lttb(points, max_points)
+    return {
+        "resolution": resolution,
+        "from": window.get("from"),
+        "to": window.get("to"),
+        "total_points": len(points),
+        "labels": [date.fromordinal(int(x)).isoformat() for x, _ in sampled],
+        "data": [round(y, 2) for _, y in sampled],
+    }
@@ -1,8 +1,12 @@
+import gzip
+import json
 import sqlite3
-from flask import Blueprint, render_template, request, session, redirect, url_for, flash
+import threading
+from flask import Blueprint, Response, render_template, request, session, redirect, url_for, flash
 
 from auth import login_required
-from db import get_db_connection
+from db import get_db
+from services.exercise_stats import get_exercise_stats, record_exercise
 
 bp = Blueprint("workouts", __name__)
 
@@ -25,7 +29,7 @@ def workouts():
             return redirect(url_for("workouts.workouts"))
 
 # Workout opslaan in de database
-        conn = get_db_connection()
+        conn = get_db()
         cur = conn.execute(
             "INSERT INTO workouts (user_id, workout_date, workout_type, notes) "
             "VALUES (?, ?, ?, ?)",
@@ -33,12 +37,11 @@ def workouts():
         )
         conn.commit()
         workout_id = cur.lastrowid
-        conn.close()
 
         flash("Workout aangemaakt! Voeg nu oefeningen toe.")
         return redirect(url_for("workouts.workout_detail", workout_id=workout_id))
 
-    conn = get_db_connection()
+    conn = get_db()
     recent = conn.execute(
         "SELECT id, workout_date, workout_type, notes "
         "FROM workouts "
@@ -47,16 +50,118 @@ def workouts():
         "LIMIT 20",
         (user_id,),
     ).fetchall()
-    conn.close()
 
     return render_template("workouts.html", recent=recent)
 
 
+def _catalog_version(conn) -> int:
+    row = conn.execute(
+        "SELECT version FROM catalog_versions WHERE name = 'exercises'"
+    ).fetchone()
+    return int(row["version"]) if row else 0
+
+
+# Laatst opgebouwde catalogus per worker: {"version", "json", "gzip"}
+_catalog_cache = {}
+_catalog_lock = threading.Lock()
+
+
+def _catalog_body(conn, version: int) -> dict:
+    """JSON (+ gzip) van de catalogus; alleen opnieuw opbouwen bij een nieuwe versie."""
+    global _catalog_cache
+
+    cached = _catalog_cache
+    if cached.get("version") == version:
+        return cached
+
+    with _catalog_lock:
+        if _catalog_cache.get("version") == version:
+            return _catalog_cache
+
+        rows = conn.execute(
+            "SELECT id, name, muscle_group, equipment FROM exercises ORDER BY name"
+        ).fetchall()
+        body = json.dumps(
+            {
+                "version": version,
+                "results": [
+                    {
+                        "id": r["id"],
+                        "name": r["name"],
+                        "muscle_group": r["muscle_group"],
+                        "equipment": r["equipment"],
+                    }
+                    for r in rows
+                ],
+            },
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+        _catalog_cache = {
+            "version": version,
+            "json": body,
+            "gzip": gzip.compress(body, compresslevel=6),
+        }
+        return _catalog_cache
+
+
+@bp.route("/api/exercises/catalog")
+@login_required
+def api_exercises_catalog():
+    """
+    De hele oefeningen-catalogus als JSON, met caching:
+    - ETag = catalogusversie: ongewijzigd -> 304 zonder body
+    - ?v=<versie> in de URL: de browser mag hem lang bewaren (immutable)
+    - gzip als de browser dat ondersteunt
+    Bron: https://developer.mozilla.org/en-US/docs/Web/HTTP/Caching
+    """
+    conn = get_db()
+    version = _catalog_version(conn)
+    etag = f"exercises-v{version}"
+
+    if request.args.get("v", type=int) == version:
+        cache_control = "private, max-age=31536000, immutable"
+    else:
+        cache_control = "private, no-cache"
+
+    if etag in request.if_none_match:
+        resp = Response(status=304)
+    else:
+        cached = _catalog_body(conn, version)
+        if "gzip" in request.headers.get("Accept-Encoding", ""):
+            resp = Response(cached["gzip"], mimetype="application/json")
+            resp.headers["Content-Encoding"] = "gzip"
+        else:
+            resp = Response(cached["json"], mimetype="application/json")
+
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = cache_control
+    resp.vary.add("Accept-Encoding")
+    return resp
+
+
+@bp.route("/api/exercises/stats")
+@login_required
+def api_exercise_stats():
+    """Records en volume per oefening van de ingelogde gebruiker (uit exercise_stats)."""
+    return {"results": get_exercise_stats(get_db(), session["user_id"])}
+
+
+@bp.route("/api/exercises/<int:exercise_id>/stats")
+@login_required
+def api_exercise_stats_one(exercise_id):
+    """Records, volume en de laatste 2 keer voor 1 oefening."""
+    stats = get_exercise_stats(get_db(), session["user_id"], exercise_id)
+    if not stats:
+        return {"error": "Deze oefening is nog niet gedaan."}, 404
+    return stats[0]
+
+
 @bp.route("/workouts/<int:workout_id>")
 @login_required
 def workout_detail(workout_id):
     user_id = session["user_id"]
-    conn = get_db_connection()
+    conn = get_db()
 
 # Workout ophalen en checken of deze bij de user hoort
     workout = conn.execute(
@@ -67,30 +172,35 @@ def workout_detail(workout_id):
     ).fetchone()
 
     if workout is None:
-        conn.close()
         flash("Workout niet gevonden.")
         return redirect(url_for("workouts.workouts"))
 
- # Alle oefeningen ophalen voor de dropdown / zoekfunctie
-    exercises = conn.execute(
-        "SELECT id, name FROM exercises ORDER BY name"
-    ).fetchall()
+# Niet de hele catalogus meesturen: de pagina haalt die zelf op via
+# /api/exercises/catalog (browser-cache). Hier alleen het versienummer.
+    catalog_version = _catalog_version(conn)
 
-# Oefeningen die al aan deze workout gekoppeld zijn (koppeltabel + JOIN)
+# Oefeningen die al aan deze workout gekoppeld zijn (koppeltabel + JOIN),
+# met de records uit exercise_stats (1 lookup per oefening via de primary key).
+# "Vorige keer" = de laatste keer, of de keer daarvoor als dat deze workout is.
     items = conn.execute(
-        "SELECT we.id, e.name, we.sets, we.reps, we.weight "
+        "SELECT we.id, e.name, we.sets, we.reps, we.weight, "
+        "s.best_e1rm, s.heaviest_weight, s.heaviest_reps, "
+        "CASE WHEN s.last_workout_id = we.workout_id THEN s.prev_date ELSE s.last_date END AS previous_date, "
+        "CASE WHEN s.last_workout_id = we.workout_id THEN s.prev_sets ELSE s.last_sets END AS previous_sets, "
+        "CASE WHEN s.last_workout_id = we.workout_id THEN s.prev_reps ELSE s.last_reps END AS previous_reps, "
+        "CASE WHEN s.last_workout_id = we.workout_id THEN s.prev_weight ELSE s.last_weight END AS previous_weight "
         "FROM workout_exercises we "
         "JOIN exercises e ON e.id = we.exercise_id "
+        "LEFT JOIN exercise_stats s ON s.user_id = ? AND s.exercise_id = we.exercise_id "
         "WHERE we.workout_id = ? "
         "ORDER BY we.id ASC",
-        (workout_id,),
+        (user_id, workout_id),
     ).fetchall()
 
-    conn.close()
     return render_template(
         "workout_detail.html",
         workout=workout,
-        exercises=exercises,
+        catalog_version=catalog_version,
         items=items,
     )
 
@@ -120,56 +230,138 @@ def workout_add_exercise(workout_id):
         flash("Sets/reps moeten hele getallen zijn, gewicht een getal.")
         return redirect(url_for("workouts.workout_detail", workout_id=workout_id))
 
-    conn = get_db_connection()
+    conn = get_db()
 
-# Extra check: hoort deze workout wel bij deze user?
-    ok = conn.execute(
-        "SELECT 1 FROM workouts WHERE id = ? AND user_id = ?",
+# Extra check: hoort deze workout wel bij deze user? (datum is nodig voor de stats)
+    workout = conn.execute(
+        "SELECT workout_date FROM workouts WHERE id = ? AND user_id = ?",
         (workout_id, user_id),
     ).fetchone()
 
-    if ok is None:
-        conn.close()
+    if workout is None:
         flash("Geen toegang tot deze workout.")
         return redirect(url_for("workouts.workouts"))
 
-# Nieuwe oefening toevoegen aan koppeltabel workout_exercises
+# Nieuwe oefening toevoegen aan koppeltabel workout_exercises,
+# en in dezelfde transactie de records/volume in exercise_stats bijwerken
     try:
         conn.execute(
             "INSERT INTO workout_exercises (workout_id, exercise_id, sets, reps, weight) "
             "VALUES (?, ?, ?, ?, ?)",
             (workout_id, int(exercise_id), sets_int, reps_int, weight_float),
         )
+        record_exercise(
+            conn, user_id, int(exercise_id), workout_id, workout["workout_date"],
+            sets_int, reps_int, weight_float,
+        )
         conn.commit()
     except sqlite3.IntegrityError:
+        conn.rollback()
         # Dit gebeurt o.a. door UNIQUE(workout_id, exercise_id)
         flash("Deze oefening staat al in deze workout. Pas de bestaande aan of kies een andere.")
-    finally:
-        conn.close()
 
     return redirect(url_for("workouts.workout_detail", workout_id=workout_id))
 
 
+# Wordt bij de eerste zoekopdracht ingevuld (True/False)
+_FTS_AVAILABLE = None
+
+
+def _fts_available(conn) -> bool:
+    """Bestaat de FTS5-zoekindex? (1x per worker opgezocht)"""
+    global _FTS_AVAILABLE
+    if _FTS_AVAILABLE is None:
+        _FTS_AVAILABLE = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'exercises_fts'"
+        ).fetchone() is not None
+    return _FTS_AVAILABLE
+
+
+def _fts_query(words: list[str]) -> str:
+    """
+    Bouwt een FTS5 MATCH-expressie: elk woord als "phrase" (alle woorden moeten
+    voorkomen). Dubbele quotes worden ge-escaped door ze te verdubbelen.
+    Bron: https://www.sqlite.org/fts5.html#full_text_query_syntax
+    """
+    return " ".join('"' + w.replace('"', '""') + '"' for w in words)
+
+
+def _like_escape(value: str) -> str:
+    # % en _ letterlijk zoeken i.p.v. als wildcard
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
 @bp.route("/api/exercises")
 @login_required
 def api_exercises():
+    """
+    Zoeken in de oefeningen-catalogus (voor de zoekbalk op workout_detail).
+    - q: zoekterm (naam, spiergroep of materiaal)
+    - muscle_group / equipment: optionele filters (exacte waarde)
+    Resultaten die met de zoekterm beginnen komen eerst, daarna op relevantie.
+    """
     q = request.args.get("q", "").strip()
-    limit = 25
+    muscle_group = request.args.get("muscle_group", "").strip() or None
+    equipment = request.args.get("equipment", "").strip() or None
+    limit = min(max(request.args.get("limit", 25, type=int), 1), 50)
+
+    conn = get_db()
+    params = {
+        "muscle_group": muscle_group,
+        "equipment": equipment,
+        "prefix": _like_escape(q) + "%",
+        "limit": limit,
+    }
+    filters = (
+        "(:muscle_group IS NULL OR e.muscle_group = :muscle_group COLLATE NOCASE) "
+        "AND (:equipment IS NULL OR e.equipment = :equipment COLLATE NOCASE) "
+    )
+
+    # Trigram-index werkt met stukjes van 3 tekens: kortere woorden via LIKE
+    words = q.split()
+    long_words = [w for w in words if len(w) >= 3]
+    use_fts = bool(long_words) and _fts_available(conn)
+    like_words = [w for w in words if len(w) < 3] if use_fts else words
 
-    conn = get_db_connection()
+    for i, w in enumerate(like_words):
+        params[f"word{i}"] = "%" + _like_escape(w) + "%"
+        filters += f"AND e.name LIKE :word{i} ESCAPE '\\' "
 
-    if not q:
+    if use_fts:
+        params["match"] = _fts_query(long_words)
+        # bm25: lager = relevanter; naam telt zwaarder dan spiergroep/materiaal
+        # Bron: https://www.sqlite.org/fts5.html#the_bm25_function
         rows = conn.execute(
-            "SELECT id, name FROM exercises ORDER BY name LIMIT ?",
-            (limit,),
+            "SELECT e.id, e.name, e.muscle_group, e.equipment "
+            "FROM exercises_fts f "
+            "JOIN exercises e ON e.id = f.rowid "
+            "WHERE exercises_fts MATCH :match "
+            "AND " + filters +
+            "ORDER BY (e.name LIKE :prefix ESCAPE '\\') DESC, "
+            "bm25(exercises_fts, 10.0, 2.0, 1.0), e.name "
+            "LIMIT :limit",
+            params,
         ).fetchall()
     else:
-        like = f"%{q}%"
+        # Korte zoekterm of geen FTS5: eenvoudige LIKE per woord
         rows = conn.execute(
-            "SELECT id, name FROM exercises WHERE name LIKE ? ORDER BY name LIMIT ?",
-            (like, limit),
+            "SELECT e.id, e.name, e.muscle_group, e.equipment "
+            "FROM exercises e "
+            "WHERE " + filters +
+            "ORDER BY (e.name LIKE :prefix ESCAPE '\\') DESC, e.name "
+            "LIMIT :limit",
+            params,
         ).fetchall()
 
-    conn.close()
     # JSON response teruggeven
-    return {"results": [{"id": r["id"], "name": r["name"]} for r in rows]}
+    return {
+        "results": [
+            {
+                "id": r["id"],
+                "name": r["name"],
+                "muscle_group": r["muscle_group"],
+                "equipment": r["equipment"],
+            }
+            for r in rows
+        ]
+    }
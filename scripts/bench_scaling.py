@@ -0,0 +1,235 @@
+# scripts/bench_scaling.py
+# Schaal-benchmark: hoe snel blijven de belangrijkste pagina's (en de SQL
+# daarachter) als de database groeit?
+# - de database wordt stap voor stap gevuld met scripts/generate_dataset.py
+# - per stap: latency per route en per SELECT-query, plus de bestandsgrootte
+# - aan het eind per route/query een groei-exponent: hoe hard stijgt de
+#   latency t.o.v. het aantal rijen (1.0 = lineair, > 1 = super-lineair)
+#
+# Voorbeeld:
+#   python scripts/bench_scaling.py --scales 100,1000,5000 --years 3
+#   python scripts/bench_scaling.py --scales 1000,10000 --json scaling.json
+#
+# Elke meting draait in een apart proces (verse app, lege connection pool).
+import argparse
+import json
+import math
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Zorg dat projectroot in PYTHONPATH zit
+sys.path.insert(0, str(ROOT))
+
+# Deze pagina's worden gemeten (route-naam -> URL, {day} = laatste logdag)
+ROUTES = {
+    "dashboard.home": "/",
+    "nutrition.nutrition_day": "/nutrition/{day}",
+    "weight.weight": "/weight",
+    "weight.api_weight_series": "/api/weight/series",
+    "workouts.workouts": "/workouts",
+}
+TABLES = ("users", "food_logs", "daily_nutrition_totals", "weight_logs", "workouts", "workout_exercises")
+
+
+def _normalize_sql(sql: str) -> str:
+    """Maakt van een statement met ingevulde waarden een herkenbaar label."""
+    sql = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    sql = re.sub(r"\b\d+(?:\.\d+)?\b", "?", sql)
+    return " ".join(sql.split())
+
+
+# ----------------
+# Meten (in een apart proces, met DATABASE_PATH op de te meten database)
+# ----------------
+
+def measure(db_path: str, samples: int, repeat: int, seed: int) -> dict:
+    os.environ["DATABASE_PATH"] = db_path
+    # Geen echte API-calls tijdens het meten (de recepten op het dashboard blijven leeg)
+    os.environ.pop("RAPIDAPI_KEY", None)
+
+    import db
+
+    # Alle statements van een request opvangen via de trace callback
+    captured = []
+    connect = db._connect
+
+    def traced_connect():
+        conn = connect()
+        conn.set_trace_callback(captured.append)
+        return conn
+
+    db._connect = traced_connect
+
+    from app import app
+
+    conn = db.get_db_connection()
+    rnd = random.Random(seed)
+    max_user = conn.execute("SELECT COALESCE(MAX(id), 0) FROM users").fetchone()[0]
+    # Willekeurige gebruikers + de gebruikers met de meeste geschiedenis
+    user_ids = {rnd.randint(1, max_user) for _ in range(samples)} if max_user else set()
+    user_ids |= {
+        r[0] for r in conn.execute(
+            "SELECT user_id FROM daily_nutrition_totals GROUP BY user_id ORDER BY COUNT(*) DESC LIMIT 3"
+        )
+    }
+
+    route_ms = {name: [] for name in ROUTES}
+    query_ms = {}
+    client = app.test_client()
+
+    for user_id in sorted(user_ids):
+        last_day = conn.execute(
+            "SELECT MAX(log_date) FROM daily_nutrition_totals WHERE user_id = ?", (user_id,)
+        ).fetchone()[0] or "2000-01-01"
+        with client.session_transaction() as s:
+            s["user_id"] = user_id
+            s["user_email"] = f"user{user_id}@example.com"
+
+        for name, url in ROUTES.items():
+            url = url.format(day=last_day)
+            client.get(url)  # warm-up (template cache, statement cache)
+            captured.clear()
+            started = time.perf_counter()
+            r = client.get(url)
+            route_ms[name].append((time.perf_counter() - started) * 1000)
+            if r.status_code >= 400:
+                raise RuntimeError(f"{url} gaf status {r.status_code}")
+
+            # Elke SELECT los nog eens timen, op een eigen connectie
+            for sql in list(captured):
+                if not sql.lstrip().upper().startswith(("SELECT", "WITH")):
+                    continue
+                timings = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    conn.execute(sql).fetchall()
+                    timings.append((time.perf_counter() - started) * 1000)
+                label = f"{name}: {_normalize_sql(sql)}"
+                query_ms.setdefault(label, []).append(statistics.median(timings))
+
+    counts = {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in TABLES}
+    conn.close()
+
+    def pct(values):
+        values = sorted(values)
+        return {
+            "p50_ms": round(statistics.median(values), 3),
+            "p95_ms": round(values[min(len(values) - 1, int(0.95 * len(values)))], 3),
+        }
+
+    return {
+        "counts": counts,
+        "routes": {k: pct(v) for k, v in route_ms.items() if v},
+        "queries": {k: pct(v) for k, v in query_ms.items() if v},
+    }
+
+
+# ----------------
+# Rapport
+# ----------------
+
+def growth_exponent(rows: list[int], ms: list[float]) -> float | None:
+    """Helling van log(latency) tegen log(rijen) tussen de kleinste en grootste stap."""
+    if len(rows) < 2 or rows[0] <= 0 or rows[-1] <= rows[0] or ms[0] <= 0 or ms[-1] <= 0:
+        return None
+    return math.log(ms[-1] / ms[0]) / math.log(rows[-1] / rows[0])
+
+
+def print_report(results: list[dict]):
+    scales = [r["users"] for r in results]
+    rows = [sum(r["counts"].values()) for r in results]
+
+    print()
+    print(f"{'gebruikers':<12}" + "".join(f"{s:>14}" for s in scales))
+    for t in TABLES:
+        print(f"{t[:12]:<12}" + "".join(f"{r['counts'][t]:>14}" for r in results))
+    print(f"{'DB (MB)':<12}" + "".join(f"{r['db_bytes'] / 1e6:>14.1f}" for r in results))
+    print(f"{'genereren s':<12}" + "".join(f"{r['generate_s']:>14.1f}" for r in results))
+
+    for section in ("routes", "queries"):
+        print(f"\n{section} (p50 ms per stap, exp = groei t.o.v. aantal rijen)")
+        labels = sorted({k for r in results for k in r[section]})
+        for label in labels:
+            ms = [r[section].get(label, {}).get("p50_ms", 0.0) for r in results]
+            exp = growth_exponent(rows, ms)
+            flag = "  <-- super-lineair" if exp is not None and exp > 1.0 else ""
+            exp_txt = f"{exp:6.2f}" if exp is not None else "     -"
+            short = label if len(label) <= 90 else label[:87] + "..."
+            print(f"  {short}")
+            print("    " + "".join(f"{m:>12.3f}" for m in ms) + f"   exp {exp_txt}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency en DB-grootte bij groeiende data")
+    parser.add_argument("--scales", default="100,1000,5000", help="aantal gebruikers per stap (oplopend)")
+    parser.add_argument("--years", type=float, default=3.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--samples", type=int, default=20, help="aantal gebruikers per meting")
+    parser.add_argument("--repeat", type=int, default=5, help="herhalingen per query")
+    parser.add_argument("--db", help="database hier bewaren i.p.v. in een tijdelijke map")
+    parser.add_argument("--json", help="resultaten ook als JSON wegschrijven")
+    parser.add_argument("--measure", help=argparse.SUPPRESS)  # intern: 1 meting doen
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.samples, args.repeat, args.seed)))
+        return
+
+    import db
+    from scripts.generate_dataset import db_size_bytes, generate
+
+    scales = sorted(int(s) for s in args.scales.split(","))
+    with tempfile.TemporaryDirectory(prefix="bench-scaling-") as tmpdir:
+        db_path = args.db or os.path.join(tmpdir, "database.db")
+        db.DB_PATH = db_path
+        results = []
+        current = 0
+
+        for step, users in enumerate(scales):
+            # De database groeit stap voor stap (alleen de nieuwe gebruikers erbij)
+            conn = db.get_db_connection()
+            conn.execute("PRAGMA synchronous = OFF;")
+            try:
+                db.migrate(conn)
+                started = time.perf_counter()
+                generate(conn, users=users - current, years=args.years, seed=args.seed + step)
+                generate_s = time.perf_counter() - started
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+            finally:
+                conn.close()
+            current = users
+
+            print(f"{users} gebruikers gegenereerd in {generate_s:.1f} s, meten...", flush=True)
+            out = subprocess.run(
+                [
+                    sys.executable, __file__, "--measure", db_path,
+                    "--samples", str(args.samples), "--repeat", str(args.repeat), "--seed", str(args.seed),
+                ],
+                cwd=ROOT,
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+            result.update(users=users, db_bytes=db_size_bytes(db_path), generate_s=round(generate_s, 1))
+            results.append(result)
+
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nJSON geschreven naar {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# scripts/check_query_budgets.py
+# Controleert per route hoeveel SQL er wordt uitgevoerd, tegen een vast budget
+# (statements, VM-stappen, dubbele queries, table scans; zie tests/query_budgets.py).
+# Draait op een tijdelijke database met een nep-dataset (generate_dataset.py).
+#
+# Gebruik (bijv. voor een deploy; exit code 1 als een route over budget gaat):
+#   python scripts/check_query_budgets.py
+#   python scripts/check_query_budgets.py -v     (ook de statements tonen)
+# Dezelfde tabel draait ook in de tests (tests/test_query_budgets.py, via pytest).
+#
+# Route aangepast? Pas het budget bewust aan in tests/query_budgets.py.
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Zorg dat projectroot in PYTHONPATH zit
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from tests.helpers import login_client, prepare_dataset, traced  # noqa: E402
+from tests.query_budgets import BUDGETS, run_budget  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Controleer SQL-budgetten per route")
+    parser.add_argument("-v", "--verbose", action="store_true", help="statements per route tonen")
+    parser.add_argument("--users", type=int, default=200, help="grootte van de nep-dataset")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.TemporaryDirectory(prefix="query-budgets-")
+    os.environ["DATABASE_PATH"] = os.path.join(tmpdir.name, "database.db")
+    os.environ["RESPONSE_CACHE_PATH"] = os.path.join(tmpdir.name, "cache.db")
+    # Geen echte API-calls (de barcode hieronder staat al in de foods-tabel)
+    os.environ.pop("RAPIDAPI_KEY", None)
+
+    from query_tracer import QueryTracer
+
+    conn, user_id, ctx = prepare_dataset(args.users)
+
+    from app import app
+
+    tracer = QueryTracer()
+    client = login_client(app, user_id)
+
+    failures = 0
+    print(f"{'route':<24} {'statements':>12} {'vm-stappen':>18}  problemen")
+    for budget in BUDGETS:
+        tracer, problems = run_budget(client, conn, budget, ctx, lambda: traced(tracer))
+        n = len(tracer.queries)
+        failures += bool(problems)
+        status = "; ".join(problems) if problems else "ok"
+        print(
+            f"{budget.name:<24} {f'{n}/{budget.statements}':>12} "
+            f"{f'{tracer.vm_steps}/{budget.vm_steps}':>18}  {status}"
+        )
+        if args.verbose:
+            for sql in tracer.queries:
+                print("    " + " ".join(sql.split())[:160])
+
+    conn.close()
+    tmpdir.cleanup()
+
+    if failures:
+        print(f"\n{failures} route(s) over budget.")
+        sys.exit(1)
+    print("\nAlle routes binnen budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# scripts/export_history.py
+# Exporteert voeding, gewicht of workouts als CSV of NDJSON (optioneel gzip).
+# Zonder gebruiker: alle gebruikers, met een kolom user_id (voor analyse).
+# De rijen worden per chunk gelezen en weggeschreven: het geheugengebruik
+# blijft gelijk, hoe groot de database ook is.
+#
+# Voorbeeld:
+#   python scripts/export_history.py food --user-email jan@example.com -o food.csv
+#   python scripts/export_history.py workouts --format ndjson --gzip -o workouts.ndjson.gz
+#   python scripts/export_history.py weight > weight.csv
+import argparse
+import sys
+from pathlib import Path
+
+# Zorg dat projectroot in PYTHONPATH zit
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import db  # noqa: E402
+from services.exporter import CHUNK_SIZE, DATASETS, FORMATS, iter_export  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Geschiedenis exporteren")
+    parser.add_argument("dataset", choices=sorted(DATASETS))
+    who = parser.add_mutually_exclusive_group()
+    who.add_argument("--user-id", type=int)
+    who.add_argument("--user-email")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="csv")
+    parser.add_argument("--gzip", action="store_true", help="gecomprimeerd (.gz)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="rijen per query")
+    parser.add_argument("-o", "--output", help="bestand (standaard: stdout)")
+    args = parser.parse_args()
+
+    user_id = args.user_id
+    if args.user_email:
+        conn = db.get_db_connection()
+        row = conn.execute(
+            "SELECT id FROM users WHERE email = ?", (args.user_email.strip().lower(),)
+        ).fetchone()
+        conn.close()
+        if row is None:
+            print("Gebruiker niet gevonden.", file=sys.stderr)
+            sys.exit(1)
+        user_id = row[0]
+
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    size = 0
+    try:
+        for data in iter_export(args.dataset, user_id, args.format, args.gzip, args.chunk_size):
+            out.write(data)
+            size += len(data)
+    finally:
+        if args.output:
+            out.close()
+
+    # Naar stderr, zodat het niet in een omgeleide stdout-export terechtkomt
+    print(f"Klaar: {size / 1024:.0f} KB ({db.DB_PATH})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+# scripts/fake_upstreams.py
+# Lokale nep-servers voor TheMealDB, ExerciseDB en Open Food Facts.
+# Bedoeld voor load tests: geen echte API-calls, geen rate limits, en wel
+# instelbare latency en foutpercentages (om timeouts/retries te testen).
+#
+# Los starten (bijv. om de app handmatig tegen de nep-API's te draaien):
+#   python scripts/fake_upstreams.py --latency-ms 80 --jitter-ms 40 --error-rate 0.02
+# De app gebruikt ze via MEALDB_BASE_URL, EXERCISEDB_BASE_URL en
+# OPENFOODFACTS_BASE_URL (de URL's worden bij het starten geprint).
+import argparse
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+MUSCLES = ["chest", "back", "upper legs", "shoulders", "upper arms", "waist", "cardio"]
+EQUIPMENT = ["barbell", "dumbbell", "cable", "body weight", "kettlebell", "machine"]
+MOVES = ["press", "row", "curl", "squat", "raise", "fly", "pulldown", "lunge", "crunch", "deadlift"]
+CATEGORIES = ["Beef", "Chicken", "Dessert", "Pasta", "Seafood", "Vegetarian"]
+AREAS = ["British", "Dutch", "Italian", "Mexican", "Thai"]
+
+# Zo groot is de nep-catalogus van ExerciseDB
+EXERCISE_COUNT = 1300
+# Aantal nep-recepten (ids 52000 t/m 52000 + MEAL_COUNT - 1)
+MEAL_COUNT = 300
+
+
+@dataclass
+class Faults:
+    """Instelbare vertraging en fouten (geldt voor alle nep-servers)."""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0      # kans op een 503
+    timeout_rate: float = 0.0    # kans dat de server 'hangt'
+    hang_s: float = 30.0         # zo lang hangt de server dan
+
+    def apply(self) -> int | None:
+        """Wacht de gesimuleerde latency af; geeft een foutcode terug of None."""
+        delay = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        roll = random.random()
+        if roll < self.timeout_rate:
+            time.sleep(self.hang_s)
+            return 504
+        if roll < self.timeout_rate + self.error_rate:
+            return 503
+        return None
+
+
+# ----------------
+# Nepdata (deterministisch: dezelfde id geeft altijd hetzelfde antwoord)
+# ----------------
+
+def fake_exercise(i: int) -> dict:
+    rnd = random.Random(i)
+    return {
+        "id": f"{i:04d}",
+        "name": f"{rnd.choice(EQUIPMENT)} {rnd.choice(MOVES)} {i}",
+        "bodyPart": rnd.choice(MUSCLES),
+        "target": rnd.choice(MUSCLES),
+        "equipment": rnd.choice(EQUIPMENT),
+    }
+
+
+def fake_meal(meal_id: int) -> dict:
+    rnd = random.Random(meal_id)
+    category = rnd.choice(CATEGORIES)
+    meal = {
+        "idMeal": str(meal_id),
+        "strMeal": f"{category} dish {meal_id}",
+        "strCategory": category,
+        "strArea": rnd.choice(AREAS),
+        "strInstructions": "Alles mengen. " * 40,
+        "strMealThumb": "",
+        "strYoutube": "",
+        "strSource": "",
+    }
+    for n in range(1, 21):
+        meal[f"strIngredient{n}"] = f"ingredient {n}" if n <= 8 else ""
+        meal[f"strMeasure{n}"] = f"{n * 10} g" if n <= 8 else ""
+    return meal
+
+
+def _all_meal_ids():
+    return range(52000, 52000 + MEAL_COUNT)
+
+
+def fake_product(barcode: str) -> dict:
+    rnd = random.Random(barcode)
+    return {
+        "status": 1,
+        "code": barcode,
+        "product": {
+            "product_name": f"Product {barcode[-4:]}",
+            "nutriments": {
+                "energy-kcal_100g": rnd.randint(20, 600),
+                "fat_100g": round(rnd.uniform(0, 40), 1),
+                "carbohydrates_100g": round(rnd.uniform(0, 80), 1),
+                "proteins_100g": round(rnd.uniform(0, 30), 1),
+            },
+        },
+    }
+
+
+# ----------------
+# Handlers
+# ----------------
+
+class _Handler(BaseHTTPRequestHandler):
+    faults: Faults = Faults()
+    protocol_version = "HTTP/1.1"  # keep-alive, net als de echte API's
+
+    def log_message(self, format, *args):
+        # Geen regel per request (dat zou de load test vertragen)
+        pass
+
+    def do_GET(self):
+        code = self.faults.apply()
+        if code is not None:
+            return self._send(code, {"message": "injected error"})
+
+        parts = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        status, body = self.route(parts.path, query)
+        self._send(status, body)
+
+    def route(self, path: str, query: dict) -> tuple[int, object]:
+        return 404, {"message": "not found"}
+
+    def _send(self, status: int, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class MealDBHandler(_Handler):
+    def route(self, path, query):
+        if path == "/search.php":
+            if "s" in query:
+                term = query["s"].lower()
+                ids = [i for i in _all_meal_ids() if term in fake_meal(i)["strMeal"].lower()]
+            else:
+                letter = query.get("f", "a")[:1].lower()
+                ids = [i for i in _all_meal_ids() if fake_meal(i)["strMeal"][0].lower() == letter]
+            return 200, {"meals": [fake_meal(i) for i in ids[:25]] or None}
+
+        if path == "/lookup.php":
+            try:
+                meal_id = int(query.get("i", ""))
+            except ValueError:
+                return 200, {"meals": None}
+            if meal_id not in _all_meal_ids():
+                return 200, {"meals": None}
+            return 200, {"meals": [fake_meal(meal_id)]}
+
+        if path == "/random.php":
+            return 200, {"meals": [fake_meal(random.choice(_all_meal_ids()))]}
+
+        return 404, {"message": "not found"}
+
+
+class ExerciseDBHandler(_Handler):
+    def route(self, path, query):
+        if path != "/exercises":
+            return 404, {"message": "not found"}
+        offset = int(query.get("offset", 0))
+        limit = int(query.get("limit", 10))
+        end = min(offset + limit, EXERCISE_COUNT)
+        return 200, [fake_exercise(i) for i in range(offset, end)]
+
+
+class OpenFoodFactsHandler(_Handler):
+    def route(self, path, query):
+        # /api/v2/product/<barcode>.json
+        prefix = "/api/v2/product/"
+        if not path.startswith(prefix) or not path.endswith(".json"):
+            return 404, {"message": "not found"}
+        barcode = path[len(prefix):-len(".json")]
+        # Barcodes die op 0 eindigen bestaan 'niet' (om misses te testen)
+        if not barcode.isdigit() or barcode.endswith("0"):
+            return 404, {"status": 0, "status_verbose": "product not found"}
+        return 200, fake_product(barcode)
+
+
+HANDLERS = {
+    "MEALDB_BASE_URL": MealDBHandler,
+    "EXERCISEDB_BASE_URL": ExerciseDBHandler,
+    "OPENFOODFACTS_BASE_URL": OpenFoodFactsHandler,
+}
+
+
+def start_fake_upstreams(faults: Faults | None = None, host: str = "127.0.0.1"):
+    """
+    Start de drie nep-servers in achtergrondthreads (elk op een vrije poort).
+    Geeft (servers, env) terug; env bevat de basis-URL's voor de app.
+    """
+    faults = faults or Faults()
+    servers = []
+    env = {}
+    for env_name, handler in HANDLERS.items():
+        # Eigen subclass per server, zodat de faults niet globaal gedeeld worden
+        cls = type(handler.__name__, (handler,), {"faults": faults})
+        server = ThreadingHTTPServer((host, 0), cls)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name=env_name, daemon=True).start()
+        servers.append(server)
+        env[env_name] = f"http://{host}:{server.server_address[1]}"
+    return servers, env
+
+
+def stop_fake_upstreams(servers):
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def add_fault_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="gemiddelde latency van de nep-API's")
+    parser.add_argument("--jitter-ms", type=float, default=20.0, help="latency +/- deze waarde (uniform)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="kans op een 503 (0-1)")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="kans dat een request blijft hangen (0-1)")
+    parser.add_argument("--hang-s", type=float, default=30.0, help="zo lang blijft een 'hangend' request hangen")
+
+
+def faults_from_args(args) -> Faults:
+    return Faults(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        hang_s=args.hang_s,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nep-servers voor TheMealDB, ExerciseDB en Open Food Facts")
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    servers, env = start_fake_upstreams(faults_from_args(args))
+    for name, url in env.items():
+        print(f"export {name}={url}")
+    print("Ctrl+C om te stoppen")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_fake_upstreams(servers)
+
+
+if __name__ == "__main__":
+    main()
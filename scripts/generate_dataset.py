@@ -0,0 +1,299 @@
+# scripts/generate_dataset.py
+# Vult een (lege of bestaande) database met nepgebruikers en jaren aan
+# geschiedenis, om te zien hoe de app zich houdt bij veel data.
+# - users, daily_targets, food_logs, weight_logs, workouts, workout_exercises
+# - 'realistische' verdeling: een paar fanatieke loggers, veel gebruikers die
+#   af en toe iets invullen en na een tijdje afhaken
+# - deterministisch: dezelfde --seed geeft dezelfde dataset
+#
+# Voorbeeld (let op: 10k x 3 jaar = miljoenen rijen en een paar GB):
+#   python scripts/generate_dataset.py --db /tmp/big.db --users 10000 --years 3
+#
+# Alle nepgebruikers kunnen inloggen als userN@example.com met wachtwoord PASSWORD.
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+# Zorg dat projectroot in PYTHONPATH zit
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import db  # noqa: E402
+from services.exercise_stats import rebuild_exercise_stats  # noqa: E402
+
+PASSWORD = "dataset-password"
+EMAIL_TEMPLATE = "user{}@example.com"
+
+# Producten waaruit de nepgebruikers kiezen (kcal, eiwit, koolh, vet per 100 g)
+FOOD_KINDS = [
+    ("Havermout", 370, 13, 60, 7),
+    ("Volkorenbrood", 240, 10, 41, 3),
+    ("Magere kwark", 60, 10, 4, 0.2),
+    ("Banaan", 90, 1, 20, 0.3),
+    ("Appel", 52, 0.3, 14, 0.2),
+    ("Kipfilet", 110, 23, 0, 1.5),
+    ("Rijst", 130, 2.7, 28, 0.3),
+    ("Pasta", 160, 6, 31, 1),
+    ("Broccoli", 34, 2.8, 7, 0.4),
+    ("Pindakaas", 590, 25, 16, 48),
+    ("Kaas 48+", 360, 25, 0, 29),
+    ("Melk halfvol", 46, 3.5, 4.8, 1.5),
+    ("Zalm", 200, 20, 0, 13),
+    ("Chips", 530, 6, 53, 33),
+    ("Chocolade", 540, 7, 55, 32),
+]
+GRAMS = [15, 30, 50, 100, 125, 150, 200, 250, 300]
+WORKOUT_TYPES = ["Kracht", "Cardio", "Full body", "Push", "Pull", "Legs"]
+
+# Batchgrootte voor executemany / commits (in gebruikers)
+USER_BATCH = 200
+
+# Deze triggers werken daily_nutrition_totals per rij bij; bij een bulk-insert
+# is 1x achteraf herberekenen veel sneller
+TOTALS_TRIGGERS = (
+    "trg_food_logs_totals_insert",
+    "trg_food_logs_totals_delete",
+    "trg_food_logs_totals_update",
+)
+
+
+def _ensure_catalogs(conn, rnd: random.Random, n_foods: int, n_exercises: int) -> tuple[list, list]:
+    """Zorgt voor genoeg producten en oefeningen om naar te verwijzen."""
+    conn.executemany(
+        "INSERT OR IGNORE INTO foods (api_source, api_id, name, kcal_per_100, protein_per_100, carbs_per_100, fat_per_100) "
+        "VALUES ('synthetic', ?, ?, ?, ?, ?, ?)",
+        (
+            (str(i), f"{name} {i}", kcal, p, c, f)
+            for i, (name, kcal, p, c, f) in ((i, rnd.choice(FOOD_KINDS)) for i in range(n_foods))
+        ),
+    )
+
+    missing = n_exercises - conn.execute("SELECT COUNT(*) FROM exercises").fetchone()[0]
+    if missing > 0:
+        conn.executemany(
+            "INSERT OR IGNORE INTO exercises (name, muscle_group, equipment) VALUES (?, ?, ?)",
+            (
+                (f"Synthetic Exercise {i}", rnd.choice(["Chest", "Back", "Legs", "Arms"]), "Barbell")
+                for i in range(missing)
+            ),
+        )
+    conn.commit()
+
+    foods = conn.execute(
+        "SELECT id, name, kcal_per_100, protein_per_100, carbs_per_100, fat_per_100 FROM foods"
+    ).fetchall()
+    exercise_ids = [r[0] for r in conn.execute("SELECT id FROM exercises")]
+    return [tuple(r) for r in foods], exercise_ids
+
+
+def _user_profile(rnd: random.Random, days: int) -> dict:
+    """Hoe actief is deze gebruiker en in welke periode?"""
+    # Scheve verdeling: de meeste gebruikers loggen weinig, een paar bijna elke dag
+    engagement = rnd.betavariate(0.8, 1.6)
+    start = rnd.randrange(days)
+    # Veel gebruikers haken af; een deel blijft tot vandaag
+    if rnd.random() < 0.4:
+        end = days
+    else:
+        end = min(days, start + int(rnd.expovariate(1 / 120)) + 7)
+    return {
+        "engagement": engagement,
+        "start": start,
+        "end": end,
+        "weight": rnd.gauss(80, 12),
+        "trend": rnd.gauss(-0.02, 0.03),  # kg per dag
+        "workouts_per_week": max(0.0, rnd.gauss(2.5, 1.5)) * engagement * 1.5,
+    }
+
+
+def _user_rows(user_id: int, first_day: date, days: int, rnd, foods, exercise_ids, workout_id: int):
+    """Genereert alle rijen voor 1 gebruiker. Geeft (food, weight, workouts, items, volgende workout_id)."""
+    p = _user_profile(rnd, days)
+    food_rows, weight_rows, workout_rows, item_rows = [], [], [], []
+    weight = p["weight"]
+
+    for offset in range(p["start"], p["end"]):
+        day = (first_day + timedelta(days=offset)).isoformat()
+        weight += p["trend"]
+
+        # Voeding: op actieve dagen 2-7 items
+        if rnd.random() < p["engagement"]:
+            for _ in range(min(7, max(2, int(rnd.gauss(4, 1.5))))):
+                food_id, name, kcal, prot, carbs, fat = rnd.choice(foods)
+                grams = rnd.choice(GRAMS)
+                f = grams / 100
+                food_rows.append((
+                    user_id, day, food_id, name, grams,
+                    round((kcal or 0) * f, 1), round((prot or 0) * f, 1),
+                    round((carbs or 0) * f, 1), round((fat or 0) * f, 1),
+                ))
+
+        # Wegen: ongeveer 1-2x per week (fanatieke gebruikers vaker)
+        if rnd.random() < p["engagement"] * 0.35:
+            weight_rows.append((user_id, day, round(weight + rnd.gauss(0, 0.4), 1)))
+
+        # Workouts met 3-6 verschillende oefeningen
+        if rnd.random() < p["workouts_per_week"] / 7:
+            workout_rows.append((workout_id, user_id, day, rnd.choice(WORKOUT_TYPES), None))
+            for exercise_id in rnd.sample(exercise_ids, k=min(len(exercise_ids), rnd.randint(3, 6))):
+                item_rows.append((
+                    workout_id, exercise_id, rnd.randint(2, 5), rnd.randint(5, 15),
+                    round(rnd.uniform(10, 120) / 2.5) * 2.5,
+                ))
+            workout_id += 1
+
+    return food_rows, weight_rows, workout_rows, item_rows, workout_id
+
+
+def generate(
+    conn,
+    users: int = 1000,
+    years: float = 3.0,
+    seed: int = 1,
+    n_foods: int = 2000,
+    n_exercises: int = 300,
+    progress=None,
+) -> dict:
+    """
+    Voegt `users` nepgebruikers toe met maximaal `years` jaar geschiedenis
+    (tot en met vandaag). Geeft het aantal toegevoegde rijen per tabel terug.
+    """
+    from werkzeug.security import generate_password_hash
+
+    from passwords import METHOD
+
+    rnd = random.Random(seed)
+    days = max(1, int(years * 365))
+    first_day = date.today() - timedelta(days=days - 1)
+    # 1 hash voor iedereen: hashen per gebruiker zou het genereren domineren.
+    # Zelfde methode als de app, anders wordt elke nepgebruiker bij de eerste login opnieuw gehasht
+    password_hash = generate_password_hash(PASSWORD, METHOD)
+
+    foods, exercise_ids = _ensure_catalogs(conn, rnd, n_foods, n_exercises)
+    first_user = (conn.execute("SELECT COALESCE(MAX(id), 0) FROM users").fetchone()[0]) + 1
+    workout_id = (conn.execute("SELECT COALESCE(MAX(id), 0) FROM workouts").fetchone()[0]) + 1
+    counts = {"users": 0, "food_logs": 0, "weight_logs": 0, "workouts": 0, "workout_exercises": 0}
+
+    trigger_sql = [
+        r[0] for r in conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name IN (?, ?, ?)",
+            TOTALS_TRIGGERS,
+        )
+    ]
+    for name in TOTALS_TRIGGERS:
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    conn.commit()
+
+    try:
+        for batch_start in range(first_user, first_user + users, USER_BATCH):
+            batch_end = min(batch_start + USER_BATCH, first_user + users)
+            user_rows, target_rows = [], []
+            food_rows, weight_rows, workout_rows, item_rows = [], [], [], []
+
+            for user_id in range(batch_start, batch_end):
+                user_rows.append((user_id, EMAIL_TEMPLATE.format(user_id), password_hash))
+                if rnd.random() < 0.6:
+                    target_rows.append((user_id, rnd.choice([1800, 2000, 2200, 2500, 2800])))
+
+                f, w, wo, it, workout_id = _user_rows(
+                    user_id, first_day, days, rnd, foods, exercise_ids, workout_id
+                )
+                food_rows += f
+                weight_rows += w
+                workout_rows += wo
+                item_rows += it
+
+            conn.executemany("INSERT INTO users (id, email, password_hash) VALUES (?, ?, ?)", user_rows)
+            conn.executemany("INSERT INTO daily_targets (user_id, kcal_target) VALUES (?, ?)", target_rows)
+            conn.executemany(
+                "INSERT INTO food_logs (user_id, log_date, food_id, food_name, amount_grams, kcal, protein, carbs, fat) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                food_rows,
+            )
+            conn.executemany("INSERT INTO weight_logs (user_id, log_date, weight) VALUES (?, ?, ?)", weight_rows)
+            conn.executemany(
+                "INSERT INTO workouts (id, user_id, workout_date, workout_type, notes) VALUES (?, ?, ?, ?, ?)",
+                workout_rows,
+            )
+            conn.executemany(
+                "INSERT INTO workout_exercises (workout_id, exercise_id, sets, reps, weight) VALUES (?, ?, ?, ?, ?)",
+                item_rows,
+            )
+            conn.commit()
+
+            counts["users"] += len(user_rows)
+            counts["food_logs"] += len(food_rows)
+            counts["weight_logs"] += len(weight_rows)
+            counts["workouts"] += len(workout_rows)
+            counts["workout_exercises"] += len(item_rows)
+            if progress:
+                progress(counts, users)
+    finally:
+        # Triggers terugzetten en de dagtotalen in 1x opnieuw opbouwen
+        for sql in trigger_sql:
+            conn.execute(sql)
+        conn.commit()
+        db.rebuild_daily_nutrition_totals(conn)
+        rebuild_exercise_stats(conn)
+
+    conn.execute("ANALYZE")
+    conn.commit()
+    return counts
+
+
+def db_size_bytes(path: str) -> int:
+    """Grootte van het databasebestand (+ WAL als die er is)."""
+    return sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genereer een grote nep-dataset")
+    parser.add_argument("--db", default=db.DB_PATH, help="pad naar de database (standaard: DATABASE_PATH)")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--years", type=float, default=3.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--foods", type=int, default=2000, help="aantal producten in foods")
+    parser.add_argument("--exercises", type=int, default=300, help="minimaal aantal oefeningen")
+    args = parser.parse_args()
+
+    db.DB_PATH = args.db
+    conn = db.get_db_connection()
+    # Alleen voor het genereren: sneller schrijven (bij een crash: opnieuw genereren)
+    conn.execute("PRAGMA synchronous = OFF;")
+    try:
+        db.migrate(conn)
+        started = time.perf_counter()
+
+        def progress(counts, total):
+            elapsed = time.perf_counter() - started
+            rows = sum(counts.values())
+            print(
+                f"{counts['users']}/{total} gebruikers, {rows} rijen "
+                f"({rows / elapsed:.0f} rijen/s)",
+                flush=True,
+            )
+
+        counts = generate(
+            conn,
+            users=args.users,
+            years=args.years,
+            seed=args.seed,
+            n_foods=args.foods,
+            n_exercises=args.exercises,
+            progress=progress,
+        )
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+    finally:
+        conn.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"Klaar in {elapsed:.1f} s: " + ", ".join(f"{k}={v}" for k, v in counts.items()))
+    print(f"Database: {args.db} ({db_size_bytes(args.db) / 1e6:.1f} MB)")
+    print(f"Inloggen: {EMAIL_TEMPLATE.format(1)} / {PASSWORD}")
+
+
+if __name__ == "__main__":
+    main()
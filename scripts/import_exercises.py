@@ -1,17 +1,24 @@
 # scripts/import_exercises.py
+# Importeert de volledige ExerciseDB-catalogus in de tabel exercises.
+# - Pagina's worden tegelijk opgehaald (binnen een rate limit)
+# - Wegschrijven met executemany, in grote transacties
+# - Afgebroken? Opnieuw starten gaat verder bij het laatste checkpoint
+#
+# Voorbeeld:
+#   python scripts/import_exercises.py --concurrency 8 --rate 10
+#   python scripts/import_exercises.py --restart     (opnieuw vanaf offset 0)
+import argparse
 import sys
 from pathlib import Path
 
 # Zorg dat projectroot in PYTHONPATH zit
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-import sqlite3
-from services.exercisedb_client import ExerciseDBClient
+import db  # noqa: E402
+from services.exercise_importer import import_exercises  # noqa: E402
 
-DB_PATH = Path(__file__).resolve().parents[1] / "database.db"
 
-
-def ensure_columns(conn: sqlite3.Connection) -> None:
+def ensure_columns(conn) -> None:
     cur = conn.cursor()
     cur.execute("PRAGMA table_info(exercises);")
     cols = {row[1] for row in cur.fetchall()}
@@ -24,61 +31,55 @@ def ensure_columns(conn: sqlite3.Connection) -> None:
         )
 
 
-def upsert_exercise(conn, name, muscle_group, equipment):
-    conn.execute(
-        """
-        INSERT OR IGNORE INTO exercises (name, muscle_group, equipment)
-        VALUES (?, ?, ?)
-        """,
-        (name, muscle_group, equipment),
+def print_progress(result) -> None:
+    print(
+        f"Offset {result.next_offset}: {result.fetched} opgehaald, "
+        f"{result.inserted} nieuw ({result.rows_per_sec:.0f} rijen/s)"
     )
 
 
 def main():
-    print("DB:", DB_PATH)
-    client = ExerciseDBClient()
-
-    conn = sqlite3.connect(DB_PATH)
+    parser = argparse.ArgumentParser(description="ExerciseDB bulk import")
+    parser.add_argument("--page-size", type=int, default=10, help="items per API-call")
+    parser.add_argument("--concurrency", type=int, default=4, help="calls tegelijk")
+    parser.add_argument("--rate", type=float, default=10.0, help="max calls per seconde")
+    parser.add_argument("--window", type=int, default=20, help="pagina's per transactie")
+    parser.add_argument("--restart", action="store_true", help="checkpoint negeren, vanaf 0 beginnen")
+    args = parser.parse_args()
+
+    print("DB:", db.DB_PATH)
+    # Zorgt dat de tabellen (incl. import_checkpoints) bestaan
+    db.init_db()
+    conn = db.get_db_connection()
 
     try:
         ensure_columns(conn)
 
-        limit = 10
-        offset = 0
-        seen_ids = set()
-
         before = conn.execute(
             "SELECT COUNT(*) FROM exercises"
         ).fetchone()[0]
 
-        while True:
-            page = client.fetch_exercises_page(offset=offset, limit=limit)
-            if not page:
-                break
-
-            first_id = page[0].get("id")
-            if first_id in seen_ids:
-                print("Zelfde pagina opnieuw ontvangen → stoppen")
-                break
-            seen_ids.add(first_id)
-
-            for ex in page:
-                name = ex.get("name", "").strip()
-                equipment = ex.get("equipment", "").strip()
-                muscle_group = ex.get("target", "").strip()
-
-                if name:
-                    upsert_exercise(conn, name, muscle_group, equipment)
-
-            conn.commit()
-            print(f"Offset {offset}: opgehaald {len(page)}")
-            offset += limit
+        result = import_exercises(
+            conn,
+            page_size=args.page_size,
+            concurrency=args.concurrency,
+            rate_per_sec=args.rate,
+            window_pages=args.window,
+            restart=args.restart,
+            progress=print_progress,
+        )
 
         after = conn.execute(
             "SELECT COUNT(*) FROM exercises"
         ).fetchone()[0]
 
-        print(f"Klaar. Voor: {before} | Na: {after} | Nieuw: {after - before}")
+        if result.pages == 0 and result.finished:
+            print("Import was al klaar (gebruik --restart om opnieuw te beginnen).")
+        print(
+            f"Klaar. Voor: {before} | Na: {after} | Nieuw: {after - before} | "
+            f"{result.pages} pagina's in {result.seconds:.1f}s "
+            f"({result.rows_per_sec:.0f} rijen/s)"
+        )
 
     finally:
         conn.close()
@@ -0,0 +1,81 @@
+# scripts/import_food_diary.py
+# Importeert een voedingsdagboek (CSV, NDJSON of JSON-array) in food_logs.
+# - Het bestand wordt gestreamd: ook een export van jaren kost weinig geheugen
+# - Wegschrijven per chunk (executemany, 1 transactie per chunk)
+# - De dagtotalen worden bijgehouden door de triggers op food_logs
+#
+# Voorbeeld:
+#   python scripts/import_food_diary.py --user-email jan@example.com export.csv
+#   python scripts/import_food_diary.py --user-id 3 --format ndjson export.txt
+import argparse
+import sys
+from pathlib import Path
+
+# Zorg dat projectroot in PYTHONPATH zit
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import db  # noqa: E402
+from services.diary_importer import CHUNK_SIZE, FORMATS, detect_format, import_diary  # noqa: E402
+
+
+def print_progress(result) -> None:
+    print(
+        f"{result.rows_read} regels gelezen: {result.inserted} toegevoegd, "
+        f"{result.skipped} overgeslagen ({result.rows_per_sec:.0f} regels/s)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Voedingsdagboek importeren")
+    parser.add_argument("path", help="CSV-, NDJSON- of JSON-bestand")
+    who = parser.add_mutually_exclusive_group(required=True)
+    who.add_argument("--user-id", type=int)
+    who.add_argument("--user-email")
+    parser.add_argument("--format", choices=FORMATS, help="standaard: op basis van de extensie")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="regels per transactie")
+    args = parser.parse_args()
+
+    print("DB:", db.DB_PATH)
+    db.init_db()
+    conn = db.get_db_connection()
+
+    try:
+        if args.user_email:
+            row = conn.execute(
+                "SELECT id FROM users WHERE email = ?", (args.user_email.strip().lower(),)
+            ).fetchone()
+        else:
+            row = conn.execute("SELECT id FROM users WHERE id = ?", (args.user_id,)).fetchone()
+        if row is None:
+            print("Gebruiker niet gevonden.")
+            sys.exit(1)
+
+        with open(args.path, "rb") as f:
+            result = import_diary(
+                conn,
+                row[0],
+                f,
+                fmt=args.format or detect_format(args.path),
+                chunk_size=args.chunk_size,
+                progress=print_progress,
+            )
+
+        print(
+            f"Klaar. {result.inserted} toegevoegd, {result.skipped} overgeslagen, "
+            f"{result.foods_matched} gekoppeld aan een product, "
+            f"{result.rows_read} regels in {result.seconds:.1f}s"
+        )
+        for line, error in result.errors:
+            print(f"  regel {line}: {error}")
+        if result.aborted is not None:
+            print(
+                f"Afgebroken na {result.rows_read} regels: {result.aborted}. "
+                f"De {result.inserted} regels daarvoor zijn opgeslagen; importeer alleen het deel daarna opnieuw."
+            )
+            sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,453 @@
+# scripts/loadtest.py
+# Load test: start de app onder gunicorn tegen lokale nep-API's
+# (scripts/fake_upstreams.py) en laat een aantal virtuele gebruikers
+# tegelijk realistische sessies doen:
+#   inloggen -> dashboard -> product zoeken + loggen -> dagoverzicht
+#   -> workout maken + oefening toevoegen -> recepten bekijken -> gewicht
+# Per route: aantal requests, fouten, p50/p95/p99 en throughput.
+#
+# Voorbeeld:
+#   python scripts/loadtest.py --users 20 --duration 60 --workers 4
+#   python scripts/loadtest.py --latency-ms 300 --error-rate 0.05 --json baseline.json
+#   python scripts/loadtest.py --login-users 20 --hash-workers 0   (login-golf, hashen inline)
+#
+# --login-users: extra gebruikers die alleen inloggen/uitloggen, om de
+# login-doorvoer te meten en wat een golf logins met de andere routes doet.
+# Een 503 (hashen zit vol, zie passwords.py) telt als fout en staat ook apart
+# in de kolom 503.
+#
+# Elke run gebruikt een lege tijdelijke database (en response cache), zodat
+# resultaten van verschillende runs vergelijkbaar zijn.
+import argparse
+import json
+import os
+import random
+import re
+import socket
+import string
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+
+import requests
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Zorg dat projectroot in PYTHONPATH zit
+sys.path.insert(0, str(ROOT))
+
+from scripts.fake_upstreams import (  # noqa: E402
+    MEAL_COUNT,
+    MOVES,
+    add_fault_arguments,
+    faults_from_args,
+    start_fake_upstreams,
+    stop_fake_upstreams,
+)
+
+PASSWORD = "loadtest-password"
+# Kleine set barcodes: na de eerste keer komen ze uit de foods-tabel
+BARCODES = [f"87{i:011d}" for i in range(1, 201)]
+
+
+# ----------------
+# Metingen
+# ----------------
+
+class Recorder:
+    """Verzamelt latency (ms) en fouten per route, thread-safe."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.rejected = defaultdict(int)
+        self.recording = False
+
+    def add(self, route: str, elapsed_ms: float, ok: bool, rejected: bool = False):
+        if not self.recording:
+            return
+        with self._lock:
+            self.latencies[route].append(elapsed_ms)
+            if not ok:
+                self.errors[route] += 1
+            if rejected:
+                self.rejected[route] += 1
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Nearest-rank percentiel van een gesorteerde lijst."""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[k]
+
+
+def summarize(recorder: Recorder, elapsed_s: float) -> dict:
+    routes = {}
+    all_latencies = []
+    for route, values in sorted(recorder.latencies.items()):
+        values = sorted(values)
+        all_latencies.extend(values)
+        routes[route] = {
+            "count": len(values),
+            "errors": recorder.errors.get(route, 0),
+            "rejected": recorder.rejected.get(route, 0),
+            "p50_ms": round(percentile(values, 50), 1),
+            "p95_ms": round(percentile(values, 95), 1),
+            "p99_ms": round(percentile(values, 99), 1),
+            "max_ms": round(values[-1], 1),
+            "rps": round(len(values) / elapsed_s, 2),
+        }
+
+    all_latencies.sort()
+    total = {
+        "count": len(all_latencies),
+        "errors": sum(recorder.errors.values()),
+        "rejected": sum(recorder.rejected.values()),
+        "p50_ms": round(percentile(all_latencies, 50), 1),
+        "p95_ms": round(percentile(all_latencies, 95), 1),
+        "p99_ms": round(percentile(all_latencies, 99), 1),
+        "max_ms": round(all_latencies[-1], 1) if all_latencies else 0.0,
+        "rps": round(len(all_latencies) / elapsed_s, 2),
+    }
+    return {"elapsed_s": round(elapsed_s, 1), "routes": routes, "total": total}
+
+
+def print_report(summary: dict):
+    header = f"{'route':<34} {'count':>7} {'err':>5} {'503':>5} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'req/s':>8}"
+    print()
+    print(header)
+    print("-" * len(header))
+    rows = list(summary["routes"].items()) + [("TOTAAL", summary["total"])]
+    for route, s in rows:
+        print(
+            f"{route:<34} {s['count']:>7} {s['errors']:>5} {s['rejected']:>5} {s['p50_ms']:>8.1f} "
+            f"{s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f} {s['max_ms']:>8.1f} {s['rps']:>8.2f}"
+        )
+    print(f"\nLatency in ms, gemeten over {summary['elapsed_s']} s")
+
+
+# ----------------
+# Virtuele gebruiker
+# ----------------
+
+class VirtualUser:
+    """1 gebruiker met eigen cookies; elke iteratie is een complete sessie."""
+
+    def __init__(self, base_url: str, email: str, recorder: Recorder, think_s: float, rnd: random.Random):
+        self.base_url = base_url
+        self.email = email
+        self.recorder = recorder
+        self.think_s = think_s
+        self.rnd = rnd
+        self.http = requests.Session()
+        self.catalog_etag = None
+        self.exercise_ids = []
+
+    def request(self, route: str, method: str, path: str, **kwargs) -> requests.Response | None:
+        """
+        Doet 1 request (zonder redirects te volgen, zodat elke route apart
+        gemeten wordt) en slaat de latency op onder de naam `route`.
+        """
+        started = time.perf_counter()
+        try:
+            r = self.http.request(
+                method, self.base_url + path, allow_redirects=False, timeout=60, **kwargs
+            )
+        except requests.RequestException:
+            self.recorder.add(route, (time.perf_counter() - started) * 1000, ok=False)
+            return None
+        self.recorder.add(
+            route, (time.perf_counter() - started) * 1000, ok=r.status_code < 400, rejected=r.status_code == 503
+        )
+        return r
+
+    def think(self):
+        if self.think_s > 0:
+            time.sleep(self.rnd.uniform(0.5, 1.5) * self.think_s)
+
+    # --- stappen ---
+
+    def register(self):
+        self.request("POST /register", "POST", "/register", data={"email": self.email, "password": PASSWORD})
+        self.request("GET /logout", "GET", "/logout")
+
+    def login(self):
+        self.request("POST /login", "POST", "/login", data={"email": self.email, "password": PASSWORD})
+
+    def dashboard(self):
+        self.request("GET /", "GET", "/")
+
+    def log_food(self):
+        barcode = self.rnd.choice(BARCODES)
+        self.request("POST /food/search", "POST", "/food/search", data={"barcode": barcode})
+        self.think()
+        day = (date.today() - timedelta(days=self.rnd.randint(0, 6))).isoformat()
+        self.request(
+            "POST /food/log",
+            "POST",
+            "/food/log",
+            data={
+                "api_source": "openfoodfacts",
+                "api_id": barcode,
+                "name": f"Product {barcode[-4:]}",
+                "grams": self.rnd.choice([50, 100, 150, 250]),
+                "log_date": day,
+                "kcal_per_100": self.rnd.randint(20, 600),
+                "protein_per_100": 10,
+                "carbs_per_100": 20,
+                "fat_per_100": 5,
+            },
+        )
+        self.request("GET /nutrition/<day>", "GET", f"/nutrition/{day}")
+
+    def load_catalog(self):
+        # Zoals de browser: met If-None-Match na de eerste keer (304)
+        headers = {"Accept-Encoding": "gzip"}
+        if self.catalog_etag:
+            headers["If-None-Match"] = self.catalog_etag
+        r = self.request("GET /api/exercises/catalog", "GET", "/api/exercises/catalog", headers=headers)
+        if r is not None and r.status_code == 200:
+            self.catalog_etag = r.headers.get("ETag")
+            self.exercise_ids = [e["id"] for e in r.json().get("results", [])]
+
+    def add_exercise(self):
+        r = self.request(
+            "POST /workouts",
+            "POST",
+            "/workouts",
+            data={"workout_date": date.today().isoformat(), "workout_type": "Kracht", "notes": ""},
+        )
+        match = re.search(r"/workouts/(\d+)", (r.headers.get("Location", "") if r is not None else ""))
+        if not match:
+            return
+        workout_id = match.group(1)
+
+        self.request("GET /workouts/<id>", "GET", f"/workouts/{workout_id}")
+        self.load_catalog()
+        self.request("GET /api/exercises?q=", "GET", "/api/exercises", params={"q": self.rnd.choice(MOVES)})
+        self.think()
+
+        if not self.exercise_ids:
+            return
+        for exercise_id in self.rnd.sample(self.exercise_ids, k=min(3, len(self.exercise_ids))):
+            self.request(
+                "POST /workouts/<id>/add-exercise",
+                "POST",
+                f"/workouts/{workout_id}/add-exercise",
+                data={
+                    "exercise_id": exercise_id,
+                    "sets": 3,
+                    "reps": self.rnd.randint(5, 12),
+                    "weight": self.rnd.choice([20, 40, 60, 80]),
+                },
+            )
+
+    def browse_recipes(self):
+        self.request("GET /recipes", "GET", "/recipes", params={"f": self.rnd.choice(string.ascii_lowercase[:8])})
+        self.think()
+        meal_id = 52000 + self.rnd.randrange(MEAL_COUNT)
+        self.request("GET /recipes/<id>", "GET", f"/recipes/{meal_id}")
+
+    def log_weight(self):
+        day = (date.today() - timedelta(days=self.rnd.randint(0, 365))).isoformat()
+        self.request(
+            "POST /weight",
+            "POST",
+            "/weight",
+            data={"log_date": day, "weight": round(self.rnd.uniform(70, 90), 1)},
+        )
+        self.request("GET /weight", "GET", "/weight")
+        self.request("GET /api/weight/series", "GET", "/api/weight/series")
+
+    def session(self):
+        self.login()
+        self.dashboard()
+        self.think()
+        # Niet elke sessie doet alles (ongeveer zoals echte gebruikers)
+        steps = [
+            (0.8, self.log_food),
+            (0.5, self.add_exercise),
+            (0.4, self.browse_recipes),
+            (0.3, self.log_weight),
+        ]
+        for chance, step in steps:
+            if self.rnd.random() < chance:
+                step()
+                self.think()
+        self.dashboard()
+        self.request("GET /logout", "GET", "/logout")
+
+    def run(self, stop_at: float):
+        self.register()
+        while time.monotonic() < stop_at:
+            self.session()
+
+
+class LoginUser(VirtualUser):
+    """Doet alleen inloggen + uitloggen (een golf logins, bijv. na een mailing)."""
+
+    def run(self, stop_at: float):
+        self.register()
+        while time.monotonic() < stop_at:
+            self.login()
+            self.request("GET /logout", "GET", "/logout")
+            self.think()
+
+
+# ----------------
+# gunicorn + nep-API's starten
+# ----------------
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_until_ready(base_url: str, proc: subprocess.Popen, timeout: float = 120.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("gunicorn is gestopt tijdens het opstarten")
+        try:
+            if requests.get(base_url + "/login", timeout=2).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("gunicorn werd niet op tijd bereikbaar")
+
+
+def start_app(
+    tmpdir: str, upstream_env: dict, workers: int, threads: int, hash_workers: int | None = None
+) -> tuple[subprocess.Popen, str, Path]:
+    """Start gunicorn met een lege database in tmpdir. Geeft (proces, base_url, logbestand)."""
+    port = _free_port()
+    env = dict(os.environ)
+    env.update(upstream_env)
+    env.update(
+        {
+            "DATABASE_PATH": os.path.join(tmpdir, "database.db"),
+            "RESPONSE_CACHE_PATH": os.path.join(tmpdir, "cache.db"),
+            "RAPIDAPI_KEY": env.get("LOADTEST_RAPIDAPI_KEY", "loadtest"),
+            "SECRET_KEY": "loadtest",
+            # Load test draait over http (geen HTTPS)
+            "SESSION_COOKIE_SECURE": "0",
+        }
+    )
+    if hash_workers is not None:
+        env["PASSWORD_HASH_WORKERS"] = str(hash_workers)
+
+    log_path = Path(tmpdir) / "gunicorn.log"
+    log = open(log_path, "w")
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "gunicorn", "app:app",
+            "--bind", f"127.0.0.1:{port}",
+            "--workers", str(workers),
+            "--threads", str(threads),
+            "--timeout", "120",
+        ],
+        cwd=ROOT,
+        env=env,
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+    return proc, f"http://127.0.0.1:{port}", log_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test van de app tegen lokale nep-API's")
+    parser.add_argument("--users", type=int, default=10, help="aantal virtuele gebruikers (tegelijk)")
+    parser.add_argument("--duration", type=float, default=30.0, help="meetduur in seconden")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="gebruikers starten verspreid over zoveel seconden (niet gemeten)")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="gemiddelde denktijd tussen stappen")
+    parser.add_argument("--workers", type=int, default=2, help="aantal gunicorn workers")
+    parser.add_argument("--threads", type=int, default=4, help="threads per gunicorn worker")
+    parser.add_argument("--login-users", type=int, default=0, help="extra gebruikers die alleen in- en uitloggen")
+    parser.add_argument(
+        "--hash-workers", type=int, default=None,
+        help="PASSWORD_HASH_WORKERS voor de app (0 = hashen in de request-thread; standaard: app-instelling)",
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="resultaten ook als JSON wegschrijven (voor vergelijking tussen runs)")
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    servers, upstream_env = start_fake_upstreams(faults_from_args(args))
+    recorder = Recorder()
+
+    with tempfile.TemporaryDirectory(prefix="loadtest-") as tmpdir:
+        proc, base_url, log_path = start_app(tmpdir, upstream_env, args.workers, args.threads, args.hash_workers)
+        try:
+            _wait_until_ready(base_url, proc)
+            print(f"App draait op {base_url} ({args.workers} workers x {args.threads} threads)")
+
+            # Gebruikers starten tijdens de ramp-up; pas daarna wordt er gemeten
+            stop_at = time.monotonic() + args.ramp_up + args.duration
+            threads = []
+            total_users = args.users + args.login_users
+            for i in range(total_users):
+                user_class = VirtualUser if i < args.users else LoginUser
+                user = user_class(
+                    base_url,
+                    f"loadtest{i}@example.com",
+                    recorder,
+                    args.think_ms / 1000,
+                    random.Random(args.seed * 1000 + i),
+                )
+                t = threading.Thread(target=user.run, args=(stop_at,), name=f"vu-{i}", daemon=True)
+                t.start()
+                threads.append(t)
+                time.sleep(args.ramp_up / max(total_users, 1))
+
+            remaining_ramp = stop_at - args.duration - time.monotonic()
+            if remaining_ramp > 0:
+                time.sleep(remaining_ramp)
+            recorder.recording = True
+            measure_start = time.monotonic()
+            print(
+                f"Meten gedurende {args.duration:.0f} s met {args.users} gebruikers"
+                f" (+ {args.login_users} alleen-login)..."
+            )
+
+            for t in threads:
+                t.join()
+            elapsed = time.monotonic() - measure_start
+            recorder.recording = False
+        except Exception:
+            print(log_path.read_text()[-4000:], file=sys.stderr)
+            raise
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+            stop_fake_upstreams(servers)
+
+    summary = summarize(recorder, elapsed)
+    summary["config"] = {
+        k: getattr(args, k)
+        for k in (
+            "users", "login_users", "hash_workers", "duration", "think_ms", "workers", "threads",
+            "latency_ms", "jitter_ms", "error_rate", "timeout_rate",
+        )
+    }
+    print_report(summary)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+        print(f"JSON geschreven naar {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+# scripts/migrate.py
+# Migraties los uitvoeren, bijv. als release-stap vóór het starten van gunicorn:
+#   python scripts/migrate.py           -> openstaande migraties uitvoeren
+#   python scripts/migrate.py --status  -> alleen de huidige versie tonen
+import logging
+import sys
+from pathlib import Path
+
+# Zorg dat projectroot in PYTHONPATH zit
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import db  # noqa: E402
+
+
+def main():
+    conn = db.get_db_connection()
+    try:
+        current = db.schema_version(conn)
+        latest = db.latest_version()
+        print(f"DB: {db.DB_PATH}")
+        print(f"Schemaversie: {current} (nieuwste: {latest})")
+
+        if "--status" in sys.argv[1:]:
+            for version, name, _ in db.migrations():
+                state = "gedaan" if version <= current else "open"
+                print(f"  {version:04d}_{name}: {state}")
+            return
+    finally:
+        conn.close()
+
+    # init_db doet de migraties onder een lock, plus de eenmalige seed
+    # (en logt de uitkomst via logging)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    db.init_db()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+# scripts/rebuild_daily_totals.py
+import sys
+from pathlib import Path
+
+# Zorg dat projectroot in PYTHONPATH zit
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from db import get_db_connection, rebuild_daily_nutrition_totals  # noqa: E402
+
+
+def main():
+    conn = get_db_connection()
+    try:
+        days = rebuild_daily_nutrition_totals(conn)
+        print(f"Klaar. {days} dagtotalen opnieuw berekend uit food_logs.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+# scripts/rebuild_exercise_stats.py
+# Berekent exercise_stats (records + volume per oefening) opnieuw uit workout_exercises.
+# Migratie 0006 vult de tabel al; dit script is voor als de stats ooit uit de pas lopen.
+import sys
+from pathlib import Path
+
+# Zorg dat projectroot in PYTHONPATH zit
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from db import get_db_connection  # noqa: E402
+from services.exercise_stats import rebuild_exercise_stats  # noqa: E402
+
+
+def main():
+    conn = get_db_connection()
+    try:
+        rows = rebuild_exercise_stats(conn)
+        print(f"Klaar. {rows} oefening-statistieken opnieuw berekend uit workout_exercises.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,428 @@
+# services/diary_importer.py
+# Bulk-import van een voedingsdagboek (export uit een andere tracker).
+# - Formaten: CSV, NDJSON (1 JSON-object per regel) en een JSON-array
+# - Streaming: het bestand wordt in stukjes gelezen, dus ook een export van
+#   jaren kost maar een paar MB geheugen
+# - Producten worden opgezocht in de foods-tabel (barcode of naam), per chunk
+#   in 1 query i.p.v. per regel
+# - Wegschrijven per chunk met executemany in 1 transactie; de triggers op
+#   food_logs houden daily_nutrition_totals automatisch bij
+import csv
+import io
+import json
+import math
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from datetime import date
+
+from utils import calc_from_100g, safe_float
+
+FORMATS = ("csv", "ndjson", "json")
+CHUNK_SIZE = 1000
+# Zoveel foutmeldingen bewaren we (de rest wordt alleen geteld)
+MAX_ERRORS = 100
+# Grootte van de stukken die uit het bestand gelezen worden (tekens)
+READ_SIZE = 64 * 1024
+# Maximaal aantal parameters in 1 IN (...)-lijst
+_IN_BATCH = 500
+
+# Kolomnamen zoals andere trackers ze gebruiken -> onze velden
+ALIASES = {
+    "log_date": ("log_date", "date", "day", "datum"),
+    "name": ("food_name", "name", "food", "product", "omschrijving"),
+    "grams": ("amount_grams", "grams", "gram", "amount", "quantity_g"),
+    "kcal": ("kcal", "calories", "energy_kcal", "energie"),
+    "protein": ("protein", "proteins", "eiwit"),
+    "carbs": ("carbs", "carbohydrates", "koolhydraten"),
+    "fat": ("fat", "vet"),
+    "barcode": ("barcode", "api_id", "code", "ean"),
+    "api_source": ("api_source", "source"),
+}
+
+
+@dataclass
+class DiaryImportResult:
+    rows_read: int = 0
+    inserted: int = 0
+    skipped: int = 0
+    foods_matched: int = 0
+    chunks: int = 0
+    seconds: float = 0.0
+    errors: list = field(default_factory=list)  # [(regel, melding), ...]
+    # Bestand kon niet verder gelezen worden (bijv. afgekapte JSON); de
+    # regels daarvoor zijn wel opgeslagen (zie inserted/rows_read)
+    aborted: str | None = None
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows_read / self.seconds if self.seconds > 0 else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "rows_read": self.rows_read,
+            "inserted": self.inserted,
+            "skipped": self.skipped,
+            "foods_matched": self.foods_matched,
+            "chunks": self.chunks,
+            "seconds": round(self.seconds, 3),
+            "rows_per_sec": round(self.rows_per_sec, 1),
+            "errors": [{"line": line, "error": msg} for line, msg in self.errors],
+            "aborted": self.aborted,
+        }
+
+
+# ----------------
+# Parsers (geven (regelnummer, dict) terug, 1 voor 1)
+# ----------------
+
+def detect_format(filename: str | None = None, content_type: str | None = None) -> str | None:
+    """Formaat uit de bestandsnaam of het content-type; None = onbekend (dan raden we)."""
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    if name.endswith(".json"):
+        return "json"
+
+    ctype = (content_type or "").split(";")[0].strip().lower()
+    return {
+        "text/csv": "csv",
+        "application/x-ndjson": "ndjson",
+        "application/jsonl": "ndjson",
+        "application/json": "json",
+    }.get(ctype)
+
+
+def _iter_csv(text):
+    reader = csv.DictReader(text)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def _iter_ndjson(text):
+    for line_no, line in enumerate(text, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError as e:
+            yield line_no, ValueError(f"ongeldige JSON: {e}")
+
+
+def _iter_json_array(text):
+    """
+    Leest een JSON-array element voor element (zonder het hele bestand in te
+    laden) met JSONDecoder.raw_decode op een buffer die steeds wordt bijgevuld.
+    Bron: https://docs.python.org/3/library/json.html#json.JSONDecoder.raw_decode
+    """
+    decoder = json.JSONDecoder()
+    buf = text.read(READ_SIZE).lstrip()
+    if not buf.startswith("["):
+        raise ValueError("JSON-bestand moet een lijst zijn: [ {...}, {...} ]")
+    pos = 1
+    index = 0
+
+    while True:
+        if pos >= len(buf):
+            more = text.read(READ_SIZE)
+            if not more:
+                raise ValueError("JSON-bestand houdt onverwacht op (ontbreekt ']'?)")
+            buf, pos = buf[pos:] + more, 0
+            continue
+
+        ch = buf[pos]
+        if ch.isspace() or ch == ",":
+            pos += 1
+            continue
+        if ch == "]":
+            return
+
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            # Waarschijnlijk een half element aan het eind van de buffer: bijlezen
+            more = text.read(READ_SIZE)
+            if not more:
+                raise ValueError(f"ongeldige JSON bij element {index + 1}")
+            buf, pos = buf[pos:] + more, 0
+            continue
+
+        index += 1
+        yield index, obj
+        pos = end
+        # Verwerkte tekst weggooien, zodat de buffer klein blijft
+        if pos > READ_SIZE:
+            buf, pos = buf[pos:], 0
+
+
+def iter_records(stream, fmt: str | None = None):
+    """
+    (regelnummer, dict) per dagboekregel uit een binaire stream.
+    fmt: 'csv', 'ndjson' of 'json'; None = raden aan de hand van het eerste teken.
+    """
+    # utf-8-sig: een BOM (Excel-export) wordt genegeerd
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+    if fmt is None:
+        # Eerste stuk lezen om te raden, daarna gewoon verder uit dezelfde stream
+        head = text.read(READ_SIZE)
+        head += text.readline()
+        first = head.lstrip()[:1]
+        fmt = "json" if first == "[" else "ndjson" if first == "{" else "csv"
+        text = _Prefixed(head, text)
+
+    if fmt not in FORMATS:
+        raise ValueError(f"Onbekend formaat: {fmt} (kies uit {', '.join(FORMATS)})")
+    if fmt == "csv":
+        return _iter_csv(text)
+    if fmt == "ndjson":
+        return _iter_ndjson(text)
+    return _iter_json_array(text)
+
+
+class _Prefixed:
+    """Tekststream waarvan het begin al gelezen is (read/iteratie zoals een bestand)."""
+
+    def __init__(self, head: str, rest):
+        self._head = io.StringIO(head)
+        self._rest = rest
+
+    def read(self, size: int = -1) -> str:
+        data = self._head.read(size)
+        if size < 0:
+            return data + self._rest.read()
+        if len(data) < size:
+            data += self._rest.read(size - len(data))
+        return data
+
+    def __iter__(self):
+        yield from self._head
+        yield from self._rest
+
+
+# ----------------
+# Regels omzetten en producten opzoeken
+# ----------------
+
+def _pick(record: dict, field_name: str):
+    for alias in ALIASES[field_name]:
+        value = record.get(alias)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _normalize(record) -> dict:
+    """Dagboekregel -> gevalideerde velden. ValueError bij een onbruikbare regel."""
+    if isinstance(record, Exception):
+        raise record
+    if not isinstance(record, dict):
+        raise ValueError("regel is geen object")
+    record = {str(k).strip().lower(): v for k, v in record.items() if k is not None}
+
+    raw_date = str(_pick(record, "log_date") or "").strip()
+    try:
+        # Ook "2024-01-31 08:15:00" of "2024-01-31T08:15" -> alleen de datum
+        log_date = date.fromisoformat(raw_date[:10]).isoformat()
+    except ValueError:
+        raise ValueError(f"ongeldige datum: {raw_date!r}")
+
+    grams = safe_float(_pick(record, "grams"), default=0.0)
+    if grams <= 0:
+        raise ValueError("hoeveelheid (gram) ontbreekt of is 0")
+
+    barcode = _pick(record, "barcode")
+    name = str(_pick(record, "name") or "").strip()
+    if not name and not barcode:
+        raise ValueError("productnaam of barcode ontbreekt")
+
+    values = {key: _number(record, key) for key in ("kcal", "protein", "carbs", "fat")}
+    return {
+        "log_date": log_date,
+        "grams": grams,
+        "name": name,
+        "barcode": str(barcode).strip() if barcode is not None else None,
+        "api_source": str(_pick(record, "api_source") or "openfoodfacts").strip(),
+        # None = niet in het bestand: dan rekenen we met de waarden uit foods
+        **values,
+    }
+
+
+def _number(record: dict, field_name: str) -> float | None:
+    """Getal uit de regel, None als het veld ontbreekt; ValueError als het geen getal is."""
+    raw = _pick(record, field_name)
+    if raw is None:
+        return None
+    value = safe_float(raw, default=None)
+    if value is None or not math.isfinite(value) or value < 0:
+        raise ValueError(f"ongeldige waarde voor {field_name}: {raw!r}")
+    return value
+
+
+_FOOD_COLUMNS = "id, api_source, api_id, name, kcal_per_100, protein_per_100, carbs_per_100, fat_per_100"
+
+
+class FoodResolver:
+    """
+    Zoekt producten op in foods (per chunk in een paar IN-queries) en
+    onthoudt het resultaat, ook 'niet gevonden'.
+    """
+
+    MAX_CACHED = 20_000
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self._by_code: dict[tuple, sqlite3.Row | None] = {}
+        self._by_name: dict[str, sqlite3.Row | None] = {}
+
+    def prefetch(self, items: list[dict]):
+        if len(self._by_code) + len(self._by_name) > self.MAX_CACHED:
+            self._by_code.clear()
+            self._by_name.clear()
+
+        codes = {(i["api_source"], i["barcode"]) for i in items if i["barcode"]} - self._by_code.keys()
+        names = {i["name"].lower() for i in items if i["name"] and not i["barcode"]} - self._by_name.keys()
+
+        for source in {s for s, _ in codes}:
+            ids = [c for s, c in codes if s == source]
+            for start in range(0, len(ids), _IN_BATCH):
+                batch = ids[start:start + _IN_BATCH]
+                for key in batch:
+                    self._by_code[(source, key)] = None
+                rows = self.conn.execute(
+                    f"SELECT {_FOOD_COLUMNS} FROM foods "
+                    f"WHERE api_source = ? AND api_id IN ({','.join('?' * len(batch))})",
+                    (source, *batch),
+                ).fetchall()
+                for row in rows:
+                    self._by_code[(source, row["api_id"])] = row
+
+        names = list(names)
+        for start in range(0, len(names), _IN_BATCH):
+            batch = names[start:start + _IN_BATCH]
+            for key in batch:
+                self._by_name[key] = None
+            # Aflopend op id: een latere rij overschrijft de vorige in de dict,
+            # dus bij dubbele namen wint het product met het laagste id (het oudste)
+            rows = self.conn.execute(
+                f"SELECT {_FOOD_COLUMNS} FROM foods "
+                f"WHERE name COLLATE NOCASE IN ({','.join('?' * len(batch))}) ORDER BY id DESC",
+                batch,
+            ).fetchall()
+            for row in rows:
+                self._by_name[row["name"].lower()] = row
+
+    def get(self, item: dict) -> sqlite3.Row | None:
+        if item["barcode"]:
+            return self._by_code.get((item["api_source"], item["barcode"]))
+        return self._by_name.get(item["name"].lower())
+
+
+def _log_row(user_id: int, item: dict, food) -> tuple:
+    grams = item["grams"]
+    name = item["name"] or (food["name"] if food is not None else "")
+
+    if item["kcal"] is None:
+        if food is None:
+            raise ValueError(f"onbekend product en geen kcal in het bestand: {name or item['barcode']!r}")
+        kcal = calc_from_100g(food["kcal_per_100"], grams)
+    else:
+        kcal = item["kcal"]
+
+    def macro(key, column):
+        if item[key] is not None:
+            return item[key]
+        return calc_from_100g(food[column], grams) if food is not None else 0.0
+
+    return (
+        user_id,
+        item["log_date"],
+        food["id"] if food is not None else None,
+        name or "Onbekend product",
+        grams,
+        kcal,
+        macro("protein", "protein_per_100"),
+        macro("carbs", "carbs_per_100"),
+        macro("fat", "fat_per_100"),
+    )
+
+
+# ----------------
+# Import
+# ----------------
+
+def import_diary(
+    conn: sqlite3.Connection,
+    user_id: int,
+    stream,
+    fmt: str | None = None,
+    chunk_size: int = CHUNK_SIZE,
+    progress=None,
+) -> DiaryImportResult:
+    """
+    Importeert een dagboek (binaire stream) voor user_id.
+    Elke chunk is 1 transactie. Kan het bestand halverwege niet verder gelezen
+    worden, dan worden de regels tot dat punt nog opgeslagen en staat de fout
+    in result.aborted; inserted/rows_read zeggen dan hoe ver de import kwam
+    (de dagtotalen kloppen via de triggers).
+    """
+    result = DiaryImportResult()
+    started = time.perf_counter()
+    resolver = FoodResolver(conn)
+    records = iter_records(stream, fmt)
+
+    while result.aborted is None:
+        chunk = []
+        try:
+            for record in records:
+                chunk.append(record)
+                if len(chunk) >= chunk_size:
+                    break
+        except (ValueError, UnicodeDecodeError, csv.Error) as e:
+            result.aborted = str(e)
+        if not chunk:
+            break
+        result.rows_read += len(chunk)
+
+        items = []
+        for line, record in chunk:
+            try:
+                items.append((line, _normalize(record)))
+            except ValueError as e:
+                _add_error(result, line, e)
+
+        resolver.prefetch([item for _, item in items])
+        rows = []
+        for line, item in items:
+            food = resolver.get(item)
+            try:
+                rows.append(_log_row(user_id, item, food))
+            except ValueError as e:
+                _add_error(result, line, e)
+                continue
+            result.foods_matched += food is not None
+
+        if rows:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO food_logs (user_id, log_date, food_id, food_name, amount_grams, kcal, protein, carbs, fat) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+            result.inserted += len(rows)
+        result.chunks += 1
+        result.seconds = time.perf_counter() - started
+        if progress:
+            progress(result)
+
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def _add_error(result: DiaryImportResult, line: int, error: Exception):
+    result.skipped += 1
+    if len(result.errors) < MAX_ERRORS:
+        result.errors.append((line, str(error)))
@@ -0,0 +1,192 @@
+# services/exercise_importer.py
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from services.exercisedb_client import ExerciseDBClient
+
+
+class RateLimiter:
+    """
+    Token bucket: maximaal `rate` requests per seconde (over alle threads samen),
+    met een kleine burst. Zo blijven we binnen de limiet van RapidAPI.
+    Bron: https://en.wikipedia.org/wiki/Token_bucket
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+@dataclass
+class ImportResult:
+    fetched: int = 0
+    inserted: int = 0
+    pages: int = 0
+    seconds: float = 0.0
+    next_offset: int = 0
+    finished: bool = False
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.fetched / self.seconds if self.seconds > 0 else 0.0
+
+
+def exercise_row(ex: dict) -> tuple[str, str, str] | None:
+    """Zet 1 ExerciseDB-item om naar (name, muscle_group, equipment)."""
+    name = (ex.get("name") or "").strip()
+    if not name:
+        return None
+
+    muscle_group = (ex.get("target") or ex.get("bodyPart") or "Unknown").strip()
+    equipment = (ex.get("equipment") or "Unknown").strip()
+    return name.title(), muscle_group.title(), equipment.title()
+
+
+def _load_checkpoint(conn: sqlite3.Connection, name: str) -> tuple[int, int, bool]:
+    row = conn.execute(
+        "SELECT next_offset, rows_imported, finished FROM import_checkpoints WHERE name = ?",
+        (name,),
+    ).fetchone()
+    if row is None:
+        return 0, 0, False
+    return int(row[0]), int(row[1]), bool(row[2])
+
+
+def _save_checkpoint(conn: sqlite3.Connection, name: str, next_offset: int, rows: int, finished: bool):
+    conn.execute(
+        """
+        INSERT INTO import_checkpoints (name, next_offset, rows_imported, finished)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET
+          next_offset=excluded.next_offset,
+          rows_imported=excluded.rows_imported,
+          finished=excluded.finished,
+          updated_at=CURRENT_TIMESTAMP
+        """,
+        (name, next_offset, rows, int(finished)),
+    )
+
+
+def import_exercises(
+    conn: sqlite3.Connection,
+    client: ExerciseDBClient | None = None,
+    page_size: int = 10,
+    concurrency: int = 4,
+    rate_per_sec: float = 10.0,
+    window_pages: int = 20,
+    max_total: int | None = None,
+    checkpoint: str | None = "exercisedb",
+    restart: bool = False,
+    progress=None,
+) -> ImportResult:
+    """
+    Importeert de ExerciseDB-catalogus in exercises.
+    - Pagina's worden per 'venster' tegelijk opgehaald (binnen rate_per_sec).
+    - Elk venster wordt met executemany in 1 transactie weggeschreven,
+      samen met het checkpoint: een afgebroken import gaat daar verder.
+    - checkpoint=None: geen checkpoint (bijv. de eenmalige seed).
+    """
+    client = client or ExerciseDBClient()
+    limiter = RateLimiter(rate_per_sec, burst=concurrency)
+    result = ImportResult()
+    started = time.monotonic()
+
+    offset, rows_before, finished = 0, 0, False
+    if checkpoint and not restart:
+        offset, rows_before, finished = _load_checkpoint(conn, checkpoint)
+    if finished:
+        result.next_offset = offset
+        result.finished = True
+        return result
+
+    def fetch(page_offset: int) -> list[dict]:
+        limiter.acquire()
+        return client.fetch_exercises_page(offset=page_offset, limit=page_size)
+
+    seen_first_ids = set()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while not finished:
+            if max_total is not None and result.fetched >= max_total:
+                break
+
+            # Niet meer pagina's opvragen dan nodig voor max_total
+            n_pages = window_pages
+            if max_total is not None:
+                n_pages = min(n_pages, -(-(max_total - result.fetched) // page_size))
+            offsets = [offset + i * page_size for i in range(n_pages)]
+            # map() levert de pagina's op volgorde; een fout stopt het venster
+            pages = executor.map(fetch, offsets)
+
+            rows = []
+            error = None
+            fetched_before = result.fetched
+            try:
+                for page in pages:
+                    # Sommige API-plannen geven na het einde steeds dezelfde pagina terug
+                    first_id = page[0].get("id") if page else None
+                    if not page or (first_id is not None and first_id in seen_first_ids):
+                        finished = True
+                        break
+                    seen_first_ids.add(first_id)
+
+                    for ex in page:
+                        row = exercise_row(ex)
+                        if row:
+                            rows.append(row)
+
+                    result.pages += 1
+                    result.fetched += len(page)
+                    offset += page_size
+
+                    if len(page) < page_size:
+                        finished = True
+                        break
+                    if max_total is not None and result.fetched >= max_total:
+                        break
+            except Exception as e:
+                # Wat al binnen is wordt nog opgeslagen; daarna de fout doorgeven
+                error = e
+
+            if max_total is not None:
+                rows = rows[: max(0, max_total - fetched_before)]
+
+            # rowcount telt bij executemany alle echt ingevoegde regels op
+            # (dubbele namen worden door OR IGNORE overgeslagen)
+            cur = conn.executemany(
+                "INSERT OR IGNORE INTO exercises (name, muscle_group, equipment) VALUES (?, ?, ?)",
+                rows,
+            )
+            result.inserted += max(cur.rowcount, 0)
+            if checkpoint:
+                _save_checkpoint(conn, checkpoint, offset, rows_before + result.fetched, finished)
+            conn.commit()
+
+            result.seconds = time.monotonic() - started
+            result.next_offset = offset
+            result.finished = finished
+            if progress:
+                progress(result)
+
+            if error is not None:
+                raise error
+
+    result.seconds = time.monotonic() - started
+    return result
@@ -0,0 +1,181 @@
+# services/exercise_stats.py
+# Records en trainingsvolume per gebruiker per oefening (tabel exercise_stats).
+# - record_exercise: bijwerken na 1 toegevoegde oefening (1 upsert, geen SELECT vooraf)
+# - rebuild_exercise_stats: alles opnieuw berekenen uit workout_exercises
+# De upsert is zo geschreven dat de volgorde van toevoegen niet uitmaakt:
+# incrementeel en opnieuw opbouwen geven precies hetzelfde resultaat.
+# Bron: https://www.sqlite.org/lang_upsert.html
+import sqlite3
+
+from utils import epley_1rm
+
+_LAST = ("workout_id", "date", "sets", "reps", "weight")
+
+# Voorwaarden in de upsert (excluded = de nieuwe set, zonder prefix = wat er al staat)
+_BETTER_E1RM = (
+    "excluded.best_e1rm > COALESCE(best_e1rm, -1) "
+    "OR (excluded.best_e1rm = best_e1rm AND excluded.best_e1rm_date < best_e1rm_date)"
+)
+_HEAVIER = (
+    "excluded.heaviest_weight > COALESCE(heaviest_weight, -1) "
+    "OR (excluded.heaviest_weight = heaviest_weight AND excluded.heaviest_reps > heaviest_reps)"
+)
+_NEWER_THAN_LAST = "(excluded.last_date, excluded.last_workout_id) > (last_date, last_workout_id)"
+_NEWER_THAN_PREV = (
+    "prev_date IS NULL OR (excluded.last_date, excluded.last_workout_id) > (prev_date, prev_workout_id)"
+)
+
+_UPSERT_SQL = (
+    "INSERT INTO exercise_stats ("
+    "  user_id, exercise_id, best_e1rm, best_e1rm_date, heaviest_weight, heaviest_reps,"
+    "  total_volume, total_sets, times_performed,"
+    "  last_workout_id, last_date, last_sets, last_reps, last_weight"
+    ") VALUES ("
+    "  :user_id, :exercise_id, :e1rm, :e1rm_date, :weight, :heaviest_reps,"
+    "  :volume, :sets, 1,"
+    "  :workout_id, :date, :sets, :reps, :weight"
+    ") "
+    "ON CONFLICT (user_id, exercise_id) DO UPDATE SET "
+    f"best_e1rm = CASE WHEN {_BETTER_E1RM} THEN excluded.best_e1rm ELSE best_e1rm END, "
+    f"best_e1rm_date = CASE WHEN {_BETTER_E1RM} THEN excluded.best_e1rm_date ELSE best_e1rm_date END, "
+    f"heaviest_weight = CASE WHEN {_HEAVIER} THEN excluded.heaviest_weight ELSE heaviest_weight END, "
+    f"heaviest_reps = CASE WHEN {_HEAVIER} THEN excluded.heaviest_reps ELSE heaviest_reps END, "
+    "total_volume = total_volume + excluded.total_volume, "
+    "total_sets = total_sets + excluded.total_sets, "
+    "times_performed = times_performed + 1, "
+    # Alle SET-expressies zien de oude waarden: prev kan dus de oude last overnemen
+    + ", ".join(
+        f"prev_{c} = CASE WHEN {_NEWER_THAN_LAST} THEN last_{c} "
+        f"WHEN {_NEWER_THAN_PREV} THEN excluded.last_{c} ELSE prev_{c} END"
+        for c in _LAST
+    )
+    + ", "
+    + ", ".join(
+        f"last_{c} = CASE WHEN {_NEWER_THAN_LAST} THEN excluded.last_{c} ELSE last_{c} END"
+        for c in _LAST
+    )
+)
+
+
+def record_exercise(
+    conn: sqlite3.Connection,
+    user_id: int,
+    exercise_id: int,
+    workout_id: int,
+    workout_date: str,
+    sets: int,
+    reps: int,
+    weight: float | None,
+) -> None:
+    """Verwerkt 1 oefening uit een workout in exercise_stats (zelf committen)."""
+    e1rm = epley_1rm(weight, reps)
+    conn.execute(
+        _UPSERT_SQL,
+        {
+            "user_id": user_id,
+            "exercise_id": exercise_id,
+            "workout_id": workout_id,
+            "date": workout_date,
+            "sets": sets,
+            "reps": reps,
+            "weight": weight,
+            "e1rm": e1rm,
+            "e1rm_date": workout_date if e1rm is not None else None,
+            "heaviest_reps": reps if weight is not None else None,
+            "volume": sets * reps * (weight or 0.0),
+        },
+    )
+
+
+def rebuild_exercise_stats(
+    conn: sqlite3.Connection, user_id: int | None = None, commit: bool = True
+) -> int:
+    """
+    Berekent exercise_stats opnieuw uit workout_exercises (alle gebruikers, of 1).
+    Per (gebruiker, oefening) 1 groep; de 'beste', 'zwaarste' en 'laatste' sets
+    worden met ROW_NUMBER() gekozen, met dezelfde volgorde als de upsert.
+    commit=False: binnen een lopende transactie (migratie 0006).
+    Bron: https://www.sqlite.org/windowfunctions.html
+    """
+    # Zelfde Epley-functie als record_exercise (1 definitie, in utils)
+    conn.create_function("epley_1rm", 2, epley_1rm, deterministic=True)
+    where = "WHERE w.user_id = :user_id" if user_id is not None else ""
+
+    conn.execute(
+        "DELETE FROM exercise_stats" + (" WHERE user_id = :user_id" if user_id is not None else ""),
+        {"user_id": user_id},
+    )
+    cur = conn.execute(
+        f"""
+        INSERT INTO exercise_stats (
+          user_id, exercise_id, best_e1rm, best_e1rm_date, heaviest_weight, heaviest_reps,
+          total_volume, total_sets, times_performed,
+          last_workout_id, last_date, last_sets, last_reps, last_weight,
+          prev_workout_id, prev_date, prev_sets, prev_reps, prev_weight
+        )
+        WITH s AS (
+          SELECT w.user_id, we.exercise_id, w.id AS workout_id, w.workout_date AS date,
+                 we.sets, we.reps, we.weight, epley_1rm(we.weight, we.reps) AS e1rm
+          FROM workout_exercises we
+          JOIN workouts w ON w.id = we.workout_id
+          {where}
+        ),
+        ranked AS (
+          SELECT s.*,
+            ROW_NUMBER() OVER (PARTITION BY user_id, exercise_id ORDER BY e1rm DESC, date) AS best_rank,
+            ROW_NUMBER() OVER (PARTITION BY user_id, exercise_id ORDER BY weight DESC, reps DESC) AS heavy_rank,
+            ROW_NUMBER() OVER (PARTITION BY user_id, exercise_id ORDER BY date DESC, workout_id DESC) AS recent_rank
+          FROM s
+        )
+        SELECT user_id, exercise_id,
+          MAX(CASE WHEN best_rank = 1 THEN e1rm END),
+          MAX(CASE WHEN best_rank = 1 AND e1rm IS NOT NULL THEN date END),
+          MAX(CASE WHEN heavy_rank = 1 THEN weight END),
+          MAX(CASE WHEN heavy_rank = 1 AND weight IS NOT NULL THEN reps END),
+          SUM(sets * reps * COALESCE(weight, 0.0)), SUM(sets), COUNT(*),
+          MAX(CASE WHEN recent_rank = 1 THEN workout_id END),
+          MAX(CASE WHEN recent_rank = 1 THEN date END),
+          MAX(CASE WHEN recent_rank = 1 THEN sets END),
+          MAX(CASE WHEN recent_rank = 1 THEN reps END),
+          MAX(CASE WHEN recent_rank = 1 THEN weight END),
+          MAX(CASE WHEN recent_rank = 2 THEN workout_id END),
+          MAX(CASE WHEN recent_rank = 2 THEN date END),
+          MAX(CASE WHEN recent_rank = 2 THEN sets END),
+          MAX(CASE WHEN recent_rank = 2 THEN reps END),
+          MAX(CASE WHEN recent_rank = 2 THEN weight END)
+        FROM ranked
+        GROUP BY user_id, exercise_id
+        """,
+        {"user_id": user_id},
+    )
+    if commit:
+        conn.commit()
+    return cur.rowcount
+
+
+def get_exercise_stats(conn: sqlite3.Connection, user_id: int, exercise_id: int | None = None) -> list[dict]:
+    """Stats van 1 of alle oefeningen van een gebruiker, meest recent eerst."""
+    rows = conn.execute(
+        "SELECT s.*, e.name "
+        "FROM exercise_stats s "
+        "JOIN exercises e ON e.id = s.exercise_id "
+        "WHERE s.user_id = :user_id AND (:exercise_id IS NULL OR s.exercise_id = :exercise_id) "
+        "ORDER BY s.last_date DESC, s.exercise_id",
+        {"user_id": user_id, "exercise_id": exercise_id},
+    ).fetchall()
+    return [
+        {
+            "exercise_id": r["exercise_id"],
+            "name": r["name"],
+            "best_e1rm": round(r["best_e1rm"], 1) if r["best_e1rm"] is not None else None,
+            "best_e1rm_date": r["best_e1rm_date"],
+            "heaviest_weight": r["heaviest_weight"],
+            "heaviest_reps": r["heaviest_reps"],
+            "total_volume": round(r["total_volume"], 1),
+            "total_sets": r["total_sets"],
+            "times_performed": r["times_performed"],
+            "last": {c: r[f"last_{c}"] for c in _LAST},
+            "previous": {c: r[f"prev_{c}"] for c in _LAST} if r["prev_workout_id"] else None,
+        }
+        for r in rows
+    ]
@@ -1,8 +1,10 @@
 # services/exercisedb_client.py
 import os
-import requests
 
-BASE_URL = "https://exercisedb.p.rapidapi.com"
+from services import http_client
+
+# Basis-URL (overschrijfbaar voor lokale tests / load tests)
+BASE_URL = os.environ.get("EXERCISEDB_BASE_URL", "https://exercisedb.p.rapidapi.com")
 
 
 class ExerciseDBClient:
@@ -26,12 +28,12 @@ class ExerciseDBClient:
         url = f"{BASE_URL}/exercises"
         params = {"offset": offset, "limit": limit}
 
-        # HTTP request naar de API
-        r = requests.get(
+        # HTTP request naar de API (gedeelde sessie met keep-alive + retries)
+        r = http_client.get(
             url,
             headers=self.headers,
             params=params,
-            timeout=30,
+            read_timeout=30,
         )
 
         r.raise_for_status()
@@ -0,0 +1,156 @@
+# services/exporter.py
+# Export van de volledige geschiedenis (voeding, gewicht, workouts) als CSV of NDJSON.
+# - Streaming: de rijen worden per chunk opgehaald en meteen weggeschreven,
+#   dus het geheugengebruik hangt niet af van de grootte van de geschiedenis
+# - Keyset-paginatie (user_id, datum, id) i.p.v. 1 grote SELECT: elke chunk is
+#   een korte losse query, er blijft geen leestransactie open staan
+#   (een lange lezer houdt in WAL-modus de checkpoint tegen)
+# - Eigen connectie: het antwoord wordt pas na het request verstuurd, als de
+#   request-connectie al terug in de pool zit
+# - Optioneel gzip, ook per chunk (zlib met gzip-header)
+# Bron: https://use-the-index-luke.com/no-offset
+import csv
+import io
+import json
+import zlib
+from dataclasses import dataclass
+
+import db
+
+FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+CHUNK_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class Dataset:
+    name: str
+    columns: tuple[str, ...]
+    # Keyset: (user_id, date_column, id), zoals de index (user_id, datum) + rowid
+    date_column: str
+    # SQL met {keyset} en named parameters :user_id, :k0, :k1, :k2 en :limit
+    sql: str
+
+
+# De kolomnamen van 'food' passen op de dagboek-import (services/diary_importer.py):
+# een export kan dus direct weer geïmporteerd worden.
+DATASETS = {
+    "food": Dataset(
+        "food",
+        ("log_date", "food_name", "amount_grams", "kcal", "protein", "carbs", "fat", "id"),
+        "log_date",
+        "SELECT id, user_id, log_date, food_name, amount_grams, kcal, protein, carbs, fat "
+        "FROM food_logs "
+        "WHERE {keyset} "
+        "ORDER BY user_id, log_date, id LIMIT :limit",
+    ),
+    "weight": Dataset(
+        "weight",
+        ("log_date", "weight", "id"),
+        "log_date",
+        "SELECT id, user_id, log_date, weight "
+        "FROM weight_logs "
+        "WHERE {keyset} "
+        "ORDER BY user_id, log_date, id LIMIT :limit",
+    ),
+    # 1 regel per oefening (workouts zonder oefeningen: 1 regel met lege velden).
+    # De chunk telt workouts, zodat een workout nooit over 2 chunks wordt verdeeld.
+    "workouts": Dataset(
+        "workouts",
+        ("workout_date", "workout_type", "notes", "exercise", "sets", "reps", "weight", "workout_id"),
+        "workout_date",
+        "WITH page AS ("
+        "  SELECT id, user_id, workout_date, workout_type, notes FROM workouts "
+        "  WHERE {keyset} "
+        "  ORDER BY user_id, workout_date, id LIMIT :limit"
+        ") "
+        "SELECT p.id, p.id AS workout_id, p.user_id, p.workout_date, p.workout_type, p.notes, "
+        "e.name AS exercise, we.sets, we.reps, we.weight "
+        "FROM page p "
+        "LEFT JOIN workout_exercises we ON we.workout_id = p.id "
+        "LEFT JOIN exercises e ON e.id = we.exercise_id "
+        "ORDER BY p.user_id, p.workout_date, p.id, we.id",
+    ),
+}
+
+
+
+def iter_chunks(conn, dataset: Dataset, user_id: int | None = None, chunk_size: int = CHUNK_SIZE):
+    """
+    Rijen per chunk (lijst van sqlite3.Row), in volgorde van (user_id, datum, id).
+    user_id=None: alle gebruikers (export voor analyse).
+    """
+    d = dataset.date_column
+    # Zo schrijven dat SQLite de index als bereik gebruikt (EXPLAIN QUERY PLAN:
+    # "user_id=? AND log_date>?"); elke chunk begint dus direct op de goede plek
+    if user_id is not None:
+        keyset = f"user_id = :user_id AND ({d}, id) > (:k1, :k2)"
+    else:
+        keyset = f"(user_id, {d}, id) > (:k0, :k1, :k2)"
+    sql = dataset.sql.format(keyset=keyset)
+    params = {"user_id": user_id, "k0": user_id or 0, "k1": "", "k2": 0, "limit": chunk_size}
+
+    while True:
+        rows = conn.execute(sql, params).fetchall()
+        if not rows:
+            return
+        yield rows
+        last = rows[-1]
+        params.update(k0=last["user_id"], k1=last[d], k2=last["id"])
+
+
+def _encode_chunk(rows, columns: tuple[str, ...], fmt: str) -> str:
+    if fmt == "csv":
+        buf = io.StringIO()
+        writer = csv.writer(buf, lineterminator="\n")
+        writer.writerows([row[c] for c in columns] for row in rows)
+        return buf.getvalue()
+    return "".join(
+        json.dumps({c: row[c] for c in columns}, ensure_ascii=False) + "\n" for row in rows
+    )
+
+
+def iter_export(
+    dataset_name: str,
+    user_id: int | None = None,
+    fmt: str = "csv",
+    compress: bool = False,
+    chunk_size: int = CHUNK_SIZE,
+):
+    """
+    Generator met de export als bytes (per chunk), bruikbaar als Flask-response
+    of om naar een bestand te schrijven. Opent en sluit zijn eigen connectie.
+    """
+    dataset = DATASETS[dataset_name]
+    if fmt not in FORMATS:
+        raise ValueError(f"Onbekend formaat: {fmt}")
+
+    columns = dataset.columns
+    if user_id is None:
+        columns = ("user_id",) + columns
+
+    # wbits=31: gzip-formaat (header + CRC), zodat het resultaat een geldig .gz-bestand is
+    # Bron: https://docs.python.org/3/library/zlib.html#zlib.compressobj
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+
+    def out(text: str) -> bytes:
+        data = text.encode("utf-8")
+        return compressor.compress(data) if compressor else data
+
+    conn = db.get_db_connection()
+    try:
+        if fmt == "csv":
+            yield out(",".join(columns) + "\n")
+        for rows in iter_chunks(conn, dataset, user_id, chunk_size):
+            # gzip geeft soms nog niets terug (buffert intern): dan niets versturen
+            data = out(_encode_chunk(rows, columns, fmt))
+            if data:
+                yield data
+        if compressor:
+            yield compressor.flush()
+    finally:
+        conn.close()
+
+
+def export_filename(dataset_name: str, fmt: str, compress: bool, suffix: str = "") -> str:
+    name = f"{dataset_name}{suffix}.{fmt}"
+    return name + ".gz" if compress else name
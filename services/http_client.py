@@ -0,0 +1,141 @@
+# services/http_client.py
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import metrics
+
+# Instellingen via environment variables (met veilige standaardwaarden)
+CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", "10"))
+RETRIES = int(os.environ.get("HTTP_RETRIES", "2"))
+BACKOFF_FACTOR = float(os.environ.get("HTTP_BACKOFF_FACTOR", "0.3"))
+BACKOFF_MAX = float(os.environ.get("HTTP_BACKOFF_MAX", "2"))
+POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", "10"))
+
+# Alleen bij deze statuscodes opnieuw proberen (rate limit en serverfouten)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_lock = threading.Lock()
+_pid = os.getpid()
+_sessions: dict[str, requests.Session] = {}
+_host_stats: dict[str, dict] = {}
+
+
+def _make_session() -> requests.Session:
+    """
+    1 Session per host: verbindingen (TCP + TLS) blijven open en worden
+    hergebruikt (keep-alive), met een begrensd aantal retries en backoff.
+    Bron: https://requests.readthedocs.io/en/latest/user/advanced/#session-objects
+    """
+    retry = Retry(
+        total=RETRIES,
+        connect=RETRIES,
+        # Geen retry na een read-timeout of afgebroken response: een gebruiker
+        # wacht op dit request. Alleen verbindingsfouten en 429/5xx worden
+        # opnieuw geprobeerd. Een trage 5xx kan per poging nog steeds tot
+        # READ_TIMEOUT duren: in het slechtste geval (RETRIES + 1) x READ_TIMEOUT
+        # plus backoff (standaard 3 x 10 s + 0.6 s).
+        read=0,
+        status=RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        backoff_max=BACKOFF_MAX,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET"}),
+        # Retry-After kan minuten zijn: een request-worker mag daar niet op wachten
+        respect_retry_after_header=False,
+        # Na de laatste poging gewoon de response teruggeven (raise_for_status doet de rest)
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def session_for(url: str) -> requests.Session:
+    """Geeft de gedeelde Session voor de host van deze URL (per worker-proces)."""
+    global _pid
+
+    host = urlsplit(url).netloc
+    with _lock:
+        # Na een fork (gunicorn) geen sockets van het parent-proces hergebruiken
+        if _pid != os.getpid():
+            _pid = os.getpid()
+            _sessions.clear()
+            _host_stats.clear()
+
+        session = _sessions.get(host)
+        if session is None:
+            session = _sessions[host] = _make_session()
+        return session
+
+
+def _record(host: str, elapsed_ms: float, status: int | None = None, error: bool = False, timeout: bool = False):
+    metrics.observe("upstream_request_duration_seconds", elapsed_ms / 1000, host=host)
+    metrics.inc("upstream_requests_total", host=host, status=status if status is not None else "none")
+    if error:
+        metrics.inc("upstream_errors_total", host=host)
+    if timeout:
+        metrics.inc("upstream_timeouts_total", host=host)
+
+    with _lock:
+        stats = _host_stats.setdefault(
+            host,
+            {"requests": 0, "errors": 0, "timeouts": 0, "total_ms": 0.0, "max_ms": 0.0},
+        )
+        stats["requests"] += 1
+        stats["errors"] += int(error)
+        stats["timeouts"] += int(timeout)
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+
+def get(
+    url: str,
+    headers: dict | None = None,
+    params: dict | None = None,
+    read_timeout: float | None = None,
+) -> requests.Response:
+    """GET via de gedeelde Session van deze host, met timeouts en latency-meting."""
+    host = urlsplit(url).netloc
+    timeout = (CONNECT_TIMEOUT, read_timeout if read_timeout is not None else READ_TIMEOUT)
+
+    started = time.perf_counter()
+    try:
+        r = session_for(url).get(url, headers=headers, params=params, timeout=timeout)
+    except requests.RequestException as e:
+        _record(
+            host,
+            (time.perf_counter() - started) * 1000,
+            error=True,
+            timeout=isinstance(e, requests.Timeout),
+        )
+        raise
+
+    _record(
+        host,
+        (time.perf_counter() - started) * 1000,
+        status=r.status_code,
+        error=r.status_code >= 500,
+    )
+    return r
+
+
+def host_stats() -> dict:
+    """Aantal requests, fouten en latency per host (voor dit worker-proces)."""
+    with _lock:
+        result = {}
+        for host, stats in _host_stats.items():
+            result[host] = dict(stats)
+            result[host]["avg_ms"] = (
+                round(stats["total_ms"] / stats["requests"], 1) if stats["requests"] else 0.0
+            )
+        return result
@@ -1,12 +1,18 @@
 import os
-import requests
+
+# Gedeelde HTTP-sessies (keep-alive + retries) voor alle API-clients
+from services import http_client
+
+# Gedeelde (SQLite) cache, zodat herhaald zoeken geen API-calls kost
+from services.response_cache import mealdb_cache
 
 
 class MealDBClient:
     # Basis-URL van TheMealDB API via RapidAPI
-    BASE_URL = "https://themealdb.p.rapidapi.com"
+    # (overschrijfbaar voor lokale tests / load tests)
+    BASE_URL = os.environ.get("MEALDB_BASE_URL", "https://themealdb.p.rapidapi.com")
 
-    def __init__(self):
+    def __init__(self, cache=mealdb_cache):
         # API key ophalen uit environment variables.
         # Zo staat de sleutel niet hardcoded in de code.
         key = os.getenv("RAPIDAPI_KEY")
@@ -20,6 +26,26 @@ class MealDBClient:
             "x-rapidapi-key": key,
             "x-rapidapi-host": "themealdb.p.rapidapi.com",
         }
+        self.cache = cache
+
+    def _get_json(self, endpoint: str, params: dict, timeout: float | None = None) -> dict:
+        r = http_client.get(
+            f"{self.BASE_URL}/{endpoint}",
+            headers=self.headers,
+            params=params,
+            read_timeout=timeout,
+        )
+        r.raise_for_status()
+        return r.json()
+
+    def _cached_meals(self, endpoint: str, params: dict) -> list:
+        """Alleen de lijst met meals cachen (ook een lege lijst: 'niets gevonden')."""
+        def fetch():
+            return self._get_json(endpoint, params).get("meals") or []
+
+        if self.cache is None:
+            return fetch()
+        return self.cache.get_or_fetch(endpoint, params, fetch)
 
     # ----------------
     # Zoeken
@@ -27,27 +53,12 @@ class MealDBClient:
 
     def search_by_first_letter(self, letter: str):
         """Zoek recepten op eerste letter (a-z)"""
-        r = requests.get(
-            f"{self.BASE_URL}/search.php",
-            headers=self.headers,
-            params={"f": letter.lower()},
-            timeout=10,
-        )
-        r.raise_for_status()
-        data = r.json()
-        return data.get("meals") or []
+        return self._cached_meals("search.php", {"f": letter.lower()})
 
     def search_by_name(self, name: str):
         """Zoek recepten op naam"""
-        r = requests.get(
-            f"{self.BASE_URL}/search.php",
-            headers=self.headers,
-            params={"s": name},
-            timeout=10,
-        )
-        r.raise_for_status()
-        data = r.json()
-        return data.get("meals") or []
+        # Hoofdletters maken voor de API niet uit, voor de cache-key wel
+        return self._cached_meals("search.php", {"s": name.strip().lower()})
 
     # ----------------
     # Detail
@@ -55,31 +66,16 @@ class MealDBClient:
 
     def lookup_by_id(self, meal_id: str):
         """Haal 1 recept op via idMeal"""
-        r = requests.get(
-            f"{self.BASE_URL}/lookup.php",
-            headers=self.headers,
-            params={"i": str(meal_id)},
-            timeout=10,
-        )
-        r.raise_for_status()
-        data = r.json()
-
-        meals = data.get("meals") or []
+        meals = self._cached_meals("lookup.php", {"i": str(meal_id)})
         return meals[0] if meals else None
 
     # ----------------
     # Inspiratie (dashboard)
     # ----------------
 
-    def random_meal(self):
+    def random_meal(self, timeout: float | None = None):
         """Haal 1 random recept op"""
-        r = requests.get(
-            f"{self.BASE_URL}/random.php",
-            headers=self.headers,
-            timeout=10,
-        )
-        r.raise_for_status()
-        data = r.json()
+        data = self._get_json("random.php", {}, timeout=timeout)
 
         meals = data.get("meals") or []
         return meals[0] if meals else None
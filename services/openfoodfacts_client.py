@@ -1,44 +1,157 @@
+import os
+import sqlite3
+
 import requests
 
+from db import get_db_connection
+from services import http_client
+
+API_SOURCE = "openfoodfacts"
+# Basis-URL (overschrijfbaar voor lokale tests / load tests)
+BASE_URL = os.environ.get("OPENFOODFACTS_BASE_URL", "https://world.openfoodfacts.org")
+
+# Hoe lang een product in de foods-tabel als 'vers' geldt
+FOOD_TTL = "-30 days"
+# Hoe lang we onthouden dat een barcode niet bestaat bij Open Food Facts
+MISS_TTL = "-1 day"
+
+
+def _product_dict(barcode: str, name, kcal, fat, carbs, protein) -> dict:
+    # Alle velden die de zoekpagina nodig heeft (waardes per 100 gram)
+    return {
+        "barcode": barcode,
+        "api_id": barcode,
+        "name": name,
+        "kcal_100g": kcal,
+        "fat_100g": fat,
+        "carbs_100g": carbs,
+        "protein_100g": protein,
+    }
 
-def get_product_by_barcode(barcode: str) -> dict | None:
+
+def _lookup_local(conn: sqlite3.Connection, barcode: str) -> tuple[dict | None, bool]:
     """
-    Haalt productinformatie op via Open Food Facts op basis van een barcode.
-    Geeft een dictionary terug met voedingswaarden per 100 gram,
-    of None als het product niet gevonden wordt.
+    Zoekt eerst in de eigen database.
+    Geeft (product, bekende_miss) terug.
     """
+    row = conn.execute(
+        """
+        SELECT name, kcal_per_100, fat_per_100, carbs_per_100, protein_per_100
+        FROM foods
+        WHERE api_source = ? AND api_id = ? AND created_at >= datetime('now', ?)
+        """,
+        (API_SOURCE, barcode, FOOD_TTL),
+    ).fetchone()
+    if row is not None:
+        return _product_dict(barcode, *row), False
+
+    miss = conn.execute(
+        "SELECT 1 FROM food_lookup_misses WHERE barcode = ? AND checked_at >= datetime('now', ?)",
+        (barcode, MISS_TTL),
+    ).fetchone()
+    return None, miss is not None
 
-    url = f"https://world.openfoodfacts.org/api/v2/product/{barcode}.json"
+
+def _fetch_remote(barcode: str) -> tuple[dict | None, bool]:
+    """
+    Haalt het product op bij Open Food Facts.
+    Geeft (product, gevonden) terug; bij een netwerkfout is het (None, False)
+    zonder dat we de barcode als 'onbekend' opslaan.
+    """
+    url = f"{BASE_URL}/api/v2/product/{barcode}.json"
 
     headers = {
         "User-Agent": "MyFitnessTracker (student project)"
     }
 
     try:
-        # HTTP request naar de API
-        r = requests.get(url, headers=headers, timeout=10)
-        r.raise_for_status()
+        # HTTP request naar de API (gedeelde sessie met keep-alive + retries)
+        r = http_client.get(url, headers=headers)
+        # 404 = product bestaat niet (dat willen we wel onthouden)
+        if r.status_code != 404:
+            r.raise_for_status()
         data = r.json()
-    except requests.RequestException:
+    except (requests.RequestException, ValueError):
         # Bij netwerkfouten of timeouts None teruggeven
-        return None
+        return None, False
 
     # status == 1 betekent dat het product is gevonden
     if data.get("status") != 1:
-        return None
+        return None, True
 
     product = data.get("product", {})
     nutriments = product.get("nutriments", {})
 
-    # Alle velden ophalen die nodig zijn
-    return {
-        "barcode": barcode,
-        "name": product.get("product_name")
-                or product.get("product_name_nl")
-                or product.get("product_name_en")
-                or "Onbekend product",
-        "kcal_100g": nutriments.get("energy-kcal_100g"),
-        "fat_100g": nutriments.get("fat_100g"),
-        "carbs_100g": nutriments.get("carbohydrates_100g"),
-        "protein_100g": nutriments.get("proteins_100g"),
-    }
+    return _product_dict(
+        barcode,
+        product.get("product_name")
+        or product.get("product_name_nl")
+        or product.get("product_name_en")
+        or "Onbekend product",
+        nutriments.get("energy-kcal_100g"),
+        nutriments.get("fat_100g"),
+        nutriments.get("carbohydrates_100g"),
+        nutriments.get("proteins_100g"),
+    ), True
+
+
+def _store(conn: sqlite3.Connection, barcode: str, product: dict | None):
+    if product is None:
+        conn.execute(
+            """
+            INSERT INTO food_lookup_misses (barcode) VALUES (?)
+            ON CONFLICT(barcode) DO UPDATE SET checked_at = CURRENT_TIMESTAMP
+            """,
+            (barcode,),
+        )
+    else:
+        # created_at = moment van ophalen bij de API (daarop verloopt de cache)
+        conn.execute(
+            """
+            INSERT INTO foods (api_source, api_id, name, kcal_per_100, protein_per_100, carbs_per_100, fat_per_100)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(api_source, api_id) DO UPDATE SET
+              name=excluded.name,
+              kcal_per_100=excluded.kcal_per_100,
+              protein_per_100=excluded.protein_per_100,
+              carbs_per_100=excluded.carbs_per_100,
+              fat_per_100=excluded.fat_per_100,
+              created_at=CURRENT_TIMESTAMP
+            """,
+            (
+                API_SOURCE, barcode, product["name"], product["kcal_100g"],
+                product["protein_100g"], product["carbs_100g"], product["fat_100g"],
+            ),
+        )
+        conn.execute("DELETE FROM food_lookup_misses WHERE barcode = ?", (barcode,))
+    conn.commit()
+
+
+def get_product_by_barcode(barcode: str, conn: sqlite3.Connection | None = None) -> dict | None:
+    """
+    Haalt productinformatie op op basis van een barcode.
+    Eerst uit de foods-tabel (read-through cache), alleen bij een onbekende
+    of verlopen barcode via Open Food Facts.
+    Geeft een dictionary terug met voedingswaarden per 100 gram,
+    of None als het product niet gevonden wordt.
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = get_db_connection()
+
+    try:
+        product, known_miss = _lookup_local(conn, barcode)
+        if product is not None or known_miss:
+            return product
+
+        product, found = _fetch_remote(barcode)
+        if found:
+            try:
+                _store(conn, barcode, product)
+            except sqlite3.Error as e:
+                # Cache bijwerken mislukt: het resultaat is nog steeds bruikbaar
+                print("Foods cache error:", e)
+        return product
+    finally:
+        if own_conn:
+            conn.close()
@@ -0,0 +1,145 @@
+# services/recipe_prefetcher.py
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+
+from services.mealdb_client import MealDBClient
+
+
+class RecipePrefetcher:
+    """
+    Houdt per worker een voorraad unieke random recepten bij voor het dashboard.
+    - Bijvullen gebeurt in een achtergrond-thread, met meerdere calls tegelijk
+      en een harde totale deadline.
+    - Het dashboard leest alleen uit de voorraad en wacht nooit op het netwerk.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 12,
+        max_workers: int = 4,
+        deadline: float = 8.0,
+        refresh_after: float = 6 * 3600,
+        retry_after: float = 60.0,
+    ):
+        self.pool_size = pool_size
+        self.max_workers = max_workers
+        self.deadline = deadline
+        self.refresh_after = refresh_after
+        self.retry_after = retry_after
+
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        # De lijst wordt nooit aangepast, alleen in zijn geheel vervangen:
+        # lezen kan daardoor zonder lock.
+        self._meals: list[dict] = []
+        self._filled_at = 0.0
+        self._next_attempt = 0.0
+        self._refilling = False
+
+    def get(self, n: int = 3) -> list[dict]:
+        """Geeft (maximaal) n recepten uit de voorraad, zonder netwerk-call."""
+        self._maybe_refill()
+        meals = self._meals
+        if len(meals) <= n:
+            return list(meals)
+        return random.sample(meals, n)
+
+    def stats(self) -> dict:
+        return {
+            "pid": self._pid,
+            "size": len(self._meals),
+            "age_seconds": round(time.time() - self._filled_at, 1) if self._filled_at else None,
+            "refilling": self._refilling,
+        }
+
+    def _maybe_refill(self):
+        now = time.time()
+
+        with self._lock:
+            # Na een fork (gunicorn) heeft deze worker nog geen eigen thread
+            if self._pid != os.getpid():
+                self._reset()
+
+            stale = now - self._filled_at > self.refresh_after
+            too_small = len(self._meals) < self.pool_size
+            if self._refilling or not (stale or too_small) or now < self._next_attempt:
+                return
+            self._refilling = True
+
+        threading.Thread(target=self._refill, name="recipe-prefetcher", daemon=True).start()
+
+    def _refill(self):
+        found: dict[str, dict] = {}
+        try:
+            found = self._fetch_distinct()
+        except Exception as e:
+            # Bijv. geen RAPIDAPI_KEY: dashboard blijft gewoon werken
+            print("MealDB error (recipe prefetcher):", e)
+        finally:
+            with self._lock:
+                if found:
+                    # Nieuwe recepten eerst; aanvullen met de oude voorraad
+                    merged = dict(found)
+                    for meal in self._meals:
+                        if len(merged) >= self.pool_size:
+                            break
+                        merged.setdefault(meal["idMeal"], meal)
+                    self._meals = list(merged.values())
+
+                if len(found) >= self.pool_size:
+                    self._filled_at = time.time()
+                else:
+                    # Niet (helemaal) gelukt: niet bij elke render opnieuw proberen
+                    self._next_attempt = time.time() + self.retry_after
+                self._refilling = False
+
+    def _fetch_distinct(self) -> dict[str, dict]:
+        client = MealDBClient()
+        started = time.monotonic()
+        found: dict[str, dict] = {}
+
+        # Iets meer calls dan nodig: random.php geeft soms dubbele recepten
+        attempts = self.pool_size * 2
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            futures = [
+                executor.submit(client.random_meal, timeout=self.deadline)
+                for _ in range(attempts)
+            ]
+            for fut in as_completed(futures, timeout=self.deadline):
+                try:
+                    meal = fut.result()
+                except Exception:
+                    continue
+
+                meal_id = meal.get("idMeal") if meal else None
+                if meal_id and meal_id not in found:
+                    found[meal_id] = meal
+                if len(found) >= self.pool_size:
+                    break
+        except FuturesTimeout:
+            # Harde deadline: we houden wat binnen is
+            pass
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        print(
+            f"Recipe prefetcher: {len(found)} recepten in "
+            f"{time.monotonic() - started:.2f}s"
+        )
+        return found
+
+
+# Eén gedeelde voorraad per worker-proces
+prefetcher = RecipePrefetcher()
+
+
+def recipes_of_the_day(n: int = 3) -> list[dict]:
+    """Recepten voor het dashboard (constante tijd, nooit wachten op de API)."""
+    return prefetcher.get(n)
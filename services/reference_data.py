@@ -0,0 +1,126 @@
+# services/reference_data.py
+# Lookup-tabellen (activity_levels, goals) in het geheugen van de worker.
+# Deze tabellen veranderen alleen via seed.sql/migraties, dus per request
+# opnieuw opvragen is zonde. Bij het opstarten 1x inlezen; daarna:
+# - opzoeken op id = dict-lookup, geen SQL
+# - hooguit elke REFERENCE_TTL_S seconden 1 query op catalog_versions om te zien
+#   of de data gewijzigd is (versie wordt opgehoogd door triggers, migratie 0007)
+# Records gebruiken __slots__ (klein, snel) en zijn alleen-lezen.
+# Bron: https://docs.python.org/3/reference/datamodel.html#slots
+import os
+import sqlite3
+import threading
+import time
+from types import MappingProxyType
+
+import db
+
+REFERENCE_TTL_S = float(os.environ.get("REFERENCE_TTL_S", "30"))
+
+
+class _Record:
+    """Alleen-lezen record: velden staan in __slots__ van de subklasse."""
+
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is alleen-lezen")
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class ActivityLevel(_Record):
+    __slots__ = ("id", "name", "multiplier")
+
+
+class Goal(_Record):
+    __slots__ = ("id", "name", "kcal_adjustment")
+
+
+class ReferenceData(_Record):
+    """
+    Snapshot van alle lookup-tabellen (1 versie).
+    Tuples (op id gesorteerd) voor keuzelijsten, read-only dicts voor validatie.
+    """
+
+    __slots__ = ("version", "activity_levels", "goals", "activity_by_id", "goals_by_id")
+
+
+def _version(conn: sqlite3.Connection) -> int:
+    row = conn.execute(
+        "SELECT version FROM catalog_versions WHERE name = 'reference_data'"
+    ).fetchone()
+    return int(row[0]) if row else 0
+
+
+def _load(conn: sqlite3.Connection, version: int) -> ReferenceData:
+    activity_levels = tuple(
+        ActivityLevel(r[0], r[1], float(r[2]))
+        for r in conn.execute("SELECT id, name, multiplier FROM activity_levels ORDER BY id")
+    )
+    goals = tuple(
+        Goal(r[0], r[1], int(r[2]))
+        for r in conn.execute("SELECT id, name, kcal_adjustment FROM goals ORDER BY id")
+    )
+    return ReferenceData(
+        version,
+        activity_levels,
+        goals,
+        MappingProxyType({a.id: a for a in activity_levels}),
+        MappingProxyType({g.id: g for g in goals}),
+    )
+
+
+class _Registry:
+    def __init__(self, ttl_s: float):
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._data: ReferenceData | None = None
+        self._checked_at = 0.0
+
+    def get(self, conn: sqlite3.Connection) -> ReferenceData:
+        """Huidige snapshot; de versiecheck gebeurt hooguit 1x per ttl_s."""
+        data = self._data
+        if data is not None and time.monotonic() - self._checked_at < self.ttl_s:
+            return data
+
+        with self._lock:
+            # Een andere thread kan intussen al gecontroleerd hebben
+            if self._data is not None and time.monotonic() - self._checked_at < self.ttl_s:
+                return self._data
+            version = _version(conn)
+            if self._data is None or self._data.version != version:
+                self._data = _load(conn, version)
+            self._checked_at = time.monotonic()
+            return self._data
+
+    def invalidate(self) -> None:
+        """Volgende get() controleert de versie meteen (bijv. na een wijziging in dit proces)."""
+        self._checked_at = 0.0
+
+
+_registry = _Registry(REFERENCE_TTL_S)
+
+
+def reference_data(conn: sqlite3.Connection) -> ReferenceData:
+    """Gebruik in routes: reference_data(get_db()).goals_by_id.get(goal_id)"""
+    return _registry.get(conn)
+
+
+def invalidate() -> None:
+    _registry.invalidate()
+
+
+def preload() -> None:
+    """Bij het opstarten inlezen, zodat ook het eerste request geen lookup-queries doet."""
+    conn = db.get_db_connection()
+    try:
+        _registry.get(conn)
+    finally:
+        conn.close()
@@ -0,0 +1,228 @@
+# services/response_cache.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlencode
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_PATH = os.environ.get("RESPONSE_CACHE_PATH", os.path.join(BASE_DIR, "cache.db"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS response_cache (
+  key TEXT PRIMARY KEY,               -- endpoint + gesorteerde parameters
+  value TEXT NOT NULL,                -- JSON
+  fetched_at REAL NOT NULL,           -- unix tijd van ophalen bij de API
+  last_access REAL NOT NULL           -- voor LRU opruimen
+);
+CREATE INDEX IF NOT EXISTS idx_response_cache_last_access
+ON response_cache(last_access);
+"""
+
+
+class ResponseCache:
+    """
+    Gedeelde cache voor API-responses, opgeslagen in een eigen SQLite-bestand
+    zodat alle gunicorn workers dezelfde kopie gebruiken.
+    - ttl: zo lang is een response vers
+    - stale_ttl: daarna nog zo lang bruikbaar, terwijl op de achtergrond
+      een nieuwe versie wordt opgehaald (stale-while-revalidate)
+    - max_entries: daarboven worden de minst recent gebruikte regels verwijderd
+    """
+
+    # last_access niet bij elke hit wegschrijven (scheelt writes)
+    TOUCH_INTERVAL = 60.0
+
+    def __init__(
+        self,
+        path: str = CACHE_PATH,
+        ttl: float = 7 * 24 * 3600,
+        stale_ttl: float = 30 * 24 * 3600,
+        max_entries: int = 5000,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._revalidating: set[str] = set()
+        self._counters = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "revalidations": 0,
+            "errors": 0,
+            "evictions": 0,
+        }
+
+    # ----------------
+    # Connectie (per thread en per proces)
+    # ----------------
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode = WAL;")
+            conn.execute("PRAGMA synchronous = NORMAL;")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _close_conn(self):
+        """Sluit de connectie van deze thread (voor threads die daarna stoppen)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            conn.close()
+
+    @staticmethod
+    def make_key(endpoint: str, params: dict | None = None) -> str:
+        return endpoint + "?" + urlencode(sorted((params or {}).items()))
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            self._counters[name] += n
+
+    # ----------------
+    # Lezen / schrijven
+    # ----------------
+
+    def get_or_fetch(self, endpoint: str, params: dict | None, fetch):
+        """
+        Geeft de gecachte waarde voor (endpoint, params), of roept fetch() aan
+        en slaat het resultaat op. Fouten van fetch() bij een miss gaan door naar
+        de aanroeper; bij een stale hit blijft de oude waarde gewoon staan.
+        """
+        key = self.make_key(endpoint, params)
+        now = time.time()
+
+        try:
+            row = self._conn().execute(
+                "SELECT value, fetched_at, last_access FROM response_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+        except sqlite3.Error as e:
+            # Cache kapot of gelockt: dan maar direct naar de API
+            print("Response cache error:", e)
+            self._count("errors")
+            return fetch()
+
+        if row is not None:
+            value, fetched_at, last_access = row
+            age = now - fetched_at
+
+            if age < self.ttl + self.stale_ttl:
+                if now - last_access > self.TOUCH_INTERVAL:
+                    self._touch(key, now)
+
+                if age < self.ttl:
+                    self._count("hits")
+                else:
+                    self._count("stale_hits")
+                    self._revalidate_async(key, fetch)
+                return json.loads(value)
+
+        self._count("misses")
+        value = fetch()
+        self._store(key, value)
+        return value
+
+    def _touch(self, key: str, now: float):
+        try:
+            self._conn().execute(
+                "UPDATE response_cache SET last_access = ? WHERE key = ?",
+                (now, key),
+            )
+        except sqlite3.Error:
+            self._count("errors")
+
+    def _store(self, key: str, value):
+        now = time.time()
+        try:
+            conn = self._conn()
+            conn.execute(
+                """
+                INSERT INTO response_cache (key, value, fetched_at, last_access)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                  value=excluded.value,
+                  fetched_at=excluded.fetched_at,
+                  last_access=excluded.last_access
+                """,
+                (key, json.dumps(value), now, now),
+            )
+            self._evict(conn)
+        except sqlite3.Error as e:
+            print("Response cache error:", e)
+            self._count("errors")
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+        excess = total - self.max_entries
+        if excess <= 0:
+            return
+
+        conn.execute(
+            """
+            DELETE FROM response_cache WHERE key IN (
+              SELECT key FROM response_cache ORDER BY last_access ASC LIMIT ?
+            )
+            """,
+            (excess,),
+        )
+        self._count("evictions", excess)
+
+    def _revalidate_async(self, key: str, fetch):
+        with self._lock:
+            # Per key maximaal 1 revalidatie tegelijk (in deze worker)
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+
+        def run():
+            try:
+                self._store(key, fetch())
+                self._count("revalidations")
+            except Exception as e:
+                print("Response cache revalidate error:", e)
+                self._count("errors")
+            finally:
+                # Elke revalidatie is een nieuwe thread: zijn connectie niet laten openstaan
+                self._close_conn()
+                with self._lock:
+                    self._revalidating.discard(key)
+
+        threading.Thread(target=run, name="response-cache-revalidate", daemon=True).start()
+
+    # ----------------
+    # Statistieken
+    # ----------------
+
+    def stats(self) -> dict:
+        """Hit/miss tellers van dit worker-proces + aantal regels in de cache."""
+        with self._lock:
+            counters = dict(self._counters)
+
+        lookups = counters["hits"] + counters["stale_hits"] + counters["misses"]
+        counters["hit_ratio"] = (
+            round((counters["hits"] + counters["stale_hits"]) / lookups, 3) if lookups else None
+        )
+        try:
+            counters["entries"] = self._conn().execute(
+                "SELECT COUNT(*) FROM response_cache"
+            ).fetchone()[0]
+        except sqlite3.Error:
+            counters["entries"] = None
+        return counters
+
+    def clear(self):
+        self._conn().execute("DELETE FROM response_cache")
+
+
+# Gedeelde cache voor TheMealDB (recepten veranderen vrijwel nooit)
+mealdb_cache = ResponseCache()
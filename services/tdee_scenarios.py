@@ -0,0 +1,156 @@
+# services/tdee_scenarios.py
+# "Wat als"-scenario's voor de calculator: voor een reeks gewichten x
+# activiteitsniveaus x doelen in 1 keer BMR, TDEE en kcal-doel berekenen,
+# plus hoeveel weken het duurt om het doelgewicht te halen.
+# Zelfde formules als de calculator (utils.mifflin_st_jeor, minimaal
+# MIN_TARGET_KCAL). Met NumPy (als die geïnstalleerd is) als 1 gevectoriseerde
+# berekening over het hele rooster, anders in gewone Python; de uitkomst is hetzelfde.
+#
+# Projectie naar het doelgewicht: de gebruiker eet elke dag het kcal-doel,
+# terwijl de TDEE meedaalt (of -stijgt) met het gewicht (10 * multiplier kcal
+# per kg, uit Mifflin-St Jeor). Het gewicht nadert dan exponentieel het
+# evenwichtsgewicht waarbij TDEE == kcal-doel:
+#   w(t) = w_eq + (w0 - w_eq) * exp(-t * 10 * multiplier / KCAL_PER_KG)
+# Ligt het doelgewicht niet tussen w0 en w_eq, dan wordt het nooit gehaald (None).
+# Bron (vuistregel ~7700 kcal per kg): https://en.wikipedia.org/wiki/Food_energy
+import math
+
+from utils import MIN_TARGET_KCAL, mifflin_st_jeor
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy is optioneel (niet nodig op de server): dan de Python-versie
+    np = None
+
+KCAL_PER_KG = 7700.0
+# Verder dan 3 jaar vooruit projecteren heeft geen zin (zelfde grens als de gewichttrend)
+MAX_WEEKS = 3 * 52
+
+
+# ----------------
+# Rekenkern (NumPy en pure Python)
+# ----------------
+
+def _weeks_python(weight: float, goal_weight: float, tdee: float, target: float, multiplier: float) -> float | None:
+    if goal_weight == weight:
+        return 0.0
+    per_kg = 10.0 * multiplier
+    equilibrium = weight + (target - tdee) / per_kg
+    if equilibrium == weight:
+        return None
+    ratio = (goal_weight - equilibrium) / (weight - equilibrium)
+    if not 0.0 < ratio < 1.0:
+        return None
+    weeks = -math.log(ratio) * KCAL_PER_KG / per_kg / 7.0
+    return weeks if weeks <= MAX_WEEKS else None
+
+
+def _grid_python(sex, age_years, height_cm, weights, multipliers, adjustments, goal_weight) -> list[tuple]:
+    rows = []
+    for weight in weights:
+        bmr = mifflin_st_jeor(sex, weight, height_cm, age_years)
+        for multiplier in multipliers:
+            tdee = bmr * multiplier
+            for adjustment in adjustments:
+                target = max(MIN_TARGET_KCAL, tdee + adjustment)
+                weeks = (
+                    _weeks_python(weight, goal_weight, tdee, target, multiplier)
+                    if goal_weight is not None else None
+                )
+                rows.append((bmr, tdee, target, weeks))
+    return rows
+
+
+def _grid_numpy(sex, age_years, height_cm, weights, multipliers, adjustments, goal_weight) -> list[tuple]:
+    """
+    Zelfde rooster met broadcasting: assen (gewicht, activiteit, doel).
+    mifflin_st_jeor is gewone rekenkunde en werkt dus ook op een array.
+    Bron: https://numpy.org/doc/stable/user/basics.broadcasting.html
+    """
+    w = np.asarray(weights, dtype=np.float64)[:, None, None]
+    m = np.asarray(multipliers, dtype=np.float64)[None, :, None]
+    adj = np.asarray(adjustments, dtype=np.float64)[None, None, :]
+
+    bmr = mifflin_st_jeor(sex, w, height_cm, age_years)
+    tdee = bmr * m
+    target = np.maximum(MIN_TARGET_KCAL, tdee + adj)
+    shape = target.shape
+    bmr = np.broadcast_to(bmr, shape)
+    tdee = np.broadcast_to(tdee, shape)
+
+    if goal_weight is None:
+        weeks = np.full(shape, np.nan)
+    else:
+        w = np.broadcast_to(w, shape)
+        per_kg = np.broadcast_to(10.0 * m, shape)
+        equilibrium = w + (target - tdee) / per_kg
+        # Deling door 0 (evenwicht == startgewicht) en log(<=0) geven nan/inf: die vallen hieronder af
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = (goal_weight - equilibrium) / (w - equilibrium)
+            weeks = -np.log(ratio) * KCAL_PER_KG / per_kg / 7.0
+        reachable = (ratio > 0.0) & (ratio < 1.0) & (weeks <= MAX_WEEKS)
+        weeks = np.where(reachable, weeks, np.nan)
+        weeks = np.where(w == goal_weight, 0.0, weeks)
+
+    return [
+        (b, t, k, None if math.isnan(wk) else wk)
+        for b, t, k, wk in zip(bmr.ravel().tolist(), tdee.ravel().tolist(),
+                               target.ravel().tolist(), weeks.ravel().tolist())
+    ]
+
+
+def scenario_grid(
+    sex: str,
+    age_years: int,
+    height_cm: float,
+    weights: list[float],
+    activity_levels,
+    goals,
+    goal_weight: float | None = None,
+    use_numpy: bool | None = None,
+) -> dict:
+    """
+    Alle combinaties gewicht x activiteitsniveau x doel (in die volgorde).
+    activity_levels/goals: records uit services/reference_data.py.
+    use_numpy=None: NumPy als die beschikbaar is.
+    """
+    if use_numpy is None:
+        use_numpy = np is not None
+    grid_fn = _grid_numpy if use_numpy else _grid_python
+    rows = grid_fn(
+        sex, age_years, height_cm, weights,
+        [a.multiplier for a in activity_levels],
+        [float(g.kcal_adjustment) for g in goals],
+        goal_weight,
+    )
+
+    scenarios = []
+    i = 0
+    for weight in weights:
+        for activity in activity_levels:
+            for goal in goals:
+                bmr, tdee, target, weeks = rows[i]
+                i += 1
+                scenarios.append({
+                    "weight_kg": weight,
+                    "activity_level_id": activity.id,
+                    "activity_level": activity.name,
+                    "goal_id": goal.id,
+                    "goal": goal.name,
+                    "bmr": round(bmr, 1),
+                    "tdee": round(tdee, 1),
+                    "target_kcal": round(target, 1),
+                    # Kcal-doel is opgetrokken tot het minimum
+                    "at_minimum": tdee + goal.kcal_adjustment < MIN_TARGET_KCAL,
+                    "weekly_change_kg": round((target - tdee) * 7 / KCAL_PER_KG, 2),
+                    "weeks_to_goal": round(weeks, 1) if weeks is not None else None,
+                })
+    return {
+        "engine": "numpy" if use_numpy else "python",
+        "sex": sex,
+        "age_years": age_years,
+        "height_cm": height_cm,
+        "goal_weight_kg": goal_weight,
+        "scenarios": scenarios,
+    }
@@ -0,0 +1,277 @@
+# services/weight_trends.py
+# Trendanalyse van de gewichtmetingen, in 1 doorloop over de reeks:
+# - trendgewicht: exponentieel voortschrijdend gemiddelde (EMA), dat dagelijkse
+#   schommelingen (vocht, zout) wegfiltert
+#   Bron: https://www.fourmilab.ch/hackdiet/e4/signalnoise.html
+# - tempo: kg per week (lineaire regressie over de laatste 4 weken)
+# - projectie: wanneer het doelgewicht bereikt wordt bij dit tempo
+# - plateau: het tempo is (bijna) 0 en de trend beweegt al een tijd niet meer
+# Met NumPy (als die geïnstalleerd is) gevectoriseerd, anders in gewone Python;
+# de uitkomst is hetzelfde.
+#
+# Het resultaat wordt per gebruiker bewaard in weight_trend_cache; de triggers
+# uit migratie 0005 gooien die weg zodra er een meting of het doel verandert.
+import json
+import math
+import sqlite3
+from datetime import date
+
+from utils import lttb
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy is optioneel (niet nodig op de server): dan de Python-versie
+    np = None
+
+# Gewicht van een nieuwe dag in de EMA (10% per dag, zoals The Hacker's Diet)
+ALPHA = 0.1
+# Na een lange pauze telt de eerste nieuwe meting (bijna) volledig mee;
+# de grens houdt de NumPy-berekening ook numeriek stabiel
+MAX_GAP_DAYS = 60
+# Metingen per blok in de NumPy-EMA (zie _ema_numpy)
+EMA_BLOCK = 64
+# Tempo en projectie: regressie over de laatste 4 weken
+REGRESSION_DAYS = 28
+# Plateau: tempo onder 0,1 kg/week over de laatste 3 weken (min. 4 metingen)
+PLATEAU_DAYS = 21
+PLATEAU_RATE_KG = 0.1
+PLATEAU_MIN_POINTS = 4
+# Hoe ver de trend mag afwijken om nog 'op hetzelfde niveau' te zitten
+PLATEAU_BAND_KG = 0.25
+# Verder dan 3 jaar vooruit projecteren heeft geen zin
+MAX_PROJECTION_DAYS = 3 * 365
+# Punten in de trendreeks voor de grafiek
+SERIES_POINTS = 200
+
+
+# ----------------
+# Rekenkern (NumPy en pure Python)
+# ----------------
+
+def _ema_python(days: list[int], weights: list[float]) -> list[float]:
+    trend = [weights[0]]
+    for i in range(1, len(days)):
+        # Meer dagen tussen 2 metingen = de nieuwe meting telt zwaarder mee
+        gap = min(days[i] - days[i - 1], MAX_GAP_DAYS)
+        alpha = 1 - (1 - ALPHA) ** gap
+        trend.append(trend[-1] + alpha * (weights[i] - trend[-1]))
+    return trend
+
+
+def _ema_numpy(days, weights):
+    """
+    Zelfde EMA zonder Python-loop per meting. De recursie
+        t[k] = d[k] * t[k-1] + a[k] * x[k]      (d = 1 - a)
+    is uitgeschreven met het cumulatieve product P[k] = d[s] * ... * d[k]:
+        t[k] = P[k] * (t[s-1] + som(a[j] * x[j] / P[j]))
+    Per blok van EMA_BLOCK metingen, zodat 1/P niet te groot wordt.
+    """
+    gaps = np.minimum(np.diff(days), MAX_GAP_DAYS)
+    decay = (1 - ALPHA) ** gaps
+    alpha = 1 - decay
+    x = weights[1:]
+
+    trend = np.empty(len(weights))
+    trend[0] = weights[0]
+    previous = weights[0]
+    for start in range(0, len(x), EMA_BLOCK):
+        d = decay[start:start + EMA_BLOCK]
+        p = np.cumprod(d)
+        block = p * (previous + np.cumsum(alpha[start:start + EMA_BLOCK] * x[start:start + EMA_BLOCK] / p))
+        trend[start + 1:start + 1 + len(block)] = block
+        previous = block[-1]
+    return trend
+
+
+def _fit_python(days: list[int], weights: list[float]) -> tuple[float, float] | None:
+    """
+    Kleinste-kwadratenlijn: (helling in kg per dag, waarde van de lijn op de
+    laatste dag), of None bij te weinig data.
+    """
+    n = len(days)
+    if n < 2:
+        return None
+    mean_x = sum(days) / n
+    mean_y = sum(weights) / n
+    var = sum((x - mean_x) ** 2 for x in days)
+    if var == 0:
+        return None
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(days, weights)) / var
+    return slope, mean_y + slope * (days[-1] - mean_x)
+
+
+def _fit_numpy(days, weights) -> tuple[float, float] | None:
+    if len(days) < 2:
+        return None
+    mean_x = days.mean()
+    dx = days - mean_x
+    var = float(np.dot(dx, dx))
+    if var == 0:
+        return None
+    slope = float(np.dot(dx, weights - weights.mean()) / var)
+    return slope, float(weights.mean() + slope * (days[-1] - mean_x))
+
+
+def _window_start(days, window_days: int) -> int:
+    """Index van de eerste meting binnen de laatste window_days dagen."""
+    first_day = days[-1] - window_days + 1
+    if not isinstance(days, list):
+        return int(np.searchsorted(days, first_day))
+    for i, day in enumerate(days):
+        if day >= first_day:
+            return i
+    return len(days)
+
+
+def _flat_since(days, trend) -> int:
+    """Aantal dagen dat de trend binnen PLATEAU_BAND_KG van de huidige waarde ligt."""
+    current = trend[-1]
+    if not isinstance(trend, list):
+        outside = np.nonzero(np.abs(trend - current) > PLATEAU_BAND_KG)[0]
+        first = int(outside[-1]) + 1 if len(outside) else 0
+    else:
+        first = 0
+        for i in range(len(trend) - 1, -1, -1):
+            if abs(trend[i] - current) > PLATEAU_BAND_KG:
+                first = i + 1
+                break
+    return int(days[-1] - days[first])
+
+
+def compute_trends(rows, goal_weight: float | None = None, use_numpy: bool | None = None) -> dict:
+    """
+    rows: (log_date, weight) per dag, oplopend op datum. Rijen met een
+    ongeldige datum worden overgeslagen.
+    use_numpy=None: NumPy als die beschikbaar is.
+    """
+    if use_numpy is None:
+        use_numpy = np is not None
+    engine = "numpy" if use_numpy else "python"
+
+    days = []
+    weights = []
+    for r in rows:
+        try:
+            day = date.fromisoformat(r[0]).toordinal()
+        except (TypeError, ValueError):
+            # Oude rij met een ongeldige datum: niet meerekenen
+            continue
+        days.append(day)
+        weights.append(float(r[1]))
+    result = {
+        "engine": engine,
+        "points": len(days),
+        "goal_weight": goal_weight,
+        "latest_weight": round(weights[-1], 2) if weights else None,
+        "trend_weight": None,
+        "weekly_rate_kg": None,
+        "projected_goal_date": None,
+        "days_to_goal": None,
+        "plateau": False,
+        "plateau_days": 0,
+        "series": {"labels": [], "trend": []},
+    }
+    if not days:
+        return result
+
+    if use_numpy:
+        days_v = np.asarray(days, dtype=np.int64)
+        weights_v = np.asarray(weights, dtype=np.float64)
+        trend = _ema_numpy(days_v, weights_v) if len(days) > 1 else weights_v.copy()
+        fit_fn = _fit_numpy
+    else:
+        days_v, weights_v = days, weights
+        trend = _ema_python(days, weights)
+        fit_fn = _fit_python
+
+    result["trend_weight"] = round(float(trend[-1]), 2)
+
+    # Tempo: regressielijn over de laatste REGRESSION_DAYS dagen
+    start = _window_start(days_v, REGRESSION_DAYS)
+    fit = fit_fn(days_v[start:], weights_v[start:])
+    if fit is not None:
+        result["weekly_rate_kg"] = round(fit[0] * 7, 2)
+
+    # Projectie: de regressielijn doortrekken, alleen als hij de goede kant op gaat
+    if goal_weight is not None and fit is not None and fit[0]:
+        slope, fitted = fit
+        days_needed = (goal_weight - fitted) / slope
+        if 0 <= days_needed <= MAX_PROJECTION_DAYS:
+            result["days_to_goal"] = math.ceil(days_needed)
+            result["projected_goal_date"] = date.fromordinal(days[-1] + math.ceil(days_needed)).isoformat()
+
+    # Plateau: (bijna) geen tempo over de laatste weken, met genoeg metingen
+    start = _window_start(days_v, PLATEAU_DAYS)
+    plateau_fit = fit_fn(days_v[start:], weights_v[start:])
+    if plateau_fit is not None and len(days) - start >= PLATEAU_MIN_POINTS:
+        result["plateau"] = abs(plateau_fit[0] * 7) < PLATEAU_RATE_KG
+    result["plateau_days"] = _flat_since(days_v, trend)
+
+    # Trendlijn voor de grafiek, verkleind met LTTB
+    points = lttb(list(zip(days, (float(t) for t in trend))), SERIES_POINTS)
+    result["series"] = {
+        "labels": [date.fromordinal(int(x)).isoformat() for x, _ in points],
+        "trend": [round(y, 2) for _, y in points],
+    }
+    return result
+
+
+# ----------------
+# Cache (weight_trend_cache)
+# ----------------
+
+def get_trends(conn: sqlite3.Connection, user_id: int) -> dict:
+    """
+    Trend uit de cache, of opnieuw berekend (en bewaard) als die er niet is.
+    Lezen en wegschrijven gebeuren in 1 transactie: is er intussen een nieuwe
+    meting opgeslagen, dan weigert SQLite het wegschrijven (snapshot verouderd)
+    en bewaren we deze uitkomst niet.
+    Loopt er op de connectie al een transactie (een eerdere, nog niet
+    gecommitte write in dit request), dan gebeurt dit in een SAVEPOINT
+    daarbinnen en commit de aanroeper.
+    Bron: https://www.sqlite.org/lang_savepoint.html
+    """
+    row = conn.execute(
+        "SELECT payload FROM weight_trend_cache WHERE user_id = ?", (user_id,)
+    ).fetchone()
+    if row is not None:
+        return json.loads(row["payload"])
+
+    nested = conn.in_transaction
+    conn.execute("SAVEPOINT weight_trends" if nested else "BEGIN")
+    stored = False
+    try:
+        # 1 waarde per dag (gemiddelde als er meerdere metingen op 1 dag zijn)
+        rows = conn.execute(
+            "SELECT log_date, AVG(weight) AS weight FROM weight_logs "
+            "WHERE user_id = ? GROUP BY log_date ORDER BY log_date",
+            (user_id,),
+        ).fetchall()
+        goal = conn.execute(
+            "SELECT goal_weight FROM weight_goals WHERE user_id = ?", (user_id,)
+        ).fetchone()
+
+        trends = compute_trends(rows, goal["goal_weight"] if goal else None)
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO weight_trend_cache (user_id, payload) VALUES (?, ?)",
+                (user_id, json.dumps(trends)),
+            )
+            if not nested:
+                conn.commit()
+            stored = True
+        except sqlite3.OperationalError:
+            # Busy of verouderde snapshot: de uitkomst is bruikbaar, alleen niet cachen
+            pass
+    finally:
+        # Altijd afsluiten, ook als compute_trends een fout gooit
+        if not nested:
+            if not stored:
+                conn.rollback()
+        elif conn.in_transaction:
+            # (na sommige fouten heeft SQLite de hele transactie al teruggedraaid)
+            if not stored:
+                conn.execute("ROLLBACK TO weight_trends")
+            conn.execute("RELEASE weight_trends")
+    return trends
@@ -0,0 +1,61 @@
+# tests/conftest.py
+# Gedeelde fixtures. Alle tests draaien op een tijdelijke database met een
+# nep-dataset (scripts/generate_dataset.py), nooit op database.db.
+# db/app worden pas in de fixtures geïmporteerd: die lezen de paden hieronder
+# bij het importeren.
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from query_tracer import QueryTracer
+from tests.helpers import login_client, prepare_dataset, traced
+
+_TMPDIR = tempfile.mkdtemp(prefix="tests-")
+os.environ["DATABASE_PATH"] = os.path.join(_TMPDIR, "database.db")
+os.environ["RESPONSE_CACHE_PATH"] = os.path.join(_TMPDIR, "cache.db")
+# Geen echte API-calls
+os.environ.pop("RAPIDAPI_KEY", None)
+
+
+@pytest.fixture(scope="session")
+def dataset():
+    """(connectie, user_id, ctx) op de nep-dataset; 1x per testrun opgebouwd."""
+    conn, user_id, ctx = prepare_dataset(users=int(os.environ.get("TEST_DATASET_USERS", "200")))
+    yield conn, user_id, ctx
+    conn.close()
+    shutil.rmtree(_TMPDIR, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def client(dataset):
+    """Test-client, ingelogd als de gebruiker met de meeste geschiedenis."""
+    from app import app
+
+    return login_client(app, dataset[1])
+
+
+@pytest.fixture
+def trace_queries():
+    """
+    Contextmanager-fabriek: `with trace_queries() as tracer:` legt alle SQL
+    van de requests in dat blok vast (db.set_query_tracer).
+    """
+    import db
+
+    tracer = QueryTracer()
+    yield lambda: traced(tracer)
+    db.set_query_tracer(None)
+
+
+@pytest.fixture
+def empty_db(tmp_path, monkeypatch):
+    """Lege, gemigreerde database (zonder nep-dataset) in een tijdelijke map."""
+    import db
+
+    monkeypatch.setattr(db, "DB_PATH", str(tmp_path / "empty.db"))
+    conn = db.get_db_connection()
+    db.migrate(conn)
+    yield conn
+    conn.close()
@@ -0,0 +1,74 @@
+# tests/helpers.py
+# Hulpfuncties voor de tests én scripts/check_query_budgets.py:
+# een nep-dataset in een tijdelijke database, een ingelogde test-client en
+# SQL vastleggen per request (QueryTracer).
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+# Staat in de foods-tabel van de nep-dataset (food_search zonder API-call)
+BARCODE = "8712345678901"
+
+
+def prepare_dataset(users: int = 200) -> tuple:
+    """
+    Vult de (lege, tijdelijke) database uit DATABASE_PATH met een nep-dataset.
+    Geeft (connectie, user_id, ctx) terug; ctx vult de placeholders in de paden.
+    DATABASE_PATH/RESPONSE_CACHE_PATH moeten gezet zijn vóór het importeren van db.
+    """
+    import db
+    from scripts.generate_dataset import generate
+
+    conn = db.get_db_connection()
+    db.migrate(conn)
+    generate(conn, users=users, years=1, seed=7)
+    conn.execute(
+        "INSERT INTO foods (api_source, api_id, name, kcal_per_100, protein_per_100, carbs_per_100, fat_per_100) "
+        "VALUES ('openfoodfacts', ?, 'Budget product', 250, 10, 30, 8)",
+        (BARCODE,),
+    )
+    conn.commit()
+
+    # De gebruiker met de meeste geschiedenis (slechtste geval voor de budgetten)
+    user_id = conn.execute(
+        "SELECT user_id FROM food_logs GROUP BY user_id ORDER BY COUNT(*) DESC LIMIT 1"
+    ).fetchone()[0]
+    ctx = {
+        "day": date.today().isoformat(),
+        "year_ago": (date.today() - timedelta(days=365)).isoformat(),
+        "workout_id": conn.execute(
+            "SELECT MAX(id) FROM workouts WHERE user_id = ?", (user_id,)
+        ).fetchone()[0],
+        "log_id": conn.execute(
+            "SELECT MAX(id) FROM food_logs WHERE user_id = ?", (user_id,)
+        ).fetchone()[0],
+        # Een oefening die nog niet in die workout zit
+        "exercise_id": conn.execute(
+            "SELECT MAX(id) FROM exercises WHERE id NOT IN "
+            "(SELECT exercise_id FROM workout_exercises WHERE workout_id = "
+            "(SELECT MAX(id) FROM workouts WHERE user_id = ?))",
+            (user_id,),
+        ).fetchone()[0],
+    }
+    return conn, user_id, ctx
+
+
+def login_client(app, user_id: int):
+    """Test-client met een ingelogde sessie voor user_id."""
+    client = app.test_client()
+    with client.session_transaction() as s:
+        s["user_id"] = user_id
+        s["user_email"] = f"user{user_id}@example.com"
+    return client
+
+
+@contextmanager
+def traced(tracer):
+    """Alle request-connecties binnen dit blok via de tracer (db.set_query_tracer)."""
+    import db
+
+    tracer.reset()
+    db.set_query_tracer(tracer)
+    try:
+        yield tracer
+    finally:
+        db.set_query_tracer(None)
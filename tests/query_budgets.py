@@ -0,0 +1,120 @@
+# tests/query_budgets.py
+# SQL-budget per route, tegen de nep-dataset (tests/helpers.py):
+# - aantal statements (BEGIN/COMMIT/PRAGMA tellen niet mee)
+# - werk in SQLite (VM-stappen: stijgt mee met het aantal gelezen rijen)
+# - geen dubbele statements (N+1, of 2x dezelfde lookup)
+# - geen volledige table scans (behalve waar dat de bedoeling is)
+# Gebruikt door tests/test_query_budgets.py en scripts/check_query_budgets.py.
+#
+# Route aangepast? Pas het budget hieronder bewust aan.
+from dataclasses import dataclass
+
+from tests.helpers import BARCODE
+
+
+@dataclass
+class Budget:
+    name: str
+    method: str
+    path: str                       # {day}, {year_ago}, {workout_id}, {log_id}, {exercise_id} worden ingevuld
+    statements: int
+    vm_steps: int = 20_000
+    data: dict | None = None
+    json: dict | None = None        # JSON-body (in plaats van formulierdata)
+    allow_scans: tuple[str, ...] = ()
+
+
+BUDGETS = [
+    Budget("dashboard", "GET", "/", statements=1),
+    Budget("nutrition_day", "GET", "/nutrition/{day}", statements=3),
+    Budget("nutrition_target", "POST", "/nutrition/target", statements=1, data={"kcal_target": "2100"}),
+    Budget("food_search (cache)", "POST", "/food/search", statements=1, data={"barcode": BARCODE}),
+    Budget(
+        "food_log", "POST", "/food/log", statements=2,
+        data={
+            "api_source": "openfoodfacts", "api_id": BARCODE, "name": "Budget product",
+            "grams": "150", "log_date": "{day}", "kcal_per_100": "250",
+            "protein_per_100": "10", "carbs_per_100": "30", "fat_per_100": "8",
+        },
+    ),
+    # Een jaar = 366 dagrijen uit daily_nutrition_totals
+    Budget(
+        "nutrition_summary", "GET", "/api/nutrition/summary?group=week&start={year_ago}&end={day}",
+        statements=2, vm_steps=30_000,
+    ),
+    Budget("food_log_delete", "POST", "/food/log/{log_id}/delete", statements=1),
+    # Geschiedenis + trend uit de cache (weight_trend_cache)
+    Budget("weight", "GET", "/weight", statements=2),
+    Budget("weight_trends_api", "GET", "/api/weight/trends", statements=1),
+    Budget("weight_post", "POST", "/weight", statements=1, data={"log_date": "{day}", "weight": "80.5"}),
+    Budget("weight_logs_api", "GET", "/api/weight/logs", statements=1),
+    Budget("weight_series_api", "GET", "/api/weight/series?resolution=week", statements=1),
+    Budget("workouts", "GET", "/workouts", statements=1),
+    Budget(
+        "workout_create", "POST", "/workouts", statements=1,
+        data={"workout_date": "{day}", "workout_type": "Kracht", "notes": ""},
+    ),
+    Budget("workout_detail", "GET", "/workouts/{workout_id}", statements=3),
+    # Insert + upsert in exercise_stats
+    Budget(
+        "workout_add_exercise", "POST", "/workouts/{workout_id}/add-exercise", statements=3,
+        data={"exercise_id": "{exercise_id}", "sets": "3", "reps": "8", "weight": "60"},
+    ),
+    Budget("exercise_search", "GET", "/api/exercises?q=press", statements=1),
+    Budget("exercise_stats_api", "GET", "/api/exercises/{exercise_id}/stats", statements=1),
+    # Na de eerste keer komt de catalogus uit de cache van de worker
+    Budget("exercise_catalog", "GET", "/api/exercises/catalog", statements=1),
+    # activity_levels/goals komen uit het geheugen (services/reference_data.py)
+    Budget("calculator", "GET", "/calculator", statements=2),
+    Budget(
+        "calculator_post", "POST", "/calculator", statements=1,
+        data={
+            "sex": "male", "birth_year": "1990", "height_cm": "180", "weight_kg": "80",
+            "activity_level_id": "3", "goal_id": "2",
+        },
+    ),
+    # Eigen profiel/gewicht/doelgewicht in 1 query; het rooster zelf is alleen rekenwerk
+    Budget(
+        "calculator_scenarios", "POST", "/api/calculator/scenarios", statements=1,
+        json={"weights_kg": {"min": 70, "max": 90, "step": 1}},
+    ),
+    Budget("calculator_save", "POST", "/calculator/save", statements=1, data={"kcal_target": "2300"}),
+]
+
+
+def _fill(value: str, ctx: dict) -> str:
+    return value.format(**ctx) if isinstance(value, str) else value
+
+
+def run_budget(client, conn, budget: Budget, ctx: dict, trace) -> tuple:
+    """
+    Voert de route van `budget` 1x uit binnen trace() (zie traced).
+    Geeft (tracer, problemen) terug; geen problemen = binnen budget.
+    """
+    path = _fill(budget.path, ctx)
+    data = {k: _fill(v, ctx) for k, v in (budget.data or {}).items()}
+
+    # GET-routes eerst 1x opwarmen: caches per worker (FTS-check, catalogus)
+    # zijn in productie ook al gevuld
+    if budget.method == "GET":
+        client.get(path)
+
+    with trace() as tracer:
+        if budget.json is not None:
+            r = client.open(path, method=budget.method, json=budget.json)
+        else:
+            r = client.open(path, method=budget.method, data=data)
+
+    problems = []
+    if r.status_code >= 400:
+        problems.append(f"status {r.status_code}")
+    n = len(tracer.queries)
+    if n > budget.statements:
+        problems.append(f"{n} statements (budget {budget.statements})")
+    if tracer.vm_steps > budget.vm_steps:
+        problems.append(f"{tracer.vm_steps} VM-stappen (budget {budget.vm_steps})")
+    for sql, count in tracer.duplicates().items():
+        problems.append(f"{count}x dezelfde query: {sql[:80]}")
+    for sql, detail in tracer.full_scans(conn, allow=budget.allow_scans):
+        problems.append(f"{detail}: {sql[:80]}")
+    return tracer, problems
@@ -0,0 +1,32 @@
+# tests/test_calculator_scenarios.py
+# /api/calculator/scenarios: ongeldige getallen geven een 400, nooit een 500.
+import pytest
+
+PROFILE = {"sex": "male", "birth_year": 1990, "height_cm": 180}
+
+
+@pytest.mark.parametrize(
+    "extra",
+    [
+        {"weights_kg": [80], "goal_ids": ["inf"]},
+        {"weights_kg": {"min": 70, "max": "inf"}},
+        {"weights_kg": [80, "NaN"]},
+        {"weights_kg": [80], "birth_year": "inf"},
+        {"weights_kg": [80], "goal_weight_kg": "nan"},
+    ],
+)
+def test_non_finite_input_is_rejected(client, extra):
+    r = client.post("/api/calculator/scenarios", json={**PROFILE, **extra})
+    assert r.status_code == 400
+    assert "geen geldig getal" in r.json["error"]
+
+
+def test_grid_size(client):
+    r = client.post(
+        "/api/calculator/scenarios",
+        json={**PROFILE, "weights_kg": {"min": 70, "max": 80, "step": 5}, "goal_ids": [1, 2]},
+    )
+    assert r.status_code == 200
+    # 3 gewichten x alle activiteitsniveaus x 2 doelen
+    activity_levels = {s["activity_level_id"] for s in r.json["scenarios"]}
+    assert len(r.json["scenarios"]) == 3 * len(activity_levels) * 2
@@ -0,0 +1,10 @@
+# tests/test_dashboard.py
+# Het dashboard haalt alles op in precies 1 statement (load_dashboard_summary).
+
+
+def test_dashboard_is_one_statement(client, trace_queries):
+    client.get("/")  # opwarmen (caches per worker)
+    with trace_queries() as tracer:
+        r = client.get("/")
+    assert r.status_code == 200
+    assert len(tracer.queries) == 1, tracer.queries
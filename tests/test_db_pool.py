@@ -0,0 +1,70 @@
+# tests/test_db_pool.py
+# ConnectionPool (db.py): hergebruik, rollback bij teruggeven, begrenzing en
+# een lege pool na een fork (gunicorn).
+import os
+
+import pytest
+
+import db
+
+
+@pytest.fixture
+def pool(dataset):
+    return db.ConnectionPool(max_size=2)
+
+
+def test_released_connection_is_reused(pool):
+    conn = pool.acquire()
+    pool.release(conn)
+    assert pool.acquire() is conn
+    stats = pool.stats()
+    assert (stats["created"], stats["reused"], stats["in_use"]) == (1, 1, 1)
+
+
+def test_release_rolls_back_open_transaction(pool):
+    conn = pool.acquire()
+    conn.execute("INSERT INTO catalog_versions (name, version) VALUES ('pool-test', 1)")
+    assert conn.in_transaction
+    pool.release(conn)
+
+    assert not conn.in_transaction
+    other = db.get_db_connection()
+    try:
+        assert other.execute("SELECT 1 FROM catalog_versions WHERE name = 'pool-test'").fetchone() is None
+    finally:
+        other.close()
+
+
+def test_full_pool_closes_extra_connections(pool):
+    conns = [pool.acquire() for _ in range(3)]
+    for conn in conns:
+        pool.release(conn)
+    stats = pool.stats()
+    assert (stats["idle"], stats["discarded"]) == (2, 1)
+
+
+def test_pool_is_reset_after_fork(pool):
+    parent_conn = pool.acquire()
+    pool.release(parent_conn)
+    assert pool.stats()["idle"] == 1
+
+    pid = os.fork()
+    if pid == 0:
+        # Kind: geen connecties van de parent, wel een werkende eigen connectie
+        try:
+            stats = pool.stats()
+            conn = pool.acquire()
+            ok = (
+                stats["pid"] == os.getpid()
+                and stats["idle"] == 0
+                and conn is not parent_conn
+                and conn.execute("SELECT 1").fetchone()[0] == 1
+            )
+        except Exception:
+            ok = False
+        os._exit(0 if ok else 1)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    # De parent houdt zijn eigen connectie
+    assert pool.acquire() is parent_conn
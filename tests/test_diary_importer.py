@@ -0,0 +1,109 @@
+# tests/test_diary_importer.py
+# Dagboek-import (services/diary_importer.py): chunkgrenzen, een foute regel
+# midden in een chunk, afgekapte JSON en producten uit de foods-tabel.
+import io
+import json
+
+import pytest
+
+from services.diary_importer import import_diary
+
+
+@pytest.fixture
+def user_id(empty_db):
+    user_id = empty_db.execute(
+        "INSERT INTO users (email, password_hash) VALUES ('dagboek@example.com', 'x') RETURNING id"
+    ).fetchone()[0]
+    empty_db.commit()
+    return user_id
+
+
+def _csv(rows: list[tuple]) -> io.BytesIO:
+    lines = ["date,food_name,grams,kcal,protein,carbs,fat"]
+    lines += [",".join(str(v) for v in row) for row in rows]
+    return io.BytesIO(("\n".join(lines) + "\n").encode())
+
+
+def _rows(n: int) -> list[tuple]:
+    # 3 regels per dag, zodat ook de dagtotalen over chunks heen lopen
+    return [(f"2024-01-{1 + i // 3:02d}", f"Product {i}", 100, 10 * i, 1, 2, 3) for i in range(n)]
+
+
+def _logs(conn, user_id):
+    return conn.execute(
+        "SELECT log_date, food_name, amount_grams, kcal FROM food_logs WHERE user_id = ? ORDER BY id",
+        (user_id,),
+    ).fetchall()
+
+
+def _daily_kcal(conn, user_id) -> dict:
+    return dict(conn.execute(
+        "SELECT log_date, kcal FROM daily_nutrition_totals WHERE user_id = ?", (user_id,)
+    ).fetchall())
+
+
+@pytest.mark.parametrize("n, chunks", [(25, 3), (20, 2), (9, 1)])
+def test_chunk_boundaries(empty_db, user_id, n, chunks):
+    progress = []
+    result = import_diary(
+        empty_db, user_id, _csv(_rows(n)), fmt="csv", chunk_size=10,
+        progress=lambda r: progress.append(r.inserted),
+    )
+    assert (result.rows_read, result.inserted, result.skipped, result.chunks) == (n, n, 0, chunks)
+    assert progress == [min(10 * (i + 1), n) for i in range(chunks)]
+    assert [tuple(r) for r in _logs(empty_db, user_id)] == [(d, name, g, k) for d, name, g, k, *_ in _rows(n)]
+
+    expected = {}
+    for day, _, _, kcal, *_ in _rows(n):
+        expected[day] = expected.get(day, 0) + kcal
+    assert _daily_kcal(empty_db, user_id) == expected
+
+
+def test_bad_rows_in_the_middle_of_a_chunk(empty_db, user_id):
+    rows = _rows(10)
+    rows[4] = ("31-01-2024", "Verkeerde datum", 100, 50, 1, 1, 1)
+    rows[6] = ("2024-01-03", "Geen getal", 100, "veel", 1, 1, 1)
+    result = import_diary(empty_db, user_id, _csv(rows), fmt="csv", chunk_size=4)
+
+    assert (result.rows_read, result.inserted, result.skipped) == (10, 8, 2)
+    # Regelnummers in het bestand (regel 1 is de kop)
+    assert [line for line, _ in result.errors] == [6, 8]
+    assert "datum" in result.errors[0][1] and "kcal" in result.errors[1][1]
+    names = [r["food_name"] for r in _logs(empty_db, user_id)]
+    assert "Verkeerde datum" not in names and "Geen getal" not in names
+    assert result.aborted is None
+
+
+def test_ndjson_with_invalid_line(empty_db, user_id):
+    lines = [json.dumps({"date": d, "name": n, "grams": g, "kcal": k}) for d, n, g, k, *_ in _rows(5)]
+    lines.insert(2, "{niet: json")
+    result = import_diary(empty_db, user_id, io.BytesIO("\n".join(lines).encode()), chunk_size=2)
+
+    assert (result.rows_read, result.inserted, result.skipped) == (6, 5, 1)
+    assert result.errors[0][0] == 3
+
+
+def test_truncated_json_keeps_earlier_chunks(empty_db, user_id):
+    items = [{"date": d, "name": n, "grams": g, "kcal": k} for d, n, g, k, *_ in _rows(8)]
+    data = json.dumps(items)
+    # Midden in het laatste element afgekapt
+    truncated = data[: data.rindex("{") + 10]
+    result = import_diary(empty_db, user_id, io.BytesIO(truncated.encode()), fmt="json", chunk_size=3)
+
+    assert result.aborted is not None
+    assert (result.rows_read, result.inserted) == (7, 7)
+    assert len(_logs(empty_db, user_id)) == 7
+
+
+def test_values_from_foods_table(empty_db, user_id):
+    empty_db.execute(
+        "INSERT INTO foods (api_source, api_id, name, kcal_per_100, protein_per_100, carbs_per_100, fat_per_100) "
+        "VALUES ('openfoodfacts', '8711111111111', 'Havermout', 370, 13, 60, 7)"
+    )
+    empty_db.commit()
+    data = "date,barcode,grams\n2024-01-01,8711111111111,50\n2024-01-01,0000000000000,50\n"
+    result = import_diary(empty_db, user_id, io.BytesIO(data.encode()), fmt="csv")
+
+    assert (result.inserted, result.skipped, result.foods_matched) == (1, 1, 1)
+    log = empty_db.execute("SELECT food_name, kcal, protein FROM food_logs WHERE user_id = ?", (user_id,)).fetchone()
+    assert tuple(log) == ("Havermout", 185.0, 6.5)
@@ -0,0 +1,84 @@
+# tests/test_exercise_importer.py
+# ExerciseDB-import met een nep-client: vensters en pagina's, onbruikbare
+# items, en verder na een fout vanaf het checkpoint.
+import pytest
+
+from services.exercise_importer import import_exercises
+
+
+class StubClient:
+    """Levert `total` oefeningen in pagina's, zoals ExerciseDBClient."""
+
+    def __init__(self, total: int, fail_at: int | None = None, bad: tuple[int, ...] = ()):
+        self.items = [{"id": str(i), "name": f"oefening {i}", "target": "chest"} for i in range(total)]
+        for i in bad:
+            self.items[i] = {"id": str(i), "name": "  "}
+        self.fail_at = fail_at
+        self.offsets = []
+
+    def fetch_exercises_page(self, offset: int, limit: int) -> list[dict]:
+        self.offsets.append(offset)
+        if offset == self.fail_at:
+            raise ConnectionError("API weg")
+        return self.items[offset:offset + limit]
+
+
+def _import(conn, client, **kwargs):
+    kwargs.setdefault("page_size", 10)
+    kwargs.setdefault("window_pages", 2)
+    kwargs.setdefault("rate_per_sec", 1000)
+    return import_exercises(conn, client, **kwargs)
+
+
+def _names(conn) -> set[str]:
+    return {r[0] for r in conn.execute("SELECT name FROM exercises WHERE name LIKE 'Oefening %'")}
+
+
+def test_windows_and_last_page(empty_db):
+    progress = []
+    result = _import(empty_db, StubClient(25), progress=lambda r: progress.append(r.fetched))
+
+    assert (result.fetched, result.inserted, result.pages) == (25, 25, 3)
+    assert result.finished
+    # 2 vensters van 2 pagina's: [10+10] en [5]
+    assert progress == [20, 25]
+    assert _names(empty_db) == {f"Oefening {i}" for i in range(25)}
+
+
+def test_exact_multiple_of_page_size(empty_db):
+    client = StubClient(20)
+    result = _import(empty_db, client)
+    assert (result.fetched, result.inserted) == (20, 20)
+    assert result.finished
+    # Het einde wordt herkend aan een lege pagina
+    assert 20 in client.offsets
+
+
+def test_unusable_item_in_the_middle_is_skipped(empty_db):
+    result = _import(empty_db, StubClient(15, bad=(4,)))
+    assert (result.fetched, result.inserted) == (15, 14)
+    assert "Oefening 4" not in _names(empty_db)
+
+
+def test_resumes_from_checkpoint_after_error(empty_db):
+    # Fout op de 4e pagina (tweede venster): het eerste venster en pagina 3 zijn binnen
+    with pytest.raises(ConnectionError):
+        _import(empty_db, StubClient(45, fail_at=30), checkpoint="test")
+    assert len(_names(empty_db)) == 30
+
+    client = StubClient(45)
+    result = _import(empty_db, client, checkpoint="test")
+    assert client.offsets[0] == 30
+    assert (result.fetched, result.inserted) == (15, 15)
+    assert result.finished
+    assert len(_names(empty_db)) == 45
+
+    # Klaar: een volgende run doet niets
+    assert _import(empty_db, StubClient(45), checkpoint="test").fetched == 0
+
+
+def test_max_total(empty_db):
+    result = _import(empty_db, StubClient(100), max_total=23)
+    # Hele pagina's opgehaald (3 x 10), maar maar 23 opgeslagen
+    assert (result.pages, result.inserted) == (3, 23)
+    assert not result.finished
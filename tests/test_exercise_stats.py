@@ -0,0 +1,114 @@
+# tests/test_exercise_stats.py
+# exercise_stats: bijgewerkt bij toevoegen (record_exercise), en na wijzigen of
+# verwijderen van een set gelijk aan een volledige rebuild_exercise_stats.
+# Migratie 0006 vult de tabel met dezelfde functie.
+import sqlite3
+import uuid
+
+import pytest
+
+import db
+from services.exercise_stats import rebuild_exercise_stats
+from tests.helpers import login_client
+
+
+@pytest.fixture
+def lifter(dataset):
+    """Nieuwe gebruiker met 2 workouts en een ingelogde client."""
+    from app import app
+
+    conn = dataset[0]
+    user_id = conn.execute(
+        "INSERT INTO users (email, password_hash) VALUES (?, 'x') RETURNING id",
+        (f"lifter-{uuid.uuid4().hex[:8]}@example.com",),
+    ).fetchone()[0]
+    workouts = [
+        conn.execute(
+            "INSERT INTO workouts (user_id, workout_date, workout_type) VALUES (?, ?, 'Kracht') RETURNING id",
+            (user_id, day),
+        ).fetchone()[0]
+        for day in ("2026-01-01", "2026-01-08")
+    ]
+    exercise_id = conn.execute("SELECT MIN(id) FROM exercises").fetchone()[0]
+    conn.commit()
+    return login_client(app, user_id), conn, user_id, workouts, exercise_id
+
+
+def _stats(client, exercise_id):
+    r = client.get(f"/api/exercises/{exercise_id}/stats")
+    assert r.status_code == 200
+    return r.json
+
+
+def _rows(conn, user_id):
+    return conn.execute(
+        "SELECT * FROM exercise_stats WHERE user_id = ? ORDER BY exercise_id", (user_id,)
+    ).fetchall()
+
+
+def test_add_edit_delete_set(lifter):
+    client, conn, user_id, (w1, w2), exercise_id = lifter
+
+    def add(workout_id, sets, reps, weight):
+        client.post(
+            f"/workouts/{workout_id}/add-exercise",
+            data={"exercise_id": exercise_id, "sets": sets, "reps": reps, "weight": weight},
+        )
+
+    # Toevoegen (incrementeel)
+    add(w1, 3, 5, 100)
+    add(w2, 3, 10, 90)
+    stats = _stats(client, exercise_id)
+    assert stats["best_e1rm"] == 120.0                  # 90 * (1 + 10/30)
+    assert stats["best_e1rm_date"] == "2026-01-08"
+    assert (stats["heaviest_weight"], stats["heaviest_reps"]) == (100, 5)
+    assert stats["last"]["workout_id"] == w2
+    assert stats["previous"]["workout_id"] == w1
+    incremental = [tuple(r) for r in _rows(conn, user_id)]
+    rebuild_exercise_stats(conn, user_id)
+    assert [tuple(r) for r in _rows(conn, user_id)] == incremental
+
+    # Wijzigen: 90 -> 80 kg in de laatste workout
+    conn.execute(
+        "UPDATE workout_exercises SET weight = 80 WHERE workout_id = ? AND exercise_id = ?",
+        (w2, exercise_id),
+    )
+    rebuild_exercise_stats(conn, user_id)
+    stats = _stats(client, exercise_id)
+    assert stats["best_e1rm"] == 116.7                  # 100 * (1 + 5/30)
+    assert stats["best_e1rm_date"] == "2026-01-01"
+    assert stats["heaviest_weight"] == 100
+    assert stats["last"]["weight"] == 80
+
+    # Verwijderen: de eerste workout
+    conn.execute(
+        "DELETE FROM workout_exercises WHERE workout_id = ? AND exercise_id = ?", (w1, exercise_id)
+    )
+    rebuild_exercise_stats(conn, user_id)
+    stats = _stats(client, exercise_id)
+    assert stats["best_e1rm"] == 106.7                  # 80 * (1 + 10/30)
+    assert (stats["heaviest_weight"], stats["heaviest_reps"]) == (80, 10)
+    assert stats["last"]["workout_id"] == w2
+    assert stats["previous"] is None
+    assert stats["times_performed"] == 1
+
+
+def test_migration_backfills_existing_workouts(dataset, tmp_path):
+    conn = dataset[0]
+    copy = sqlite3.connect(tmp_path / "copy.db")
+    conn.backup(copy)
+    try:
+        expected = copy.execute("SELECT * FROM exercise_stats ORDER BY 1, 2").fetchall()
+        assert expected
+
+        # Terug naar vóór 0006 en die migratie opnieuw uitvoeren
+        copy.execute("DROP TABLE exercise_stats")
+        copy.execute("PRAGMA user_version = 5")
+        copy.commit()
+        run = next(run for version, _, run in db.migrations() if version == 6)
+        run(copy)
+
+        assert copy.execute("PRAGMA user_version").fetchone()[0] == 6
+        assert copy.execute("SELECT * FROM exercise_stats ORDER BY 1, 2").fetchall() == expected
+    finally:
+        copy.close()
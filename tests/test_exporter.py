@@ -0,0 +1,84 @@
+# tests/test_exporter.py
+# Export (services/exporter.py): keyset-chunks zonder gaten of dubbelingen,
+# en export -> dagboek-import geeft precies dezelfde voedingslogs terug.
+import gzip
+import io
+
+import pytest
+
+from scripts.generate_dataset import generate
+from services.diary_importer import import_diary
+from services.exporter import DATASETS, iter_chunks, iter_export
+
+_FOOD_FIELDS = "log_date, food_name, amount_grams, kcal, protein, carbs, fat"
+
+
+@pytest.fixture
+def history(empty_db):
+    """Kleine nep-dataset; geeft (connectie, gebruiker met de meeste voedingslogs)."""
+    generate(empty_db, users=3, years=0.25, seed=3, n_foods=50, n_exercises=20)
+    user_id = empty_db.execute(
+        "SELECT user_id FROM food_logs GROUP BY user_id ORDER BY COUNT(*) DESC LIMIT 1"
+    ).fetchone()[0]
+    return empty_db, user_id
+
+
+@pytest.mark.parametrize("name", sorted(DATASETS))
+@pytest.mark.parametrize("user", [True, False], ids=["user", "all"])
+def test_chunks_cover_every_row_once(history, name, user):
+    conn, user_id = history
+    dataset = DATASETS[name]
+    uid = user_id if user else None
+
+    (everything,) = list(iter_chunks(conn, dataset, uid, chunk_size=10**6))
+    chunks = list(iter_chunks(conn, dataset, uid, chunk_size=7))
+    assert len(chunks) > 1
+    assert [tuple(r) for rows in chunks for r in rows] == [tuple(r) for r in everything]
+
+    if name == "workouts":
+        # Een workout staat altijd helemaal in 1 chunk
+        per_chunk = [{r["workout_id"] for r in rows} for rows in chunks]
+        assert sum(len(ids) for ids in per_chunk) == len(set().union(*per_chunk))
+
+
+def _new_user(conn) -> int:
+    user_id = conn.execute(
+        "INSERT INTO users (email, password_hash) VALUES ('kopie@example.com', 'x') RETURNING id"
+    ).fetchone()[0]
+    conn.commit()
+    return user_id
+
+
+def _food_logs(conn, user_id) -> list[tuple]:
+    return [
+        tuple(r) for r in conn.execute(
+            f"SELECT {_FOOD_FIELDS} FROM food_logs WHERE user_id = ? ORDER BY log_date, id", (user_id,)
+        )
+    ]
+
+
+def _daily_totals(conn, user_id) -> list[tuple]:
+    return [
+        tuple(r) for r in conn.execute(
+            "SELECT log_date, kcal, protein, carbs, fat, item_count FROM daily_nutrition_totals "
+            "WHERE user_id = ? ORDER BY log_date",
+            (user_id,),
+        )
+    ]
+
+
+@pytest.mark.parametrize("fmt, compress", [("csv", True), ("csv", False), ("ndjson", True)])
+def test_export_import_round_trip(history, fmt, compress):
+    conn, user_id = history
+    data = b"".join(iter_export("food", user_id, fmt, compress=compress, chunk_size=7))
+    if compress:
+        data = gzip.decompress(data)
+
+    copy_id = _new_user(conn)
+    result = import_diary(conn, copy_id, io.BytesIO(data), fmt=fmt, chunk_size=11)
+
+    original = _food_logs(conn, user_id)
+    assert result.skipped == 0 and result.aborted is None
+    assert result.inserted == len(original) > 0
+    assert _food_logs(conn, copy_id) == original
+    assert _daily_totals(conn, copy_id) == _daily_totals(conn, user_id)
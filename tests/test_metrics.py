@@ -0,0 +1,109 @@
+# tests/test_metrics.py
+# /metrics: afgeschermd (401 zonder token of beheerder), telt de bestanden van
+# levende en gestopte workers op, en een stoppende worker schrijft zijn
+# laatste interval weg voordat de master hem samenvoegt.
+import json
+import os
+import runpy
+import subprocess
+import sys
+
+import pytest
+from flask import Flask
+
+import auth
+import metrics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COUNTER = 'http_requests_total{method="GET",route="test",status="200"}'
+
+
+def _worker_file(metrics_dir, pid: int, requests: float):
+    with open(os.path.join(metrics_dir, f"{pid}.json"), "w") as f:
+        json.dump([
+            ["http_requests_total", {"route": "test", "method": "GET", "status": "200"}, requests],
+            ["db_pool_connections", {"state": "test"}, 3.0],
+        ], f)
+
+
+def _value(text: str, series: str) -> float | None:
+    for line in text.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+@pytest.fixture
+def metrics_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_DIR", str(tmp_path))
+    return str(tmp_path)
+
+
+@pytest.fixture
+def metrics_app(metrics_dir, monkeypatch):
+    """Losse Flask-app met alleen metrics.init_app (token en beheerder vast ingesteld)."""
+    monkeypatch.setenv("METRICS_TOKEN", "geheim")
+    monkeypatch.setattr(auth, "ADMIN_EMAILS", {"beheer@example.com"})
+    app = Flask(__name__)
+    app.secret_key = "test"
+    metrics.init_app(app)
+    return app
+
+
+def test_requires_token_or_admin(metrics_app):
+    client = metrics_app.test_client()
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer fout"}).status_code == 401
+
+    with client.session_transaction() as s:
+        s["user_id"] = 1
+        s["user_email"] = "iemand@example.com"
+    assert client.get("/metrics").status_code == 401
+
+    with client.session_transaction() as s:
+        s["user_email"] = "Beheer@example.com"
+    assert client.get("/metrics").status_code == 200
+
+
+def test_live_and_dead_workers_are_added_up(metrics_app, metrics_dir):
+    _worker_file(metrics_dir, 101, 2)
+    _worker_file(metrics_dir, 102, 5)
+    _worker_file(metrics_dir, 103, 7)
+    metrics.mark_process_dead(102)
+    metrics.mark_process_dead(103)
+    assert sorted(os.listdir(metrics_dir)) == ["101.json", "dead.json"]
+
+    r = metrics_app.test_client().get("/metrics", headers={"Authorization": "Bearer geheim"})
+    assert r.status_code == 200
+    assert r.mimetype == "text/plain"
+    assert _value(r.text, COUNTER) == 14
+    # Gauges tellen alleen voor levende workers
+    assert _value(r.text, 'db_pool_connections{state="test"}') == 3
+
+
+def test_worker_flushes_last_interval_at_exit(metrics_dir):
+    # Flush-interval langer dan de worker leeft: zonder laatste flush geen bestand
+    code = (
+        "import metrics\n"
+        "metrics._ensure_flusher()\n"
+        "metrics.inc('http_requests_total', 4, route='test', method='GET', status=200)\n"
+    )
+    env = dict(os.environ, METRICS_DIR=metrics_dir, METRICS_FLUSH_INTERVAL="3600")
+    worker = subprocess.Popen([sys.executable, "-c", code], cwd=ROOT, env=env)
+    assert worker.wait(timeout=60) == 0
+
+    metrics.mark_process_dead(worker.pid)
+    assert _value(metrics.render(), COUNTER) == 4
+
+
+def test_gunicorn_worker_exit_hook(metrics_dir, monkeypatch):
+    hooks = runpy.run_path(os.path.join(ROOT, "gunicorn.conf.py"))
+    monkeypatch.setattr(metrics, "_flusher_started", True)
+    metrics.inc("http_requests_total", 6, route="test", method="GET", status=200)
+    try:
+        hooks["worker_exit"](None, None)
+        with open(os.path.join(metrics_dir, f"{os.getpid()}.json")) as f:
+            data = json.load(f)
+        assert ["http_requests_total", {"method": "GET", "route": "test", "status": "200"}, 6.0] in data
+    finally:
+        metrics.inc("http_requests_total", -6, route="test", method="GET", status=200)
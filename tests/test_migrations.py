@@ -0,0 +1,74 @@
+# tests/test_migrations.py
+# Migraties (db.migrate / db.init_db): user_version loopt op, een tweede
+# init_db doet niets, en een mislukte migratie laat de versie staan.
+import shutil
+import sqlite3
+
+import pytest
+
+import db
+
+
+@pytest.fixture
+def fresh_db(tmp_path, monkeypatch):
+    """Lege database in een tijdelijke map (in plaats van DATABASE_PATH)."""
+    monkeypatch.setattr(db, "DB_PATH", str(tmp_path / "migrate.db"))
+    return tmp_path
+
+
+def _schema(conn) -> list:
+    return conn.execute("SELECT type, name, sql FROM sqlite_master ORDER BY type, name").fetchall()
+
+
+def test_init_db_is_idempotent(fresh_db):
+    db.init_db()
+    conn = db.get_db_connection()
+    try:
+        assert db.schema_version(conn) == db.latest_version()
+        schema = _schema(conn)
+        assert db.migrate(conn) == []
+    finally:
+        conn.close()
+
+    db.init_db()
+    conn = db.get_db_connection()
+    try:
+        assert db.schema_version(conn) == db.latest_version()
+        assert _schema(conn) == schema
+    finally:
+        conn.close()
+
+
+def test_user_version_advances(fresh_db):
+    conn = db.get_db_connection()
+    try:
+        assert db.schema_version(conn) == 0
+        applied = db.migrate(conn)
+        assert applied == [version for version, _, _ in db.migrations()]
+        assert db.schema_version(conn) == applied[-1]
+
+        # Terug naar een oudere versie: alleen de nieuwere migraties opnieuw
+        conn.execute("PRAGMA user_version = 5")
+        assert db.migrate(conn) == [v for v in applied if v > 5]
+        assert db.schema_version(conn) == applied[-1]
+    finally:
+        conn.close()
+
+
+def test_failed_migration_keeps_version(fresh_db, monkeypatch):
+    migrations_dir = fresh_db / "migrations"
+    shutil.copytree(db.MIGRATIONS_DIR, migrations_dir)
+    latest = db.latest_version()
+    (migrations_dir / f"{latest + 1:04d}_broken.sql").write_text(
+        "CREATE TABLE half_done (id INTEGER);\nTHIS IS NOT SQL;\n"
+    )
+    monkeypatch.setattr(db, "MIGRATIONS_DIR", str(migrations_dir))
+
+    conn = db.get_db_connection()
+    try:
+        with pytest.raises(sqlite3.Error):
+            db.migrate(conn)
+        assert db.schema_version(conn) == latest
+        assert not db._table_exists(conn, "half_done")
+    finally:
+        conn.close()
@@ -0,0 +1,132 @@
+# tests/test_openfoodfacts.py
+# Read-through cache voor barcodes (foods + food_lookup_misses): bekende en
+# onbekende barcodes gaan niet naar Open Food Facts, verlopen regels wel.
+import uuid
+
+import pytest
+import requests
+
+from services import http_client
+from services.openfoodfacts_client import get_product_by_barcode
+
+
+class StubResponse:
+    def __init__(self, status_code: int, data: dict):
+        self.status_code = status_code
+        self._data = data
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code}")
+
+
+class StubSession:
+    """Neemt de plaats in van de gedeelde Session; telt de requests."""
+
+    def __init__(self):
+        self.urls = []
+        self.response = StubResponse(404, {"status": 0})
+        self.error = None
+
+    def get(self, url, **kwargs):
+        self.urls.append(url)
+        if self.error is not None:
+            raise self.error
+        return self.response
+
+
+@pytest.fixture
+def session(monkeypatch):
+    stub = StubSession()
+    monkeypatch.setattr(http_client, "session_for", lambda url: stub)
+    return stub
+
+
+@pytest.fixture
+def barcode():
+    return str(uuid.uuid4().int)[:13]
+
+
+def _found(name: str) -> StubResponse:
+    return StubResponse(200, {
+        "status": 1,
+        "product": {
+            "product_name": name,
+            "nutriments": {"energy-kcal_100g": 250, "fat_100g": 8, "carbohydrates_100g": 30, "proteins_100g": 10},
+        },
+    })
+
+
+def test_hit_is_served_from_db(dataset, session, barcode):
+    conn = dataset[0]
+    conn.execute(
+        "INSERT INTO foods (api_source, api_id, name, kcal_per_100) VALUES ('openfoodfacts', ?, 'Lokaal', 100)",
+        (barcode,),
+    )
+    conn.commit()
+
+    product = get_product_by_barcode(barcode, conn)
+    assert product["name"] == "Lokaal"
+    assert session.urls == []
+
+
+def test_found_product_is_cached(dataset, session, barcode):
+    conn = dataset[0]
+    session.response = _found("Nieuw product")
+
+    assert get_product_by_barcode(barcode, conn)["name"] == "Nieuw product"
+    assert get_product_by_barcode(barcode, conn)["kcal_100g"] == 250
+    assert len(session.urls) == 1
+
+
+def test_miss_is_cached(dataset, session, barcode):
+    conn = dataset[0]
+    assert get_product_by_barcode(barcode, conn) is None
+    assert get_product_by_barcode(barcode, conn) is None
+    assert len(session.urls) == 1
+    assert conn.execute("SELECT 1 FROM food_lookup_misses WHERE barcode = ?", (barcode,)).fetchone()
+
+
+def test_network_error_is_not_cached(dataset, session, barcode):
+    conn = dataset[0]
+    session.error = requests.ConnectionError("geen netwerk")
+    assert get_product_by_barcode(barcode, conn) is None
+
+    session.error = None
+    session.response = _found("Toch gevonden")
+    assert get_product_by_barcode(barcode, conn)["name"] == "Toch gevonden"
+    assert len(session.urls) == 2
+
+
+def test_expired_entries_are_fetched_again(dataset, session, barcode):
+    conn = dataset[0]
+    conn.execute(
+        "INSERT INTO foods (api_source, api_id, name, created_at) "
+        "VALUES ('openfoodfacts', ?, 'Oud', datetime('now', '-31 days'))",
+        (barcode,),
+    )
+    conn.commit()
+    session.response = _found("Bijgewerkt")
+
+    assert get_product_by_barcode(barcode, conn)["name"] == "Bijgewerkt"
+    assert len(session.urls) == 1
+    # Weer vers: de volgende keer uit de database
+    assert get_product_by_barcode(barcode, conn)["name"] == "Bijgewerkt"
+    assert len(session.urls) == 1
+
+
+def test_expired_miss_is_fetched_again(dataset, session, barcode):
+    conn = dataset[0]
+    conn.execute(
+        "INSERT INTO food_lookup_misses (barcode, checked_at) VALUES (?, datetime('now', '-2 days'))",
+        (barcode,),
+    )
+    conn.commit()
+    session.response = _found("Nu wel bekend")
+
+    assert get_product_by_barcode(barcode, conn)["name"] == "Nu wel bekend"
+    assert len(session.urls) == 1
+    assert conn.execute("SELECT 1 FROM food_lookup_misses WHERE barcode = ?", (barcode,)).fetchone() is None
@@ -0,0 +1,108 @@
+# tests/test_passwords.py
+# Wachtwoorden hashen via de process-pool (passwords.py): registreren en
+# inloggen, 503 als de wachtrij vol zit, en oude hashes vervangen bij login.
+import logging
+import threading
+import uuid
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+import metrics
+import passwords
+
+PASSWORD = "geheim-wachtwoord"
+
+
+@pytest.fixture
+def anonymous(dataset):
+    """Test-client zonder sessie (HTTPS, want de sessiecookie is Secure)."""
+    from app import app
+
+    client = app.test_client()
+    client.environ_base["wsgi.url_scheme"] = "https"
+    return client
+
+
+def _email() -> str:
+    return f"test-{uuid.uuid4().hex[:8]}@example.com"
+
+
+def _login(client, email, password=PASSWORD):
+    return client.post("/login", data={"email": email, "password": password})
+
+
+@pytest.fixture
+def background_threads():
+    """Threads die steeds locks pakken, zoals metrics-flush en logging in een worker."""
+    stop = threading.Event()
+
+    def busy(lock):
+        while not stop.is_set():
+            with lock:
+                stop.wait(0.001)
+
+    threads = [
+        threading.Thread(target=busy, args=(lock,), daemon=True)
+        for lock in (metrics._lock, logging._lock)
+    ]
+    for t in threads:
+        t.start()
+    yield
+    stop.set()
+    for t in threads:
+        t.join()
+
+
+def test_register_and_login_through_pool(anonymous, background_threads):
+    assert passwords.POOL_WORKERS > 0
+    email = _email()
+
+    r = anonymous.post("/register", data={"email": email, "password": PASSWORD})
+    assert r.status_code == 302 and r.location == "/"
+    # Hashprocessen komen uit de forkserver, niet uit een fork van deze (multi-threaded) worker
+    assert passwords._get_executor()._mp_context.get_start_method() == "forkserver"
+
+    anonymous.get("/logout")
+    assert _login(anonymous, email).location == "/"
+    anonymous.get("/logout")
+    assert _login(anonymous, email, "fout-wachtwoord").location == "/login"
+
+
+def test_queue_full_gives_503(anonymous, dataset):
+    conn = dataset[0]
+    email = _email()
+    conn.execute(
+        "INSERT INTO users (email, password_hash) VALUES (?, ?)",
+        (email, generate_password_hash(PASSWORD, passwords.METHOD)),
+    )
+    conn.commit()
+
+    # Alle plekken in de wachtrij bezet
+    for _ in range(passwords.QUEUE_LIMIT):
+        assert passwords._slots.acquire(blocking=False)
+    try:
+        r = _login(anonymous, email)
+    finally:
+        for _ in range(passwords.QUEUE_LIMIT):
+            passwords._slots.release()
+
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "1"
+    assert _login(anonymous, email).location == "/"
+
+
+def test_legacy_hash_is_replaced_on_login(anonymous, dataset):
+    conn = dataset[0]
+    email = _email()
+    legacy = generate_password_hash(PASSWORD, "pbkdf2:sha256:1000")
+    conn.execute("INSERT INTO users (email, password_hash) VALUES (?, ?)", (email, legacy))
+    conn.commit()
+    assert passwords.needs_rehash(legacy)
+
+    assert _login(anonymous, email).location == "/"
+
+    new_hash = conn.execute("SELECT password_hash FROM users WHERE email = ?", (email,)).fetchone()[0]
+    assert new_hash != legacy
+    assert not passwords.needs_rehash(new_hash)
+    assert passwords.check_password(new_hash, PASSWORD)
@@ -0,0 +1,14 @@
+# tests/test_query_budgets.py
+# Elke route uit tests/query_budgets.py binnen zijn SQL-budget:
+# aantal statements, VM-stappen, geen dubbele queries en geen table scans.
+# Route aangepast? Pas het budget daar bewust aan.
+import pytest
+
+from tests.query_budgets import BUDGETS, run_budget
+
+
+@pytest.mark.parametrize("budget", BUDGETS, ids=[b.name for b in BUDGETS])
+def test_route_within_budget(budget, client, dataset, trace_queries):
+    conn, _, ctx = dataset
+    tracer, problems = run_budget(client, conn, budget, ctx, trace_queries)
+    assert not problems, "\n".join(problems + ["statements:"] + tracer.queries)
@@ -0,0 +1,119 @@
+# tests/test_response_cache.py
+# ResponseCache: TTL, LRU-opruimen en stale-while-revalidate (1 fetch per key,
+# ook bij een golf stale hits; de revalidatie-thread sluit zijn connectie).
+import sqlite3
+import threading
+
+import pytest
+
+from services.response_cache import ResponseCache
+
+DAY = 24 * 3600
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(path=str(tmp_path / "cache.db"), ttl=DAY, stale_ttl=DAY, max_entries=3)
+
+
+class Fetcher:
+    """fetch() die telt hoe vaak hij is aangeroepen."""
+
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+def _age(cache, key, seconds):
+    """Doet alsof de regel `seconds` geleden is opgehaald (en gebruikt)."""
+    cache._conn().execute(
+        "UPDATE response_cache SET fetched_at = fetched_at - ?, last_access = last_access - ? WHERE key = ?",
+        (seconds, seconds, cache.make_key(key)),
+    )
+
+
+def _wait_for_revalidations():
+    for t in threading.enumerate():
+        if t.name == "response-cache-revalidate":
+            t.join(timeout=5)
+
+
+def test_fresh_hit_does_not_fetch(cache):
+    fetch = Fetcher({"a": 1})
+    assert cache.get_or_fetch("lookup", None, fetch) == {"a": 1}
+    assert cache.get_or_fetch("lookup", None, fetch) == {"a": 1}
+    assert fetch.calls == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_expired_entry_is_fetched_again(cache):
+    cache.get_or_fetch("lookup", None, Fetcher("oud"))
+    _age(cache, "lookup", 2 * DAY + 1)             # voorbij ttl + stale_ttl
+
+    fetch = Fetcher("nieuw")
+    assert cache.get_or_fetch("lookup", None, fetch) == "nieuw"
+    assert fetch.calls == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_least_recently_used_is_evicted(cache):
+    for i, key in enumerate(("a", "b", "c")):
+        cache.get_or_fetch(key, None, Fetcher(key))
+        _age(cache, key, 100 - i)                  # a het oudst, c het nieuwst
+    # 'a' weer gebruiken: nu is 'b' het minst recent gebruikt
+    cache.get_or_fetch("a", None, Fetcher("x"))
+
+    cache.get_or_fetch("d", None, Fetcher("d"))
+
+    keys = {k for (k,) in cache._conn().execute("SELECT key FROM response_cache")}
+    assert keys == {cache.make_key(k) for k in ("a", "c", "d")}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_stale_hits_revalidate_once(cache, monkeypatch):
+    cache.get_or_fetch("lookup", None, Fetcher("oud"))
+    _age(cache, "lookup", DAY + 1)                 # stale, nog binnen stale_ttl
+
+    release = threading.Event()
+    calls = []
+
+    def slow_fetch():
+        calls.append(1)
+        release.wait(5)
+        return "nieuw"
+
+    # Connecties van de revalidatie-thread bijhouden
+    opened = []
+    connect = sqlite3.connect
+
+    class TrackedConnection(sqlite3.Connection):
+        closed = False
+
+        def close(self):
+            self.closed = True
+            super().close()
+
+    def tracking_connect(*args, **kwargs):
+        conn = connect(*args, factory=TrackedConnection, **kwargs)
+        if threading.current_thread().name == "response-cache-revalidate":
+            opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(sqlite3, "connect", tracking_connect)
+
+    # Golf van stale hits: allemaal meteen de oude waarde, maar 1 fetch
+    for _ in range(10):
+        assert cache.get_or_fetch("lookup", None, slow_fetch) == "oud"
+    release.set()
+    _wait_for_revalidations()
+
+    assert len(calls) == 1
+    assert cache.stats()["revalidations"] == 1
+    assert cache.get_or_fetch("lookup", None, Fetcher("ongebruikt")) == "nieuw"
+
+    assert len(opened) == 1
+    assert opened[0].closed
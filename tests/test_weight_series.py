@@ -0,0 +1,72 @@
+# tests/test_weight_series.py
+# Grafiekreeks (/api/weight/series): from/to beperken de SQL zelf (niet pas
+# na het ophalen), en een ongeldige periode geeft 400 in plaats van alles.
+import pytest
+
+from utils import DATE_BUCKETS
+
+
+def _count(conn, user_id, start=None, end=None) -> int:
+    return conn.execute(
+        "SELECT COUNT(*) FROM weight_logs WHERE user_id = ? "
+        "AND log_date >= coalesce(?, '') AND log_date <= coalesce(?, '9999')",
+        (user_id, start, end),
+    ).fetchone()[0]
+
+
+@pytest.fixture
+def window(dataset):
+    """Een periode midden in de geschiedenis van de testgebruiker."""
+    conn, user_id, _ = dataset
+    dates = [r[0] for r in conn.execute(
+        "SELECT log_date FROM weight_logs WHERE user_id = ? ORDER BY log_date", (user_id,)
+    )]
+    assert len(dates) > 100
+    return dates[len(dates) // 3], dates[len(dates) // 2]
+
+
+def test_raw_window_is_applied_in_sql(client, dataset, trace_queries, window):
+    conn, user_id, _ = dataset
+    start, end = window
+
+    with trace_queries() as tracer:
+        series = client.get(f"/api/weight/series?from={start}&to={end}&max_points=1000").json
+
+    assert (series["from"], series["to"]) == (start, end)
+    assert series["total_points"] == _count(conn, user_id, start, end) < _count(conn, user_id)
+    assert series["labels"][0] == start and series["labels"][-1] == end
+
+    (select,) = [sql for sql in tracer.statements if "FROM weight_logs" in sql]
+    assert f"log_date >= '{start}'" in select and f"log_date <= '{end}'" in select
+
+
+def test_open_ended_window(client, dataset, window):
+    conn, user_id, _ = dataset
+    start, _ = window
+    series = client.get(f"/api/weight/series?from={start}").json
+    assert series["to"] is None
+    assert series["total_points"] == _count(conn, user_id, start)
+    assert len(series["data"]) <= 200
+
+    # start/end blijven werken
+    assert client.get(f"/api/weight/series?start={start}").json == series
+
+
+@pytest.mark.parametrize("resolution", ["week", "month"])
+def test_buckets_use_the_same_window(client, dataset, window, resolution):
+    conn, user_id, _ = dataset
+    start, end = window
+    buckets = [r[0] for r in conn.execute(
+        f"SELECT DISTINCT {DATE_BUCKETS[resolution]} FROM weight_logs "
+        "WHERE user_id = ? AND log_date BETWEEN ? AND ? ORDER BY 1",
+        (user_id, start, end),
+    )]
+    series = client.get(f"/api/weight/series?resolution={resolution}&from={start}&to={end}&max_points=1000").json
+    assert series["labels"] == buckets
+
+
+@pytest.mark.parametrize("query", ["from=gisteren", "to=2024-13-01", "from=2024-02-01&to=2024-01-01"])
+def test_invalid_window(client, query):
+    r = client.get(f"/api/weight/series?{query}")
+    assert r.status_code == 400
+    assert "error" in r.json
@@ -0,0 +1,84 @@
+# tests/test_weight_trends.py
+# Trendcache (weight_trend_cache): na een nieuwe of gewijzigde meting opnieuw
+# berekend, en get_trends laat de transactie van de connectie altijd netjes achter.
+import pytest
+
+from services import weight_trends
+from services.weight_trends import get_trends
+
+
+def _latest(conn, user_id):
+    return conn.execute(
+        "SELECT id, log_date, weight FROM weight_logs WHERE user_id = ? "
+        "ORDER BY log_date DESC, id DESC LIMIT 1",
+        (user_id,),
+    ).fetchone()
+
+
+def _cached(conn, user_id) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM weight_trend_cache WHERE user_id = ?", (user_id,)
+    ).fetchone() is not None
+
+
+def test_edit_invalidates_cache(client, dataset):
+    conn, user_id, _ = dataset
+    before = client.get("/api/weight/trends").json
+    assert _cached(conn, user_id)
+
+    latest = _latest(conn, user_id)
+    conn.execute("UPDATE weight_logs SET weight = weight + 5 WHERE id = ?", (latest["id"],))
+    conn.commit()
+    try:
+        assert not _cached(conn, user_id)
+        after = client.get("/api/weight/trends").json
+        assert after["latest_weight"] != before["latest_weight"]
+        assert after["trend_weight"] > before["trend_weight"]
+        assert _cached(conn, user_id)
+    finally:
+        conn.execute("UPDATE weight_logs SET weight = ? WHERE id = ?", (latest["weight"], latest["id"]))
+        conn.commit()
+
+    assert client.get("/api/weight/trends").json == before
+
+
+def test_inside_open_transaction(dataset):
+    import db
+
+    _, user_id, _ = dataset
+    conn = db.get_db_connection()
+    try:
+        # Nog niet gecommitte write (de trigger gooit de cache weg)
+        conn.execute(
+            "INSERT INTO weight_logs (user_id, log_date, weight) VALUES (?, '2099-01-01', 123.4)",
+            (user_id,),
+        )
+        trends = get_trends(conn, user_id)
+        assert trends["latest_weight"] == 123.4
+        # De transactie van de aanroeper loopt nog; die beslist over commit/rollback
+        assert conn.in_transaction
+        assert _cached(conn, user_id)
+        conn.rollback()
+        assert _latest(conn, user_id)["log_date"] != "2099-01-01"
+    finally:
+        conn.close()
+
+
+def test_error_leaves_no_transaction(dataset, monkeypatch):
+    import db
+
+    _, user_id, _ = dataset
+    conn = db.get_db_connection()
+    try:
+        conn.execute("DELETE FROM weight_trend_cache WHERE user_id = ?", (user_id,))
+        conn.commit()
+
+        def broken(rows, goal_weight):
+            raise RuntimeError("kapot")
+
+        monkeypatch.setattr(weight_trends, "compute_trends", broken)
+        with pytest.raises(RuntimeError):
+            get_trends(conn, user_id)
+        assert not conn.in_transaction
+    finally:
+        conn.close()
@@ -1,3 +1,12 @@
+# SQL-expressies om log_date te groeperen per dag, week (start op maandag) of maand
+# Bron: https://www.sqlite.org/lang_datefunc.html
+DATE_BUCKETS = {
+    "day": "log_date",
+    "week": "date(log_date, 'weekday 0', '-6 days')",
+    "month": "strftime('%Y-%m-01', log_date)",
+}
+
+
 def calc_from_100g(per_100: float | None, grams: float) -> float:
     """Rekent een voedingswaarde per 100 gram om
     naar de hoeveelheid die de gebruiker invoert.
@@ -21,6 +30,10 @@ def safe_float(val, default=0.0):
         return default
 
 
+# Kcal-doel gaat nooit onder dit minimum (ook niet bij een groot tekort)
+MIN_TARGET_KCAL = 1200.0
+
+
 def mifflin_st_jeor(sex: str, weight_kg: float, height_cm: float, age_years: int) -> float:
     """
     Mifflin-St Jeor formule: https://reference.medscape.com/calculator/846/mifflin-st-jeor-equation
@@ -31,3 +44,59 @@ def mifflin_st_jeor(sex: str, weight_kg: float, height_cm: float, age_years: int
     if sex == "male":
         return base + 5.0
     return base - 161.0
+
+
+def lttb(points: list[tuple[float, float]], threshold: int) -> list[tuple[float, float]]:
+    """
+    Largest-Triangle-Three-Buckets: verkleint een reeks (x, y) punten tot
+    `threshold` punten, met behoud van de vorm van de grafiek (pieken en dalen).
+    Bron: https://skemman.is/bitstream/1946/15343/3/SS_MSthesis.pdf
+    """
+    n = len(points)
+    if threshold >= n or threshold < 3:
+        return list(points)
+
+    sampled = [points[0]]
+    # Eerste en laatste punt blijven altijd; de rest wordt in buckets verdeeld
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0
+
+    for i in range(threshold - 2):
+        # Gemiddelde van de volgende bucket (derde hoek van de driehoek)
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        next_bucket = points[next_start:next_end] or [points[-1]]
+        avg_x = sum(p[0] for p in next_bucket) / len(next_bucket)
+        avg_y = sum(p[1] for p in next_bucket) / len(next_bucket)
+
+        # Punt uit de huidige bucket met de grootste driehoek kiezen
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        ax, ay = points[a]
+        best_area = -1.0
+        best = start
+        for j in range(start, end):
+            px, py = points[j]
+            area = abs((ax - avg_x) * (py - ay) - (ax - px) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best = j
+
+        sampled.append(points[best])
+        a = best
+
+    sampled.append(points[-1])
+    return sampled
+
+
+def epley_1rm(weight: float | None, reps: int | None) -> float | None:
+    """
+    Geschatte 1-rep max (Epley): gewicht * (1 + reps / 30).
+    Bij 1 herhaling is het gewicht zelf de 1RM. Geen gewicht? Dan None.
+    Bron: https://en.wikipedia.org/wiki/One-repetition_maximum#Epley_formula
+    """
+    if not weight or weight <= 0 or not reps or reps <= 0:
+        return None
+    if reps == 1:
+        return float(weight)
+    return weight * (1 + reps / 30)